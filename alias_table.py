@@ -0,0 +1,36 @@
+import random
+from typing import List, Sequence
+
+'''Walker's alias method, draws index k with probability weights[k] / sum(weights) in constant time
+Building the table is linear in the number of weights, every draw is one random index and one coin flip.
+'''
+
+
+class AliasTable:
+    __slots__ = ("probability", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        '''weights must be non negative with a positive sum'''
+        count = len(weights)
+        total = float(sum(weights))
+        if not count or total <= 0:
+            raise ValueError("alias table needs a positive weight")
+        scaled = [weight * count / total for weight in weights]
+        self.probability: List[float] = [1.0] * count
+        self.alias: List[int] = list(range(count))
+        small = [k for k, weight in enumerate(scaled) if weight < 1.0]
+        large = [k for k, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # what is left is 1.0 up to rounding and keeps probability 1.0
+
+    def __len__(self):
+        return len(self.probability)
+
+    def draw(self) -> int:
+        k = random.randrange(len(self.probability))
+        return k if random.random() < self.probability[k] else self.alias[k]
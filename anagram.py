@@ -1,4 +1,6 @@
-from helpers import read_page, get_token_info_basic
+from helpers import iter_pages, get_token_info_basic, get_token_info_batch
+from anagram_index import get_index
+from page import Page
 import random
 import spacy
 from word_token import Word_Token
@@ -20,8 +22,13 @@ COLOR_RESET = "\033[0m"
 COLOR_START = ""
 COLOR_RESET = ""
 
+def can_scramble(word: str) -> bool:
+    '''a word of one repeated letter (or shorter than two letters) has no other order'''
+    return len(set(word.lower())) > 1
+
 def get_anagram(word: str) -> str:
-    ''' this function shuffles a word until an anagram is made'''
+    ''' this function shuffles a word until an anagram is made,
+    a shuffle that is the word itself or another word with its letters (see anagram_index) is tried again'''
     if len(word) <= 1:
         return word
     upper = word[0].isupper()
@@ -30,11 +37,12 @@ def get_anagram(word: str) -> str:
     original_letters = list(word)
     shuffled_letters = original_letters[:]
     anagram = word
+    index = get_index()
     
     max_attempts = 10 
     attempts = 0
     
-    while anagram == word and attempts < max_attempts:
+    while index.is_solution(word, anagram) and attempts < max_attempts:
         random.shuffle(shuffled_letters)
         anagram = "".join(shuffled_letters)
         attempts += 1
@@ -47,9 +55,11 @@ def get_anagram(word: str) -> str:
 
     return new_word
 
-def generate_riddle(page: str):
-    ''' generates a single page of anagram riddle'''
-    word_tokens = get_token_info_basic(page) 
+def generate_riddle(page: str, word_tokens: List[Word_Token] = None):
+    ''' generates a single page of anagram riddle, word_tokens can be passed if the page was already tokenized
+    words no other corpus word shares the letters of are masked first, so each scramble has one solution'''
+    if word_tokens is None:
+        word_tokens = get_token_info_basic(page) 
     
     if not word_tokens:
         return page, []
@@ -57,7 +67,14 @@ def generate_riddle(page: str):
     max_to_mask = min(len(word_tokens), MAX_WORDS)
     words_count = random.randint(MIN_WORDS, max_to_mask)
     
-    token_indices_to_mask = random.sample(range(len(word_tokens)), words_count)
+    index = get_index()
+    preferred = [k for k, token in enumerate(word_tokens) if can_scramble(token.original_text) and index.is_unique(token.original_text)]
+    if len(preferred) >= words_count:
+        token_indices_to_mask = [preferred[k] for k in random.sample(range(len(preferred)), words_count)]
+    else:
+        preferred_set = set(preferred)
+        others = [k for k in range(len(word_tokens)) if k not in preferred_set]
+        token_indices_to_mask = preferred + random.sample(others, words_count - len(preferred))
     
     selected_tokens_info = []
     
@@ -97,55 +114,17 @@ def generate_level(extract_path: str):
     ''' generates full riddle'''
     pages=[]
     words = []
-    count = 1
-    while True:
-        page_content = read_page(extract_path, count)
-        if not page_content:
-            break
-        anagrammed_page, masked_words = generate_riddle(page_content) 
+    pages_content = [page_content for _, page_content in iter_pages(extract_path)]
+    for page_content, word_tokens in zip(pages_content, get_token_info_batch(pages_content)):
+        anagrammed_page, masked_words = generate_riddle(page_content, word_tokens) 
         pages.append(anagrammed_page)
         words.append(masked_words)
-        count += 1
     return pages, words
 
 
 def transform_to_model(page_text: str, all_tokens: List, masked_metadata: List, start_id: int, game_id: int) -> Tuple[Dict[str, Any], int, List[str]]:
-    ''' transform into model used by endpoints'''
-    words_list = []
-    current_id = start_id
-    anagram_ids = []
-    
-    masked_starts = {m.start for _, m in masked_metadata}
-    
-    lines = page_text.split('\n')
-    char_tracker = 0
-    
-    for line_idx, line in enumerate(lines):
-        if not line and line_idx < len(lines) - 1:
-            char_tracker += 1
-            continue
-            
-        parts = line.split(' ')
-        for part_idx, part in enumerate(parts):
-            if not part:
-                char_tracker += 1
-                continue
-            
-            word_id = str(current_id)
-            is_last_in_line = line_idx < len(lines) - 1 and part_idx == len(parts) - 1
-            val = part + '\n' if is_last_in_line else part
-            
-            words_list.append({
-                "id": word_id,
-                "value": val
-            })
-            
-            if char_tracker in masked_starts:
-                anagram_ids.append(word_id)
-            
-            char_tracker += len(part) + 1
-            current_id += 1
-            
+    ''' transform into model used by endpoints, a word holding the start of a masked token is an anagram'''
+    words_list, next_id, anagram_ids = Page(page_text).to_model(start_id, (m.start for _, m in masked_metadata))
     return {
         "gameId": game_id,
         "riddle": {
@@ -153,7 +132,52 @@ def transform_to_model(page_text: str, all_tokens: List, masked_metadata: List,
                 "words": words_list
             }
         }
-    }, current_id, anagram_ids
+    }, next_id, anagram_ids
+
+
+def build_anagram_game(extract_path: str):
+    '''riddles of every page of a chapter and the state needed to check the answers'''
+    riddles = []
+    all_correct_word_ids = set()
+    page_to_ids = {}
+    current_word_id = 1
+
+    pages = list(iter_pages(extract_path))
+    pages_tokens = get_token_info_batch([page_content for _, page_content in pages])
+
+    for (page_idx, page_content), tokens in zip(pages, pages_tokens):
+        anagrammed_page, masked_words = generate_riddle(page_content, tokens)
+        if not masked_words:
+            continue
+
+        masked_metadata = []
+        for i, token in enumerate(tokens):
+            for masked_word in masked_words:
+                if token.i == masked_word.i:
+                    masked_metadata.append((i, masked_word))
+                    break
+        
+        spellcheck_model, next_id, page_anagram_ids = transform_to_model(
+            anagrammed_page,
+            tokens,
+            masked_metadata,
+            current_word_id,
+            0  # the game id is picked by start_anagram_game
+        )
+        
+        page_all_word_ids = {w["id"] for w in spellcheck_model["riddle"]["prompt"]["words"]}
+        page_to_ids[page_idx] = page_all_word_ids
+        
+        all_correct_word_ids.update(page_anagram_ids)
+        current_word_id = next_id
+        riddles.append(spellcheck_model["riddle"])
+
+    return riddles, {
+        "correct_word_ids": all_correct_word_ids,
+        "page_to_ids": page_to_ids,
+        "total_pages": len(riddles)
+    }
+
 
 if __name__ == "__main__":
     extract_file_path = FILE_PATH
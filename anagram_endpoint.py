@@ -4,8 +4,8 @@ from pydantic import BaseModel
 from datetime import datetime, timedelta
 import random
 
-from helpers import read_page, get_token_info_basic
-from anagram import generate_riddle, transform_to_model
+from anagram import build_anagram_game
+from generation_service import generate, GenerationBusy, GenerationTimeout
 
 ''' module responsible for endpoints for anagram riddles'''
 
@@ -66,73 +66,23 @@ async def start_anagram_game(request: GameRequest, background_tasks: BackgroundT
     
     try:
         extract_path = f"extracts/book_{request.bookId}/chapter_{request.chapter}.txt"
-        responses = []
-        all_correct_word_ids = set()
-        page_to_ids = {}
+        riddles, game_state = await generate(build_anagram_game, extract_path)
+    except GenerationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except GenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not riddles:
+        raise HTTPException(status_code=404, detail="Content not found")
 
+    game_id = random.randint(1000, 9999)
+    while (game_id in active_games):
         game_id = random.randint(1000, 9999)
-        while (game_id in active_games):
-            game_id = random.randint(1000, 9999)
-        current_word_id = 1
-        page_idx = 1
-
-        while True:
-            page_content = read_page(extract_path, page_idx)
-            if not page_content:
-                break
-            
-            anagrammed_page, masked_words = generate_riddle(page_content)
-            if not masked_words:
-                page_idx += 1
-                continue
-
-            tokens = get_token_info_basic(page_content)
-            if not tokens:
-                page_idx += 1
-                continue
-
-            masked_metadata = []
-            for i, token in enumerate(tokens):
-                for masked_word in masked_words:
-                    if token.i == masked_word.i:
-                        masked_metadata.append((i, masked_word))
-                        break
-            
-            spellcheck_model, next_id, page_anagram_ids = transform_to_model(
-                anagrammed_page,
-                tokens,
-                masked_metadata,
-                current_word_id,
-                game_id
-            )
-            
-            page_all_word_ids = {w["id"] for w in spellcheck_model["riddle"]["prompt"]["words"]}
-            page_to_ids[page_idx] = page_all_word_ids
-            
-            all_correct_word_ids.update(page_anagram_ids)
-            current_word_id = next_id
-            
-            riddle_words = [RiddleWord(id=w["id"], value=w["value"]) for w in spellcheck_model["riddle"]["prompt"]["words"]]
-            
-            responses.append(AnagramResponse(
-                gameId=game_id,
-                riddle=AnagramRiddle(prompt=GameText(words=riddle_words))
-            ))
-            page_idx += 1
-
-        if not responses:
-            raise HTTPException(status_code=404, detail="Content not found")
-
-        active_games[game_id] = {
-            "correct_word_ids": all_correct_word_ids,
-            "page_to_ids": page_to_ids,
-            "start_time": datetime.now(),
-            "total_pages": len(responses)
-        }
+    active_games[game_id] = {**game_state, "start_time": datetime.now()}
 
-        return responses
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return [AnagramResponse(gameId=game_id, riddle=AnagramRiddle(**riddle)) for riddle in riddles]
 
 @router.post("/anagram/submit", response_model=ResultResponse)
 async def submit_anagram_answers(request: AnagramAnswerRequest):
@@ -0,0 +1,64 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+'''Word forms of extracts/ that are anagrams of each other, keyed by their sorted lowercase letters
+Built by book_management/build_anagram_index.py into extracts/anagram_signatures.json.
+Only signatures shared by two or more forms ("kto" and "kot" share "kot") are kept:
+a corpus word whose signature is missing is the one word of its letters,
+and a scramble of a corpus word is another real word exactly when it is listed under the word's signature.
+'''
+
+ANAGRAM_INDEX_PATH = os.path.join("extracts", "anagram_signatures.json")
+
+_index: Optional["AnagramIndex"] = None
+
+
+def signature(word: str) -> str:
+    return "".join(sorted(word.lower()))
+
+
+class AnagramIndex:
+    def __init__(self, signatures: Dict[str, List[str]]):
+        '''signatures maps sorted letters to the lowercase forms made of them'''
+        self.signatures = signatures
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "AnagramIndex":
+        groups: Dict[str, set] = {}
+        for word in words:
+            word = word.lower()
+            groups.setdefault(signature(word), set()).add(word)
+        return cls({key: sorted(forms) for key, forms in groups.items() if len(forms) > 1})
+
+    @classmethod
+    def load(cls, path: str = ANAGRAM_INDEX_PATH) -> "AnagramIndex":
+        with open(path, encoding='utf-8') as index_file:
+            return cls(json.load(index_file))
+
+    def save(self, path: str = ANAGRAM_INDEX_PATH):
+        with open(path, 'w', encoding='utf-8') as index_file:
+            json.dump(dict(sorted(self.signatures.items())), index_file, ensure_ascii=False)
+
+    def anagrams(self, word: str) -> List[str]:
+        '''other forms made of the letters of word'''
+        lower = word.lower()
+        return [form for form in self.signatures.get(signature(lower), []) if form != lower]
+
+    def is_unique(self, word: str) -> bool:
+        '''whether no other form of the corpus is made of the letters of word'''
+        return not self.anagrams(word)
+
+    def is_solution(self, word: str, candidate: str) -> bool:
+        '''whether candidate solves a scramble of word: word itself or another form of the corpus made of its letters,
+        a scramble that is already a solution is no riddle and a typed answer that is one is right'''
+        lower = candidate.lower()
+        return lower == word.lower() or lower in self.signatures.get(signature(word), [])
+
+
+def get_index() -> AnagramIndex:
+    '''the index of extracts/, loaded on first use, empty when it was not built'''
+    global _index
+    if _index is None:
+        _index = AnagramIndex.load() if os.path.isfile(ANAGRAM_INDEX_PATH) else AnagramIndex({})
+    return _index
@@ -0,0 +1,85 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append('.')
+import corpus
+import helpers
+from book_management.corpus_packer import pack_book, compress_book, CHAPTER_FILE
+
+'''Compares the plain text, packed and compressed corpus layouts
+Reports size on disk, cold reads (book opened and nothing cached) and warm reads (everything cached)
+Run from the repository root:
+    python benchmarks/corpus_bench.py [number_of_pages]
+The OS page cache is not dropped between runs, so cold numbers measure parsing and decompression, not the disk
+'''
+
+EXTRACTS_DIR = "extracts"
+FORMATS = ["text", "packed", "compressed"]
+
+
+def folder_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def text_size(book_dirs):
+    total = 0
+    for book_dir in book_dirs:
+        for name in os.listdir(book_dir):
+            if CHAPTER_FILE.fullmatch(name) or name == "all_lines.txt":
+                total += os.path.getsize(os.path.join(book_dir, name))
+    return total
+
+
+def sample_pages(book_dirs, count):
+    pages = []
+    for book_dir in book_dirs:
+        book = corpus.open_book(book_dir, "packed")
+        for chapter, (_, page_count) in book.chapters.items():
+            for page_index in range(1, page_count + 1):
+                pages.append((os.path.join(book_dir, f"chapter_{chapter}.txt"), page_index))
+    random.seed(0)
+    return random.sample(pages, min(count, len(pages)))
+
+
+def reset_caches():
+    corpus.close_books()
+    helpers._page_indexes.clear()
+
+
+def time_reads(pages):
+    start = time.perf_counter()
+    for extract_path, page_index in pages:
+        helpers.read_page_direct(extract_path, page_index)
+    return (time.perf_counter() - start) / len(pages) * 1e6
+
+
+def main(count=500):
+    book_dirs = sorted(os.path.join(EXTRACTS_DIR, name) for name in os.listdir(EXTRACTS_DIR)
+                       if os.path.isdir(os.path.join(EXTRACTS_DIR, name)))
+    for book_dir in book_dirs:
+        pack_book(book_dir)
+        compress_book(book_dir)
+    pages = sample_pages(book_dirs, count)
+
+    sizes = {
+        "text": text_size(book_dirs),
+        "packed": sum(os.path.getsize(os.path.join(d, corpus.PACK_NAME)) for d in book_dirs),
+        "compressed": sum(os.path.getsize(os.path.join(d, corpus.COMPRESSED_PACK_NAME)) for d in book_dirs),
+    }
+    print(f"books/ {folder_size('books') / 1e6:.1f} MB, full_books/ {folder_size('full_books') / 1e6:.1f} MB (not needed at runtime)")
+    print(f"{'format':<12}{'size MB':>10}{'cold us/page':>15}{'warm us/page':>15}")
+    for corpus_format in FORMATS:
+        corpus.CORPUS_FORMAT = corpus_format
+        reset_caches()
+        cold = time_reads(pages)
+        warm = time_reads(pages)
+        print(f"{corpus_format:<12}{sizes[corpus_format] / 1e6:>10.2f}{cold:>15.1f}{warm:>15.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
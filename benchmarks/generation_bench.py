@@ -0,0 +1,77 @@
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append('.')
+import generation_service
+import helpers
+from anagram import build_anagram_game
+from choice import build_choice_game
+from crossout import build_crossout_game
+from fill import build_fill_gaps_game
+from spellcheck import build_spellcheck_game
+from switch import build_switch_game
+
+'''Measures start request throughput against the number of generation workers
+Every run generates the same chapters for every game type, GENERATION_QUEUE jobs at a time
+Run from the repository root:
+    python benchmarks/generation_bench.py [number_of_chapters]
+Workers 0 is the inline path, only one job runs at a time there whatever the concurrency
+'''
+
+EXTRACTS_DIR = "extracts"
+BUILDS = [build_anagram_game, build_choice_game, build_crossout_game,
+          build_fill_gaps_game, build_spellcheck_game, build_switch_game]
+
+
+def sample_chapters(count):
+    chapters = []
+    for book_dir in helpers.list_books(EXTRACTS_DIR):
+        for chapter in helpers.list_chapters(book_dir):
+            chapters.append(os.path.join(book_dir, f"chapter_{chapter}.txt"))
+    random.seed(0)
+    return random.sample(chapters, min(count, len(chapters)))
+
+
+async def run_jobs(jobs):
+    semaphore = asyncio.Semaphore(generation_service.GENERATION_QUEUE)
+
+    async def run_job(build, extract_path):
+        async with semaphore:
+            await generation_service.generate(build, extract_path)
+
+    await asyncio.gather(*(run_job(build, extract_path) for build, extract_path in jobs))
+
+
+def time_jobs(workers, jobs):
+    generation_service.GENERATION_WORKERS = workers
+    # starts the workers and loads the pipelines outside of the timed part
+    if workers:
+        asyncio.run(run_jobs([(abs, -1)] * workers))
+    else:
+        generation_service.warm_up()
+    start = time.perf_counter()
+    asyncio.run(run_jobs(jobs))
+    elapsed = time.perf_counter() - start
+    generation_service.shutdown()
+    return elapsed
+
+
+def main(count=20):
+    chapters = sample_chapters(count)
+    jobs = [(build, extract_path) for extract_path in chapters for build in BUILDS]
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({0, 1, 2, cores // 2, cores})
+    print(f"{len(jobs)} jobs ({len(chapters)} chapters x {len(BUILDS)} games), {cores} cores")
+    print(f"{'workers':<10}{'seconds':>10}{'jobs/s':>10}{'speedup':>10}")
+    baseline = None
+    for workers in worker_counts:
+        elapsed = time_jobs(workers, jobs)
+        baseline = baseline or elapsed
+        print(f"{workers:<10}{elapsed:>10.2f}{len(jobs) / elapsed:>10.1f}{baseline / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,74 @@
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append('.')
+import helpers
+from word_token import Word_Token
+from word_token_detailed import Word_Token_Detailed
+
+'''Compares the memory held by the tokens of a full chapter as Word_Token objects and as TokenTables
+Counts the memory freed when the tokens are dropped, so the docs or morphs they keep alive are included
+Run from the repository root:
+    python benchmarks/token_memory_bench.py [book] [chapter]
+Without arguments the chapter with the most text is used
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+def largest_chapter():
+    chapters = []
+    for book_dir in helpers.list_books(EXTRACTS_DIR):
+        for chapter in helpers.list_chapters(book_dir):
+            extract_path = os.path.join(book_dir, f"chapter_{chapter}.txt")
+            chapters.append((sum(len(page) for _, page in helpers.iter_pages(extract_path)), extract_path))
+    return max(chapters)[1]
+
+
+def objects_from_doc(doc, detailed):
+    '''the token objects get_token_info built before TokenTable'''
+    word_tokens = []
+    for token in doc:
+        if helpers.is_word_token(token):
+            word = token.text
+            if detailed:
+                word_tokens.append(Word_Token_Detailed(word, token.idx, token.idx + len(word), token.i, token.morph, token.pos))
+            else:
+                word_tokens.append(Word_Token(word, token.idx, token.idx + len(word), token.i))
+    return word_tokens
+
+
+def held_bytes(pages, detailed, build):
+    nlp = helpers.get_detailed_nlp() if detailed else helpers.get_basic_nlp()
+    gc.collect()
+    tracemalloc.start()
+    tokens = [build(doc, detailed) for doc in nlp.pipe(pages)]
+    count = sum(len(page_tokens) for page_tokens in tokens)
+    gc.collect()
+    with_tokens, _ = tracemalloc.get_traced_memory()
+    # what is freed with the tokens is what they held, allocations the pipeline keeps for itself are not counted
+    del tokens
+    gc.collect()
+    without_tokens, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return with_tokens - without_tokens, count
+
+
+def main(extract_path):
+    pages = [page for _, page in helpers.iter_pages(extract_path)]
+    print(f"{extract_path}: {len(pages)} pages, {sum(len(page) for page in pages)} characters")
+    print(f"{'tokens':<10}{'model':<10}{'count':>8}{'KB':>10}{'bytes/token':>13}")
+    for detailed in (False, True):
+        model = "detailed" if detailed else "basic"
+        for name, build in (("objects", objects_from_doc), ("table", helpers.tokens_from_doc)):
+            held, count = held_bytes(pages, detailed, build)
+            print(f"{name:<10}{model:<10}{count:>8}{held / 1024:>10.1f}{held / max(count, 1):>13.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        main(os.path.join(EXTRACTS_DIR, f"book_{sys.argv[1]}", f"chapter_{sys.argv[2]}.txt"))
+    else:
+        main(largest_chapter())
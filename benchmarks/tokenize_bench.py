@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append('.')
+import helpers
+import regex_tokenizer
+
+'''Compares tokenizing a chapter page by page with one nlp.pipe call over the whole chapter,
+and for the basic path with regex_tokenizer (cold: its chunk cache emptied first)
+The token store and the memo are bypassed so every method does the full work
+Run from the repository root:
+    python benchmarks/tokenize_bench.py [number_of_chapters] [batch_size]
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+def sample_chapters(count):
+    chapters = []
+    for book_dir in helpers.list_books(EXTRACTS_DIR):
+        for chapter in helpers.list_chapters(book_dir):
+            chapters.append(os.path.join(book_dir, f"chapter_{chapter}.txt"))
+    random.seed(0)
+    return random.sample(chapters, min(count, len(chapters)))
+
+
+def per_page(pages, detailed):
+    nlp = helpers.get_detailed_nlp() if detailed else helpers.get_basic_nlp()
+    return [helpers.tokens_from_doc(nlp(page), detailed) for page in pages]
+
+
+def batched(pages, detailed, batch_size):
+    return helpers.get_token_info_batch(pages, detailed, batch_size=batch_size, use_store=False)
+
+
+def regex(pages):
+    return [helpers.tokens_from_spans(page, regex_tokenizer.tokenize(page)) for page in pages]
+
+
+def time_chapters(chapters, tokenize):
+    pages_total = 0
+    start = time.perf_counter()
+    for pages in chapters:
+        tokenize(pages)
+        pages_total += len(pages)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(chapters) * 1e3, elapsed / max(pages_total, 1) * 1e3
+
+
+def main(count=50, batch_size=helpers.NLP_BATCH_SIZE):
+    chapters = [[page for _, page in helpers.iter_pages(path)] for path in sample_chapters(count)]
+    print(f"{len(chapters)} chapters, {sum(map(len, chapters))} pages, batch size {batch_size}")
+    print(f"{'pipeline':<10}{'method':<12}{'ms/chapter':>12}{'ms/page':>10}")
+    for detailed, name in [(False, "basic"), (True, "detailed")]:
+        per_page(chapters[0], detailed)
+        for method, tokenize in [("per page", lambda pages: per_page(pages, detailed)),
+                                 ("batched", lambda pages: batched(pages, detailed, batch_size))]:
+            chapter_ms, page_ms = time_chapters(chapters, tokenize)
+            print(f"{name:<10}{method:<12}{chapter_ms:>12.2f}{page_ms:>10.3f}")
+    regex_tokenizer._chunks.clear()
+    for method in ["regex cold", "regex warm"]:
+        chapter_ms, page_ms = time_chapters(chapters, regex)
+        print(f"{'basic':<10}{method:<12}{chapter_ms:>12.2f}{page_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+         int(sys.argv[2]) if len(sys.argv) > 2 else helpers.NLP_BATCH_SIZE)
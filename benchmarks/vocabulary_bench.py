@@ -0,0 +1,72 @@
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append('.')
+import spellcheck
+from book_management.build_vocabulary import corpus_words
+from vocabulary import VOCABULARY_PATH, Vocabulary
+
+'''Measures the vocabulary spellcheck checks typos against, next to a plain Python set of the same words
+Reports load time, memory held after loading and lookup latency for words of the corpus and for typos,
+most typos are not words and are turned down by the Bloom filter alone
+Run from the repository root after book_management/build_vocabulary.py:
+    python benchmarks/vocabulary_bench.py [number_of_lookups]
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+def held(load):
+    '''(result, seconds, bytes still allocated after load returns)'''
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, size
+
+
+def lookup_ns(words, queries):
+    started = time.perf_counter()
+    for query in queries:
+        query in words
+    return (time.perf_counter() - started) / len(queries) * 1e9
+
+
+def main(lookups):
+    if not os.path.isfile(VOCABULARY_PATH):
+        sys.exit(f"{VOCABULARY_PATH} is missing, run python -m book_management.build_vocabulary first")
+    vocabulary, vocabulary_seconds, vocabulary_bytes = held(Vocabulary.load)
+    words, set_seconds, set_bytes = held(lambda: set(vocabulary.word(k) for k in range(len(vocabulary))))
+    _, scan_seconds, _ = held(lambda: corpus_words(EXTRACTS_DIR))
+
+    rng = random.Random(0)
+    hits = rng.choices(sorted(words), k=lookups)
+    typos = []
+    while len(typos) < lookups:
+        word = rng.choice(hits)
+        variants = [variant for kind in (spellcheck.swap_variants, spellcheck.u_variants,
+                                         spellcheck.rz_variants, spellcheck.ch_variants) for variant in kind(word)]
+        if variants:
+            typos.append(rng.choice(variants))
+    real_words = sum(1 for typo in typos if typo in words)
+
+    print(f"{len(vocabulary)} words, {os.path.getsize(VOCABULARY_PATH)} bytes on disk, "
+          f"{real_words} of {lookups} typos are words")
+    print(f"rebuilding from the corpus takes {scan_seconds:.2f} s")
+    print(f"{'structure':<12}{'load ms':>10}{'KB':>10}{'hit ns':>10}{'typo ns':>10}")
+    for name, structure, seconds, size in (("vocabulary", vocabulary, vocabulary_seconds, vocabulary_bytes),
+                                           ("set", words, set_seconds, set_bytes)):
+        print(f"{name:<12}{seconds * 1000:>10.1f}{size / 1024:>10.1f}"
+              f"{lookup_ns(structure, hits):>10.0f}{lookup_ns(structure, typos):>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
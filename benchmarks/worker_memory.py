@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.append('.')
+import process_memory
+
+'''Starts gunicorn with and without preloading and reports the memory of the master and every worker
+Each worker serves a start request of every game first, so the pipelines and caches are in use
+Run from the repository root:
+    python benchmarks/worker_memory.py [workers]
+uss is what every extra worker costs, pss adds up to what the whole server really uses
+'''
+
+PORT = 8091
+GAMES = ["anagram", "spellcheck", "fill-gaps", "switch", "choice", "crossout"]
+
+
+def post(path, body):
+    request = urllib.request.Request(f"http://127.0.0.1:{PORT}{path}", data=json.dumps(body).encode('utf-8'),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.read()
+
+
+def wait_until_up(server, seconds=120):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("gunicorn exited")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("gunicorn did not start")
+
+
+def measure(workers, preload):
+    env = dict(os.environ, PORT=str(PORT), WEB_CONCURRENCY=str(workers), PRELOAD_APP="1" if preload else "0")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(server)
+        # connections are spread over the workers by the kernel, enough requests reach every one
+        for _ in range(workers * 3):
+            for game in GAMES:
+                post(f"/games/{game}/start", {"bookId": 2, "gameType": game, "chapter": 1})
+        master = process_memory.memory(server.pid)
+        worker_usage = [process_memory.memory(pid) for pid in process_memory.children(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+    return master, worker_usage
+
+
+def main(workers=2):
+    print(f"{'mode':<12}{'process':<10}{'rss MB':>10}{'pss MB':>10}{'uss MB':>10}")
+    for preload in (False, True):
+        mode = "preload" if preload else "no preload"
+        master, worker_usage = measure(workers, preload)
+        rows = [("master", master)] + [(f"worker {n}", usage) for n, usage in enumerate(worker_usage, 1)]
+        for name, usage in rows:
+            print(f"{mode:<12}{name:<10}" + "".join(f"{usage.get(key, 0) / 2**20:>10.1f}" for key in ("rss", "pss", "uss")))
+        total = sum(usage.get("pss", 0) for _, usage in rows)
+        print(f"{mode:<12}{'total pss':<10}{total / 2**20:>20.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2)
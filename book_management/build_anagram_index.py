@@ -0,0 +1,24 @@
+import argparse
+import os
+
+from anagram_index import ANAGRAM_INDEX_PATH, AnagramIndex
+from book_management.build_vocabulary import corpus_words
+
+'''Groups the word forms of extracts/ by their sorted letters and saves the groups of two or more forms
+to extracts/anagram_signatures.json, anagram masks words without such a group first and never shows a scramble from one
+Run from the repository root after the extracts change:
+    python -m book_management.build_anagram_index [extracts_dir]
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index the word forms of the extracts by their letters")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    args = parser.parse_args()
+    index = AnagramIndex.from_words(corpus_words(args.extracts_dir))
+    output_path = os.path.join(args.extracts_dir, os.path.basename(ANAGRAM_INDEX_PATH))
+    index.save(output_path)
+    print(f"{output_path}: {len(index.signatures)} shared signatures, "
+          f"{sum(len(forms) for forms in index.signatures.values())} forms, {os.path.getsize(output_path)} bytes")
@@ -0,0 +1,38 @@
+import argparse
+import os
+from itertools import chain
+
+from book_management.build_token_store import book_pages
+from choice import FormIndex
+from distractor_lexicon import LEXICON_NAME, DistractorLexicon
+from helpers import get_token_info_batch, list_books
+
+'''Buckets the words of every book in extracts/ by form and saves them as lexicon.json next to the book,
+choice draws wrong options from it when a page has too few words of the right form
+Run from the repository root after build_token_store, the tokens are then read from the stores:
+    python -m book_management.build_distractor_lexicon [extracts_dir]
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+def build_lexicon(book_dir):
+    pages_tokens = get_token_info_batch(book_pages(book_dir), detailed=True)
+    lexicon = DistractorLexicon.from_index(FormIndex(chain.from_iterable(pages_tokens)))
+    output_path = os.path.join(book_dir, LEXICON_NAME)
+    lexicon.save(output_path)
+    return output_path, lexicon
+
+
+def build_lexicons(extracts_dir=EXTRACTS_DIR):
+    for book_dir in list_books(extracts_dir):
+        output_path, lexicon = build_lexicon(book_dir)
+        print(f"{output_path}: {len(lexicon.buckets)} forms, {len(lexicon.verb_groups)} verb forms, "
+              f"{os.path.getsize(output_path)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bucket the words of every book by form for choice distractors")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    args = parser.parse_args()
+    build_lexicons(args.extracts_dir)
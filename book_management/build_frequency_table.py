@@ -0,0 +1,39 @@
+import argparse
+import os
+from collections import Counter
+
+from book_management.build_token_store import book_pages
+from helpers import get_token_info_batch, list_books
+from word_frequency import FREQUENCY_TABLE_NAME, FrequencyTable
+
+'''Counts every lowercased word of every book in extracts/ and saves the counts as frequencies.json next to the book,
+fill weights its gaps by them for the easy and hard difficulty
+Run from the repository root after build_token_store, the tokens are then read from the stores:
+    python -m book_management.build_frequency_table [extracts_dir]
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+def build_table(book_dir):
+    counts = Counter()
+    for page_tokens in get_token_info_batch(book_pages(book_dir)):
+        counts.update(token.display_word for token in page_tokens)
+    table = FrequencyTable(dict(counts))
+    output_path = os.path.join(book_dir, FREQUENCY_TABLE_NAME)
+    table.save(output_path)
+    return output_path, table
+
+
+def build_tables(extracts_dir=EXTRACTS_DIR):
+    for book_dir in list_books(extracts_dir):
+        output_path, table = build_table(book_dir)
+        print(f"{output_path}: {len(table.counts)} words, {sum(table.counts.values())} tokens, "
+              f"{os.path.getsize(output_path)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the words of every book for fill difficulty")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    args = parser.parse_args()
+    build_tables(args.extracts_dir)
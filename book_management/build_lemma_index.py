@@ -0,0 +1,53 @@
+import argparse
+import os
+from collections import Counter, defaultdict
+
+from book_management.build_token_store import book_pages, BATCH_SIZE
+from helpers import is_word_token, list_books, load_pipeline
+from lemma_index import LEMMA_INDEX_PATH, LemmaIndex
+
+'''Runs the spaCy lemmatizer over every page in extracts/ and saves every lemma with its inflected forms
+to extracts/lemma_forms.json, read by the "correct-form" choice mode
+Run from the repository root after the extracts change:
+    python -m book_management.build_lemma_index [extracts_dir] [--batch-size N] [--n-process N]
+'''
+
+EXTRACTS_DIR = "extracts"
+# the lemmatizer needs the tagging components, only these are left out
+LEMMA_UNUSED_PIPES = ["parser", "ner", "senter"]
+
+
+def count_forms(extracts_dir=EXTRACTS_DIR, batch_size=BATCH_SIZE, n_process=1):
+    '''how often every lowercased form got each lemma and each morph'''
+    nlp = load_pipeline(LEMMA_UNUSED_PIPES)
+    form_lemmas = defaultdict(Counter)
+    form_morphs = defaultdict(Counter)
+    for book_dir in list_books(extracts_dir):
+        for doc in nlp.pipe(book_pages(book_dir), batch_size=batch_size, n_process=n_process):
+            for token in doc:
+                if is_word_token(token) and token.lemma_.strip():
+                    form = token.text.lower()
+                    form_lemmas[form][token.lemma_.lower()] += 1
+                    form_morphs[form][str(token.morph)] += 1
+    return form_lemmas, form_morphs
+
+
+def build_index(form_lemmas, form_morphs):
+    lemmas = defaultdict(list)
+    for form in sorted(form_lemmas):
+        lemma = form_lemmas[form].most_common(1)[0][0]
+        lemmas[lemma].append((form, form_morphs[form].most_common(1)[0][0]))
+    # a lemma seen in a single form offers nothing to choose from
+    return LemmaIndex({lemma: forms for lemma, forms in lemmas.items() if len(forms) > 1})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index the inflected forms of every lemma in the extracts")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+    index = build_index(*count_forms(args.extracts_dir, args.batch_size, args.n_process))
+    output_path = os.path.join(args.extracts_dir, os.path.basename(LEMMA_INDEX_PATH))
+    index.save(output_path)
+    print(f"{output_path}: {len(index.lemmas)} lemmas, {len(index.form_lemmas)} forms, {os.path.getsize(output_path)} bytes")
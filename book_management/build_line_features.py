@@ -0,0 +1,29 @@
+import argparse
+import os
+
+import line_index
+from helpers import list_books
+from line_features import LINE_FEATURES_NAME, LineFeatures
+
+'''Computes the feature vector of every line of every book in extracts/ and saves them as line_features.npy
+next to the book, crossout picks the lines it slips into a page by them
+Run from the repository root after the extracts change:
+    python -m book_management.build_line_features [extracts_dir]
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+def build_features(extracts_dir=EXTRACTS_DIR):
+    for book_dir in list_books(extracts_dir):
+        features = LineFeatures.from_index(line_index.for_book(book_dir))
+        output_path = os.path.join(book_dir, LINE_FEATURES_NAME)
+        features.save(output_path)
+        print(f"{output_path}: {len(features)} lines, {os.path.getsize(output_path)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the line features of every book for crossout")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    args = parser.parse_args()
+    build_features(args.extracts_dir)
@@ -0,0 +1,51 @@
+import argparse
+import os
+
+from helpers import get_detailed_nlp, is_word_token, list_books, list_chapters, iter_pages
+from token_store import TOKEN_STORE_NAME, page_hash, write_store
+
+'''Runs spaCy once over every page in extracts/ and saves the word tokens of each book to tokens.npz,
+get_token_info and get_token_info_basic read them instead of running the model on request
+Run from the repository root after the extracts change:
+    python -m book_management.build_token_store [extracts_dir] [--batch-size N] [--n-process N]
+--n-process above 1 lets spaCy annotate a book in several worker processes
+'''
+
+EXTRACTS_DIR = "extracts"
+BATCH_SIZE = 64
+
+
+def book_pages(book_dir):
+    '''every distinct page of a book in chapter order'''
+    pages = {}
+    for chapter in list_chapters(book_dir):
+        for _, page in iter_pages(os.path.join(book_dir, f"chapter_{chapter}.txt")):
+            pages.setdefault(page_hash(page), page)
+    return list(pages.values())
+
+
+def annotate_book(book_dir, batch_size=BATCH_SIZE, n_process=1):
+    pages = book_pages(book_dir)
+    annotated = []
+    for page, doc in zip(pages, get_detailed_nlp().pipe(pages, batch_size=batch_size, n_process=n_process)):
+        tokens = [(token.idx, token.idx + len(token.text), token.i, token.pos, str(token.morph))
+                  for token in doc if is_word_token(token)]
+        annotated.append((page, tokens))
+    output_path = os.path.join(book_dir, TOKEN_STORE_NAME)
+    write_store(output_path, annotated)
+    return output_path, len(annotated)
+
+
+def build_token_stores(extracts_dir=EXTRACTS_DIR, batch_size=BATCH_SIZE, n_process=1):
+    for book_dir in list_books(extracts_dir):
+        output_path, page_count = annotate_book(book_dir, batch_size, n_process)
+        print(f"{output_path}: {page_count} pages, {os.path.getsize(output_path)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute word tokens of every book")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+    build_token_stores(args.extracts_dir, args.batch_size, args.n_process)
@@ -0,0 +1,33 @@
+import argparse
+import os
+
+from book_management.check_regex_tokenizer import corpus_pages
+from regex_tokenizer import tokenize
+from vocabulary import VOCABULARY_PATH, Vocabulary
+
+'''Collects every word form in extracts/ with regex_tokenizer and saves them to extracts/vocabulary.npz,
+spellcheck leaves out typos that are words of this vocabulary
+Run from the repository root after the extracts change:
+    python -m book_management.build_vocabulary [extracts_dir]
+'''
+
+EXTRACTS_DIR = "extracts"
+
+
+def corpus_words(extracts_dir=EXTRACTS_DIR):
+    words = set()
+    for _, _, page in corpus_pages(extracts_dir):
+        for start, finish, _ in tokenize(page):
+            words.add(page[start:finish].lower())
+    return words
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect the word forms of the extracts")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    args = parser.parse_args()
+    vocabulary = Vocabulary.from_words(corpus_words(args.extracts_dir))
+    output_path = os.path.join(args.extracts_dir, os.path.basename(VOCABULARY_PATH))
+    vocabulary.save(output_path)
+    print(f"{output_path}: {len(vocabulary)} words, {len(vocabulary.blob)} bytes of words, "
+          f"{len(vocabulary.bloom)} bytes of Bloom filter, {os.path.getsize(output_path)} bytes")
@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+
+from helpers import get_basic_nlp, tokens_from_doc, list_books, list_chapters, iter_pages
+from regex_tokenizer import tokenize
+
+'''Compares regex_tokenizer with the spaCy tokenizer on every page in extracts/ and prints every divergence
+Run from the repository root after the extracts or the spaCy model change:
+    python -m book_management.check_regex_tokenizer [extracts_dir]
+'''
+
+EXTRACTS_DIR = "extracts"
+BATCH_SIZE = 64
+
+
+def corpus_pages(extracts_dir=EXTRACTS_DIR):
+    '''(extract path, page index, page) of every page in extracts/'''
+    for book_dir in list_books(extracts_dir):
+        for chapter in list_chapters(book_dir):
+            extract_path = os.path.join(book_dir, f"chapter_{chapter}.txt")
+            for page_index, page in iter_pages(extract_path):
+                yield extract_path, page_index, page
+
+
+def divergences(pages):
+    '''yields (extract path, page index, spaCy token, regex token) for the first differing word token of every page,
+    a token is (start, finish, i) and None when one side has fewer tokens'''
+    pages = list(pages)
+    docs = get_basic_nlp().pipe((page for _, _, page in pages), batch_size=BATCH_SIZE)
+    for (extract_path, page_index, page), doc in zip(pages, docs):
+        expected = [(token.start, token.finish, token.i) for token in tokens_from_doc(doc, False)]
+        found = tokenize(page)
+        if expected != found:
+            for position in range(max(len(expected), len(found))):
+                spacy_token = expected[position] if position < len(expected) else None
+                regex_token = found[position] if position < len(found) else None
+                if spacy_token != regex_token:
+                    yield extract_path, page_index, spacy_token, regex_token
+                    break
+
+
+def describe(page, token):
+    return "nothing" if token is None else f"{page[token[0]:token[1]]!r} {token}"
+
+
+def check_corpus(extracts_dir=EXTRACTS_DIR):
+    pages = {(path, index): page for path, index, page in corpus_pages(extracts_dir)}
+    count = 0
+    for extract_path, page_index, spacy_token, regex_token in divergences((path, index, page) for (path, index), page in pages.items()):
+        page = pages[(extract_path, page_index)]
+        print(f"{extract_path} page {page_index}: spaCy {describe(page, spacy_token)}, regex {describe(page, regex_token)}")
+        count += 1
+    print(f"{len(pages)} pages, {count} divergent")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare regex_tokenizer with spaCy")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    args = parser.parse_args()
+    sys.exit(1 if check_corpus(args.extracts_dir) else 0)
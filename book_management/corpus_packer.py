@@ -0,0 +1,148 @@
+import argparse
+import os
+import zlib
+from array import array
+
+from helpers import build_page_index
+from corpus import (PACK_NAME, PACK_MAGIC, HEADER, COMPRESSED_PACK_NAME, COMPRESSED_PACK_MAGIC,
+                    COMPRESSED_HEADER, BLOCK_PAGES, CHAPTER_ENTRY, CHAPTER_FILE, BOOK_FORMATS)
+
+'''Packs every extracts/book_N folder into a single file read by corpus.py
+Run from the repository root after the extracts change:
+    python -m book_management.corpus_packer [extracts_dir] [--format packed|compressed] [--prune]
+--prune removes chapter_*.txt and all_lines.txt once the packed book reads back the same,
+it is meant for the container image only
+'''
+
+EXTRACTS_DIR = "extracts"
+LINES_NAME = "all_lines.txt"
+
+
+def read_chapter_pages(extract_path):
+    '''returns consecutive pages of a chapter as utf-8 bytes, exactly as read_page returns them'''
+    index = build_page_index(extract_path)
+    with open(extract_path, 'rb') as extract_file:
+        data = extract_file.read()
+    pages = []
+    page_index = 1
+    while page_index in index:
+        start, end = index[page_index]
+        pages.append(data[start:end])
+        page_index += 1
+    return pages
+
+
+def read_book(book_dir):
+    '''returns chapter table entries, all pages in chapter order and the line pool of a book'''
+    chapters = []
+    for filename in os.listdir(book_dir):
+        chapter_file = CHAPTER_FILE.fullmatch(filename)
+        if chapter_file:
+            chapters.append((int(chapter_file.group(1)), os.path.join(book_dir, filename)))
+    chapters.sort()
+
+    chapter_entries = []
+    pages = []
+    for number, extract_path in chapters:
+        chapter_pages = read_chapter_pages(extract_path)
+        chapter_entries.append((number, len(pages), len(chapter_pages)))
+        pages.extend(chapter_pages)
+
+    lines = b""
+    lines_path = os.path.join(book_dir, LINES_NAME)
+    if os.path.exists(lines_path):
+        with open(lines_path, 'rb') as lines_file:
+            lines = lines_file.read()
+    return chapter_entries, pages, lines
+
+
+def page_offsets(pages, start=0):
+    offsets = array("Q", [start])
+    for page in pages:
+        offsets.append(offsets[-1] + len(page))
+    return offsets
+
+
+def pack_book(book_dir, output_path=None):
+    chapter_entries, pages, lines = read_book(book_dir)
+
+    text_start = HEADER.size + CHAPTER_ENTRY.size * len(chapter_entries) + 8 * (len(pages) + 1)
+    offsets = page_offsets(pages, text_start)
+    lines_start = offsets[-1]
+
+    if output_path is None:
+        output_path = os.path.join(book_dir, PACK_NAME)
+    with open(output_path, 'wb') as pack_file:
+        pack_file.write(HEADER.pack(PACK_MAGIC, len(chapter_entries), len(pages), lines_start, lines_start + len(lines)))
+        for entry in chapter_entries:
+            pack_file.write(CHAPTER_ENTRY.pack(*entry))
+        pack_file.write(offsets.tobytes())
+        for page in pages:
+            pack_file.write(page)
+        pack_file.write(lines)
+    return output_path
+
+
+def compress_book(book_dir, output_path=None, block_pages=BLOCK_PAGES):
+    chapter_entries, pages, lines = read_book(book_dir)
+
+    offsets = page_offsets(pages)
+    blocks = [zlib.compress(b"".join(pages[first:first + block_pages]), 9) for first in range(0, len(pages), block_pages)]
+    compressed_lines = zlib.compress(lines, 9)
+
+    data_start = (COMPRESSED_HEADER.size + CHAPTER_ENTRY.size * len(chapter_entries)
+                  + 8 * (len(pages) + 1) + 8 * (len(blocks) + 1))
+    block_offsets = page_offsets(blocks, data_start)
+    lines_start = block_offsets[-1]
+
+    if output_path is None:
+        output_path = os.path.join(book_dir, COMPRESSED_PACK_NAME)
+    with open(output_path, 'wb') as pack_file:
+        pack_file.write(COMPRESSED_HEADER.pack(COMPRESSED_PACK_MAGIC, len(chapter_entries), len(pages), len(blocks),
+                                               block_pages, lines_start, lines_start + len(compressed_lines)))
+        for entry in chapter_entries:
+            pack_file.write(CHAPTER_ENTRY.pack(*entry))
+        pack_file.write(offsets.tobytes())
+        pack_file.write(block_offsets.tobytes())
+        for block in blocks:
+            pack_file.write(block)
+        pack_file.write(compressed_lines)
+    return output_path
+
+
+PACKERS = {
+    "packed": pack_book,
+    "compressed": compress_book,
+}
+
+
+def prune_book(book_dir, output_path, corpus_format):
+    '''removes the text files of a book after checking that the packed file holds the same pages'''
+    book = BOOK_FORMATS[corpus_format][1](output_path)
+    chapter_entries, pages, lines = read_book(book_dir)
+    for number, first_page, page_count in chapter_entries:
+        for page_index in range(1, page_count + 1):
+            if bytes(book.page(number, page_index)) != pages[first_page + page_index - 1]:
+                raise ValueError(f"{output_path} differs from chapter_{number}.txt, page {page_index}")
+    for filename in os.listdir(book_dir):
+        if CHAPTER_FILE.fullmatch(filename) or filename == LINES_NAME:
+            os.remove(os.path.join(book_dir, filename))
+
+
+def pack_corpus(extracts_dir=EXTRACTS_DIR, corpus_format="packed", prune=False):
+    for name in sorted(os.listdir(extracts_dir)):
+        book_dir = os.path.join(extracts_dir, name)
+        if os.path.isdir(book_dir):
+            output_path = PACKERS[corpus_format](book_dir)
+            print(f"{output_path}: {os.path.getsize(output_path)} bytes")
+            if prune:
+                prune_book(book_dir, output_path, corpus_format)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack extracts into one file per book")
+    parser.add_argument("extracts_dir", nargs="?", default=EXTRACTS_DIR)
+    parser.add_argument("--format", choices=sorted(PACKERS), default="packed")
+    parser.add_argument("--prune", action="store_true")
+    args = parser.parse_args()
+    pack_corpus(args.extracts_dir, args.format, args.prune)
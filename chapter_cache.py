@@ -0,0 +1,65 @@
+import os
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+'''Process wide cache of chapters split into pages
+Entries are evicted least recently used first once their size goes over the byte budget
+and reloaded when the file they were read from has a different mtime
+'''
+
+CHAPTER_CACHE_BYTES = int(os.environ.get("CHAPTER_CACHE_BYTES", 32 * 1024 * 1024))
+
+
+def pages_size(pages: Dict[int, str]) -> int:
+    return sys.getsizeof(pages) + sum(sys.getsizeof(page) for page in pages.values())
+
+
+class ChapterCache:
+    def __init__(self, max_bytes: int = CHAPTER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, source_path: str, load: Callable[[], Dict[int, str]]) -> Dict[int, str]:
+        '''returns cached pages of a chapter, calling load() when missing or when source_path changed'''
+        stamp = (source_path, os.stat(source_path).st_mtime)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        if entry is not None:
+            self._remove(key)
+        pages = load()
+        size = pages_size(pages)
+        if size <= self.max_bytes:
+            self._entries[key] = (stamp, pages, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return pages
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self.size -= size
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
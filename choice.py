@@ -1,58 +1,70 @@
-from helpers import read_page, get_token_info
+from helpers import iter_pages, get_token_info, get_token_info_batch
 import random
-import spacy
+from spacy.symbols import NOUN, VERB, ADJ
+from morph_table import MORPHS
 from word_token_detailed import Word_Token_Detailed
-from typing import List, Tuple, Dict, Any
+import lemma_index
+from typing import List, Tuple, Dict, Any, Set
 import uuid
 
 MIN_WORDS = 3
 MAX_WORDS = 3
+# same-form: the wrong options are other words in the form of the masked one
+# correct-form: the wrong options are other forms of the masked word, from lemma_index
+CHOICE_MODES = ("same-form", "correct-form")
 COLOR_START = "\033[91m"
 COLOR_RESET = "\033[0m"
 
-def find_same_form_candidates(word_token: Dict[str, Any], all_tokens: List[Dict[str, Any]]) -> List[str]:
-    correct_pos = word_token.pos
-    correct_morph = word_token.morph.to_dict()
-    candidates = []
-
-    for tok in all_tokens:
-        if tok.display_word == word_token.display_word:
-            continue
-        if tok.pos != correct_pos:
-            continue
-        if tok.display_word in candidates:
-            continue
-
-        tok_morph = tok.morph.to_dict()
-
-        if correct_pos == "NOUN":
-            if tok_morph.get("Case") == correct_morph.get("Case") and tok_morph.get("Number") == correct_morph.get("Number"):
-                candidates.append(tok.display_word)
-                continue
-
-        elif correct_pos == "VERB":
-            features = ["Mood", "Tense", "Person", "Number", "Aspect"]
-            shared = sum(1 for f in features if tok_morph.get(f) == correct_morph.get(f))
-            if shared >= 2:
-                candidates.append(tok.display_word)
-                continue
-
-        elif correct_pos == "ADJ":
-            if tok_morph.get("Case") == correct_morph.get("Case") and tok_morph.get("Number") == correct_morph.get("Number") and tok_morph.get("Gender") == correct_morph.get("Gender"):
-                candidates.append(tok.display_word)
-                continue
-
-        elif correct_pos == "ADV":
-            candidates.append(tok.display_word)
-            continue
-
+# features a candidate has to share with the masked word, per part of speech
+SAME_FORM_FEATURES = {
+    NOUN: ("Case", "Number"),
+    ADJ: ("Case", "Number", "Gender"),
+}
+# a verb is a candidate when it shares at least VERB_SHARED_FEATURES of these
+VERB_FEATURES = ("Mood", "Tense", "Person", "Number", "Aspect")
+VERB_SHARED_FEATURES = 2
+
+def form_key(tok) -> Tuple:
+    '''part of speech and the features a same form candidate has to share, verbs are grouped apart by FormIndex'''
+    return tok.pos, MORPHS.key(tok.morph_id, SAME_FORM_FEATURES.get(tok.pos, ()))
+
+class FormIndex:
+    '''words of a page, or of any tokens such as a whole chapter, bucketed by form_key
+    verbs are grouped by their VERB_FEATURES values, the groups sharing enough of them are joined once per group'''
+    def __init__(self, tokens):
+        self.buckets: Dict[Tuple, Set[str]] = {}
+        self.verb_groups: Dict[Tuple, Set[str]] = {}
+        self._verb_candidates: Dict[Tuple, Set[str]] = {}
+        for tok in tokens:
+            if tok.pos == VERB:
+                self.verb_groups.setdefault(MORPHS.key(tok.morph_id, VERB_FEATURES), set()).add(tok.display_word)
+            else:
+                self.buckets.setdefault(form_key(tok), set()).add(tok.display_word)
+
+    def verb_candidates(self, features: Tuple) -> Set[str]:
+        words = self._verb_candidates.get(features)
+        if words is None:
+            words = set()
+            for group, group_words in self.verb_groups.items():
+                if sum(1 for value, correct in zip(group, features) if value == correct) >= VERB_SHARED_FEATURES:
+                    words |= group_words
+            self._verb_candidates[features] = words
+        return words
+
+    def candidates(self, word_token) -> Set[str]:
+        if word_token.pos == VERB:
+            words = self.verb_candidates(MORPHS.key(word_token.morph_id, VERB_FEATURES))
         else:
-            candidates.append(tok.display_word)
+            words = self.buckets.get(form_key(word_token), set())
+        return words - {word_token.display_word}
 
-    return list(set(candidates))
+def find_same_form_candidates(word_token, all_tokens: List) -> List[str]:
+    '''other words of the page with the part of speech of word_token and, for nouns, adjectives and verbs, its form'''
+    return list(FormIndex(all_tokens).candidates(word_token))
 
-def generate_riddle(page: str) -> Tuple[str, List[Dict[str, Any]]]:
-    word_tokens = get_token_info(page)
+def generate_riddle(page: str, word_tokens: List[Word_Token_Detailed] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    if word_tokens is None:
+        word_tokens = get_token_info(page)
     if not word_tokens:
         return page, []
 
@@ -76,11 +88,15 @@ def generate_riddle(page: str) -> Tuple[str, List[Dict[str, Any]]]:
 
     return masked_page, masked_tokens
 
-def generate_options_for_masked(masked_tokens: List[Dict[str, Any]], all_tokens: List[Dict[str, Any]]):
+def generate_options_for_masked(masked_tokens: List[Dict[str, Any]], all_tokens: List[Dict[str, Any]], lexicon=None):
+    '''lexicon is the book's distractor_lexicon, used when the page has fewer than 2 candidates'''
     out = {}
+    form_index = FormIndex(all_tokens)
     for tok in masked_tokens:
         correct = tok.display_word
-        candidates = find_same_form_candidates(tok, all_tokens)
+        candidates = list(form_index.candidates(tok))
+        if len(candidates) < 2 and lexicon is not None:
+            candidates.extend(lexicon.sample(tok, 2 - len(candidates), {correct, *candidates}))
 
         fillers = [t.display_word for t in all_tokens if t.display_word != correct]
 
@@ -97,26 +113,27 @@ def generate_options_for_masked(masked_tokens: List[Dict[str, Any]], all_tokens:
 
 def generate_level(path: str):
     pages_output = []
-    count = 1
-    while True:
-        page = read_page(path, count)
-        if not page:
-            break
-
-        masked_page, masked_tokens = generate_riddle(page)
-        all_tokens = get_token_info(page)
+    pages = [page for _, page in iter_pages(path)]
+    for page, all_tokens in zip(pages, get_token_info_batch(pages, detailed=True)):
+        masked_page, masked_tokens = generate_riddle(page, all_tokens)
         options = generate_options_for_masked(masked_tokens, all_tokens)
 
         pages_output.append((masked_page, masked_tokens, options))
-        count += 1
     return pages_output
 
-def transform_to_choice_model(page_text: str, all_tokens: List, masked_indices: set) -> Dict[str, Any]:
+def correct_form_indices(word_tokens: List, forms) -> List[int]:
+    '''positions of the words forms (a lemma_index.LemmaIndex) knows at least two other forms of'''
+    return [i for i, tok in enumerate(word_tokens) if len(forms.other_forms(tok.display_word)) >= 2]
+
+def transform_to_choice_model(page_text: str, all_tokens: List, masked_indices: set, lexicon=None, forms=None) -> Dict[str, Any]:
+    '''lexicon is the book's distractor_lexicon, wrong options come from it before falling back to any word of the page,
+    with forms (a lemma_index.LemmaIndex) the wrong options are other forms of the masked word instead'''
     parts = []
     gaps = []
     last_idx = 0
     
     sorted_tokens = sorted(all_tokens, key=lambda x: x.start)
+    form_index = FormIndex(sorted_tokens)
     
     current_text_accumulator = ""
 
@@ -133,10 +150,15 @@ def transform_to_choice_model(page_text: str, all_tokens: List, masked_indices:
             parts.append({"type": "gap", "gapId": gap_id})
             
             correct_val = tok.display_word
-            candidates = find_same_form_candidates(tok, sorted_tokens)
+            if forms is not None:
+                candidates = forms.other_forms(correct_val)
+            else:
+                candidates = list(form_index.candidates(tok))
             fillers = [t.display_word for t in sorted_tokens if t.display_word != correct_val]
             
             wrong = random.sample(candidates, min(len(candidates), 2))
+            if len(wrong) < 2 and lexicon is not None:
+                wrong.extend(lexicon.sample(tok, 2 - len(wrong), {correct_val, *wrong}))
             if len(wrong) < 2:
                 extra = random.sample(fillers, 2 - len(wrong))
                 wrong.extend(extra)
@@ -173,6 +195,50 @@ def transform_to_choice_model(page_text: str, all_tokens: List, masked_indices:
     }
 
 
+def build_choice_game(extract_path: str, mode: str = "same-form"):
+    '''riddles of every page of a chapter and the state needed to check the answers, mode is one of CHOICE_MODES'''
+    riddles = []
+    correct_answers_state = {}
+    page_to_gap_ids = {}
+
+    pages = list(iter_pages(extract_path))
+    pages_tokens = get_token_info_batch([page_content for _, page_content in pages], detailed=True)
+    # distractor_lexicon imports this module, so it is imported here and not at the top
+    import distractor_lexicon
+    lexicon = distractor_lexicon.for_extract(extract_path)
+    forms = lemma_index.get_index() if mode == "correct-form" else None
+
+    for (page_idx, page_content), word_tokens in zip(pages, pages_tokens):
+        if not word_tokens:
+            continue
+
+        if forms is None:
+            max_to_mask = min(len(word_tokens), 3)
+            chosen_indices = set(random.sample(range(len(word_tokens)), random.randint(3, max_to_mask)))
+        else:
+            maskable = correct_form_indices(word_tokens, forms)
+            if not maskable:
+                continue
+            chosen_indices = set(random.sample(maskable, min(len(maskable), 3)))
+        
+        page_data = transform_to_choice_model(page_content, word_tokens, chosen_indices, lexicon, forms)
+        
+        current_page_gaps = set()
+        for gap in page_data["gaps"]:
+            gap_id = gap["id"]
+            correct_answers_state[gap_id] = gap["correctOptionId"]
+            current_page_gaps.add(gap_id)
+
+        page_to_gap_ids[page_idx] = current_page_gaps
+        riddles.append(page_data)
+
+    return riddles, {
+        "correct_answers": correct_answers_state,
+        "page_to_gap_ids": page_to_gap_ids,
+        "total_pages": len(riddles)
+    }
+
+
 if __name__ == "__main__":
     pages_data = generate_level("extracts/Zwierciadlana zagadka/Zwierciadlana zagadka_part_1.txt")
 
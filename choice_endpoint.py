@@ -4,8 +4,8 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 import random
 
-from helpers import read_page, get_token_info
-from choice import transform_to_choice_model
+from choice import build_choice_game, CHOICE_MODES
+from generation_service import generate, GenerationBusy, GenerationTimeout
 
 class ChoiceOption(BaseModel):
     id: str
@@ -15,6 +15,7 @@ class GameRequest(BaseModel):
     bookId: int
     gameType: str  
     chapter: int
+    mode: str = "same-form"
 
 class ChoiceGap(BaseModel):
     id: str
@@ -59,59 +60,29 @@ active_games: Dict[int, Dict[str, Any]] = {}
 async def start_choice_game(request: GameRequest):
     if request.gameType != 'choice':
         raise HTTPException(status_code=400, detail="Invalid game type")
+    if request.mode not in CHOICE_MODES:
+        raise HTTPException(status_code=400, detail="Invalid choice mode")
     
     try:
         extract_path = f"extracts/book_{request.bookId}/chapter_{request.chapter}.txt"
-        game_id = random.randint(1000, 9999)
-        while (game_id in active_games):
-            game_id = random.randint(1000, 9999)
-        all_pages_responses = []
-        correct_answers_state = {}
-        page_to_gap_ids = {}
-        page_idx = 1
-
-        while True:
-            page_content = read_page(extract_path, page_idx)
-            if not page_content:
-                break
-            
-            word_tokens = get_token_info(page_content)
-            if not word_tokens:
-                page_idx += 1
-                continue
-
-            max_to_mask = min(len(word_tokens), 3)
-            chosen_indices = set(random.sample(range(len(word_tokens)), random.randint(3, max_to_mask)))
-            
-            page_data = transform_to_choice_model(page_content, word_tokens, chosen_indices)
-            
-            current_page_gaps = set()
-            for gap in page_data["gaps"]:
-                gap_id = gap["id"]
-                correct_answers_state[gap_id] = gap["correctOptionId"]
-                current_page_gaps.add(gap_id)
-
-            page_to_gap_ids[page_idx] = current_page_gaps
-            all_pages_responses.append(ChoiceResponse(
-                gameId=game_id,
-                riddle=ChoiceRiddle(**page_data)
-            ))
-            page_idx += 1
-
-        if not all_pages_responses:
-            raise HTTPException(status_code=404, detail="Chapter not found")
-
-        active_games[game_id] = {
-            "start_time": datetime.now(),
-            "correct_answers": correct_answers_state,
-            "page_to_gap_ids": page_to_gap_ids,
-            "total_pages": len(all_pages_responses)
-        }
-
-        return all_pages_responses
+        riddles, game_state = await generate(build_choice_game, extract_path, request.mode)
+    except GenerationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except GenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not riddles:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+
+    game_id = random.randint(1000, 9999)
+    while (game_id in active_games):
+        game_id = random.randint(1000, 9999)
+    active_games[game_id] = {**game_state, "start_time": datetime.now()}
+
+    return [ChoiceResponse(gameId=game_id, riddle=ChoiceRiddle(**riddle)) for riddle in riddles]
+
 @router.post("/choice/submit", response_model=ResultResponse)
 async def submit_choice_answers(request: ChoiceAnswerRequest):
     if request.gameId not in active_games:
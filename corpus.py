@@ -0,0 +1,206 @@
+import mmap
+import os
+import re
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+'''This module reads packed books made by book_management/corpus_packer.py
+A packed book holds every chapter of extracts/book_N in one file so a whole book
+is served from a single memory map instead of hundreds of small chapter files.
+
+CORPUS_FORMAT (environment variable) picks what is read:
+    text        chapter_*.txt files only
+    packed      book.pack, plain utf-8 pages (default)
+    compressed  book.zpack, pages zlib compressed in blocks of BLOCK_PAGES pages
+Books without a file in the chosen format are read from the text files, and so is a chapter_M.txt
+edited after its book was packed, until the pack is rebuilt.
+
+book.pack layout (little endian):
+    header      magic, chapter count, page count, start and end of the line pool
+    chapters    (chapter number, first page, page count) for every chapter
+    offsets     page count + 1 offsets into the file, page k spans offsets[k]..offsets[k+1]
+    text        utf-8 text of every page followed by the line pool (all_lines.txt)
+
+book.zpack layout (little endian):
+    header      magic, chapter count, page count, block count, start and end of the line pool
+    chapters    same as in book.pack
+    pages       page count + 1 offsets into the decompressed text of every page
+    blocks      block count + 1 offsets into the file, block b holds pages b*BLOCK_PAGES onwards
+    data        zlib compressed blocks followed by the zlib compressed line pool
+'''
+
+PACK_NAME = "book.pack"
+PACK_MAGIC = b"PLGPACK1"
+HEADER = struct.Struct("<8sIIQQ")
+
+COMPRESSED_PACK_NAME = "book.zpack"
+COMPRESSED_PACK_MAGIC = b"PLGZPAK1"
+COMPRESSED_HEADER = struct.Struct("<8sIIIIQQ")
+BLOCK_PAGES = 16
+
+CHAPTER_ENTRY = struct.Struct("<III")
+CHAPTER_FILE = re.compile(r"chapter_(\d+)\.txt")
+
+CORPUS_FORMAT = os.environ.get("CORPUS_FORMAT", "packed")
+BLOCK_CACHE_SIZE = int(os.environ.get("CORPUS_BLOCK_CACHE", 64))
+
+_open_books: Dict[Tuple[str, str], "PackedBook"] = {}
+_block_cache: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+
+
+def read_chapter_table(data, position, chapter_count):
+    chapters = {}
+    for _ in range(chapter_count):
+        number, first_page, pages = CHAPTER_ENTRY.unpack_from(data, position)
+        chapters[number] = (first_page, pages)
+        position += CHAPTER_ENTRY.size
+    return chapters, position
+
+
+class PackedBook:
+    def __init__(self, pack_path: str):
+        self.path = pack_path
+        with open(pack_path, 'rb') as pack_file:
+            self.mtime = os.fstat(pack_file.fileno()).st_mtime
+            self._mmap = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._parse_header()
+
+    def _parse_header(self):
+        magic, chapter_count, page_count, lines_start, lines_end = HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{self.path} is not a packed book")
+        self.chapters, position = read_chapter_table(self._mmap, HEADER.size, chapter_count)
+        self._offsets = self._view[position:position + 8 * (page_count + 1)].cast("Q")
+        self._lines = (lines_start, lines_end)
+
+    def _page_at(self, position: int) -> memoryview:
+        return self._view[self._offsets[position]:self._offsets[position + 1]]
+
+    def _line_pool_text(self) -> str:
+        lines_start, lines_end = self._lines
+        return str(self._view[lines_start:lines_end], 'utf-8')
+
+    def page_count(self, chapter: int) -> int:
+        return self.chapters.get(chapter, (0, 0))[1]
+
+    def page(self, chapter: int, page_index: int) -> Optional[memoryview]:
+        '''returns the raw utf-8 bytes of a page as a slice of the map, nothing is copied'''
+        if chapter not in self.chapters:
+            return None
+        first_page, pages = self.chapters[chapter]
+        if not 1 <= page_index <= pages:
+            return None
+        return self._page_at(first_page + page_index - 1)
+
+    def page_text(self, chapter: int, page_index: int) -> Optional[str]:
+        page = self.page(chapter, page_index)
+        if page is None:
+            return None
+        return str(page, 'utf-8')
+
+    def iter_pages(self, chapter: int):
+        '''yields (page_index, page) until the first empty page, same as helpers.iter_pages'''
+        for page_index in range(1, self.page_count(chapter) + 1):
+            page = self.page_text(chapter, page_index)
+            if not page:
+                return
+            yield page_index, page
+
+    def chapter_lines(self, chapter: int) -> List[str]:
+        '''all non empty lines of a chapter, stripped'''
+        lines = []
+        for page_index in range(1, self.page_count(chapter) + 1):
+            lines.extend(line.strip() for line in self.page_text(chapter, page_index).split("\n") if line.strip())
+        return lines
+
+    def line_pool(self) -> List[str]:
+        '''all non empty lines of the book as stored in all_lines.txt, stripped'''
+        text = self._line_pool_text()
+        return [line.strip() for line in text.split("\n") if line.strip() and "| Page " not in line]
+
+
+class CompressedBook(PackedBook):
+    '''packed book whose pages are stored in zlib blocks, only the block holding a page is inflated'''
+
+    def _parse_header(self):
+        magic, chapter_count, page_count, block_count, block_pages, lines_start, lines_end = COMPRESSED_HEADER.unpack_from(self._mmap, 0)
+        if magic != COMPRESSED_PACK_MAGIC:
+            raise ValueError(f"{self.path} is not a compressed book")
+        self.chapters, position = read_chapter_table(self._mmap, COMPRESSED_HEADER.size, chapter_count)
+        self._offsets = self._view[position:position + 8 * (page_count + 1)].cast("Q")
+        position += 8 * (page_count + 1)
+        self._blocks = self._view[position:position + 8 * (block_count + 1)].cast("Q")
+        self._block_pages = block_pages
+        self._lines = (lines_start, lines_end)
+
+    def _block(self, block: int) -> bytes:
+        key = (self.path, block)
+        data = _block_cache.get(key)
+        if data is not None:
+            _block_cache.move_to_end(key)
+            return data
+        data = zlib.decompress(self._view[self._blocks[block]:self._blocks[block + 1]])
+        _block_cache[key] = data
+        if len(_block_cache) > BLOCK_CACHE_SIZE:
+            _block_cache.popitem(last=False)
+        return data
+
+    def _page_at(self, position: int) -> memoryview:
+        block = position // self._block_pages
+        block_start = self._offsets[block * self._block_pages]
+        data = memoryview(self._block(block))
+        return data[self._offsets[position] - block_start:self._offsets[position + 1] - block_start]
+
+    def _line_pool_text(self) -> str:
+        lines_start, lines_end = self._lines
+        return zlib.decompress(self._view[lines_start:lines_end]).decode('utf-8')
+
+
+BOOK_FORMATS = {
+    "packed": (PACK_NAME, PackedBook),
+    "compressed": (COMPRESSED_PACK_NAME, CompressedBook),
+}
+
+
+def open_book(book_dir: str, corpus_format: Optional[str] = None) -> Optional[PackedBook]:
+    '''returns the book of a folder in extracts/ in the configured format, opened once per process,
+    or None if the book has no file in that format'''
+    corpus_format = corpus_format or CORPUS_FORMAT
+    if corpus_format not in BOOK_FORMATS:
+        return None
+    key = (os.path.normpath(book_dir), corpus_format)
+    book = _open_books.get(key)
+    if book is None:
+        file_name, book_class = BOOK_FORMATS[corpus_format]
+        pack_path = os.path.join(key[0], file_name)
+        if not os.path.isfile(pack_path):
+            return None
+        book = book_class(pack_path)
+        _open_books[key] = book
+    return book
+
+
+def find_chapter(extract_path: str, corpus_format: Optional[str] = None) -> Optional[Tuple[PackedBook, int]]:
+    '''maps extracts/book_N/chapter_M.txt to (book, M) when that book is available in the configured format
+    and chapter_M.txt, if it is still there, is not newer than the book'''
+    chapter_file = CHAPTER_FILE.fullmatch(os.path.basename(extract_path))
+    if not chapter_file:
+        return None
+    book = open_book(os.path.dirname(extract_path), corpus_format)
+    if book is None or int(chapter_file.group(1)) not in book.chapters:
+        return None
+    try:
+        if os.stat(extract_path).st_mtime > book.mtime:
+            return None
+    except FileNotFoundError:
+        pass
+    return book, int(chapter_file.group(1))
+
+
+def close_books():
+    '''drops every open book and cached block, used when the corpus files are rebuilt'''
+    _open_books.clear()
+    _block_cache.clear()
@@ -1,49 +1,75 @@
 
 import random
 import os
-from helpers import read_page
+from helpers import iter_pages, list_books
+import line_index
+import line_features
+from line_features import line_vector
 import sys
 
+import numpy as np
+
 MIN_EXTRA_LINES = 2
 MAX_EXTRA_LINES = 2
+# easy: random lines of the book, normal: lines like the page's from the book, hard: lines like the page's from any book
+CROSSOUT_DIFFICULTIES = ("easy", "normal", "hard")
+# an extra line is one of this many lines closest to a line of the page
+NEIGHBOURS = 10
 
 '''This module handles generating riddles of crossout type
-It uses special .txt files that hold all lines of a book
+The extra lines come from the other chapters of the same book, see line_index.py
 This module can be run in command line by passing relative path to extract as argument
 '''
 FILE_PATH = "extracts/book_2/chapter_1.txt"
 
-def load_line_pool(extract_path):
-    '''loads a file that has all the lines'''
-    folder = os.path.dirname(extract_path)
-    pool_path = os.path.join(folder, "all_lines.txt")
-    
-    if not os.path.exists(pool_path):
-        return []
-        
-    with open(pool_path, 'r', encoding='utf-8') as f:
-        pool = [line.strip() for line in f if line.strip() and "| Page " not in line]
-    return pool
-
-def get_lines_from_extract(extract_path):
-    '''this gets all lines from this specific extract'''
-    with open(extract_path, 'r', encoding='utf-8') as f:
-        lines = [line.strip() for line in f if line.strip() and "| Page " not in line]
-    return lines
-
-def generate_riddle(page_content, extract_path):
-    '''gets a random line and puts it in a random position'''
-    line_pool = load_line_pool(extract_path)
-    original_lines = [l.strip() for l in page_content.split("\n") if l.strip()]
+def pick_similar_lines(original_lines, extract_path, index, chapter, count, across_books=False):
+    '''for every extra line a random line of the page is taken and one of its NEIGHBOURS closest lines
+    of the other chapters (of every book when across_books) is picked, see line_features.py
+    returns None when no book involved has its line features built'''
+    book_dir = os.path.normpath(os.path.dirname(extract_path))
+    book_dirs = list_books(os.path.dirname(book_dir) or ".") if across_books else [book_dir]
+    pools = []
+    for other_dir in book_dirs:
+        features = line_features.for_book(other_dir)
+        if features is not None:
+            same_book = os.path.normpath(other_dir) == book_dir
+            skip = index.ranges.get(chapter, (0, 0)) if same_book else (0, 0)
+            pools.append((index if same_book else line_index.for_book(other_dir), features, skip))
+    if not pools:
+        return None
 
-    all_extract_lines = get_lines_from_extract(extract_path)
-    filtered_pool = [l for l in line_pool if l not in all_extract_lines]
-    
-    if not filtered_pool or not original_lines:
+    exclude = set(original_lines) | (index.chapter_set(chapter) if chapter in index.ranges else set())
+    vectors = np.stack([line_vector(random.choice(original_lines)) for _ in range(count)])
+    candidates = [[] for _ in range(count)]
+    for pool_index, features, skip in pools:
+        # twice the neighbours, the closest lines are often repeats of the page's own lines
+        for line_candidates, (rows, distances) in zip(candidates, features.nearest(vectors, 2 * NEIGHBOURS, skip)):
+            line_candidates.extend(zip(distances.tolist(), (pool_index.line(row) for row in rows.tolist())))
+    picked = []
+    for line_candidates in candidates:
+        line_candidates.sort(key=lambda candidate: candidate[0])
+        lines = [line for _, line in line_candidates if line not in exclude and line not in picked][:NEIGHBOURS]
+        if lines:
+            picked.append(random.choice(lines))
+    return picked
+
+def generate_riddle(page_content, extract_path, difficulty="normal"):
+    '''gets lines of other chapters and puts them in random positions, difficulty is one of CROSSOUT_DIFFICULTIES
+    lines are drawn at random for easy and for books without line features'''
+    original_lines = [l.strip() for l in page_content.split("\n") if l.strip()]
+    if not original_lines:
         return page_content
 
+    index, chapter = line_index.for_extract(extract_path)
     extra_count = random.randint(MIN_EXTRA_LINES, MAX_EXTRA_LINES)
-    selected_extras = random.sample(filtered_pool, min(extra_count, len(filtered_pool)))
+    selected_extras = None
+    if difficulty != "easy":
+        selected_extras = pick_similar_lines(original_lines, extract_path, index, chapter, extra_count, difficulty == "hard")
+    if not selected_extras:
+        selected_extras = index.sample(extra_count, chapter, set(original_lines))
+    
+    if not selected_extras:
+        return page_content
 
     
     riddle_lines = list(original_lines)
@@ -55,16 +81,11 @@ def generate_riddle(page_content, extract_path):
     return "\n".join(riddle_lines)
 
 
-def generate_level(extract_path):
+def generate_level(extract_path, difficulty="normal"):
     ''' this generates entire riddle'''
     pages = []
-    count = 1
-    while True:
-        content = read_page(extract_path, count)
-        if not content:
-            break
-        pages.append(generate_riddle(content, extract_path))
-        count += 1
+    for _, content in iter_pages(extract_path):
+        pages.append(generate_riddle(content, extract_path, difficulty))
     return pages
 
 def transform_to_crossout_model(riddle_text: str):
@@ -72,6 +93,44 @@ def transform_to_crossout_model(riddle_text: str):
         return [line.strip() for line in riddle_text if line.strip()]
     return [line.strip() for line in riddle_text.split("\n") if line.strip()]
 
+
+def build_crossout_game(extract_path: str, difficulty: str = "normal"):
+    '''riddles of every page of a chapter and the state needed to check the answers, difficulty is one of CROSSOUT_DIFFICULTIES'''
+    riddles = []
+    all_extra_line_ids = set()
+    page_to_ids = {}
+    line_id_counter = 1 
+
+    for page_idx, page_content in iter_pages(extract_path):
+        riddle_text = generate_riddle(page_content, extract_path, difficulty)
+        lines_text_list = transform_to_crossout_model(riddle_text)
+        
+        original_lines = {line.strip() for line in page_content.split("\n") if line.strip()}
+        
+        current_page_lines = []
+        current_page_ids = set()
+        
+        for line_text in lines_text_list:
+            line_id = str(line_id_counter)
+            line_id_counter += 1
+            
+            current_page_ids.add(line_id)
+            
+            if line_text not in original_lines:
+                all_extra_line_ids.add(line_id)
+            
+            current_page_lines.append({"id": line_id, "text": line_text})
+
+        page_to_ids[page_idx] = current_page_ids
+        riddles.append({"lines": current_page_lines})
+
+    return riddles, {
+        "correct_ids": all_extra_line_ids,
+        "page_to_ids": page_to_ids,
+        "total_pages": len(riddles)
+    }
+
+
 if __name__ == "__main__":
     path = FILE_PATH
     if len(sys.argv) > 1:
@@ -4,14 +4,15 @@ from pydantic import BaseModel
 from datetime import datetime, timedelta
 import random
 
-from helpers import read_page
-from crossout import generate_riddle, transform_to_crossout_model
+from crossout import build_crossout_game, CROSSOUT_DIFFICULTIES
+from generation_service import generate, GenerationBusy, GenerationTimeout
 
 '''This module is responsible for managing endpoints for crossout type riddles'''
 class GameRequest(BaseModel):
     bookId: int
     gameType: str
     chapter: int
+    difficulty: str = "normal"
 
 class CrossoutLine(BaseModel):
     id: str
@@ -58,63 +59,28 @@ async def start_crossout_game(request: GameRequest, background_tasks: Background
     
     if request.gameType != 'crossout':
         raise HTTPException(status_code=400, detail="Invalid game type")
+    if request.difficulty not in CROSSOUT_DIFFICULTIES:
+        raise HTTPException(status_code=400, detail="Invalid difficulty")
     try:
         extract_path = f"extracts/book_{request.bookId}/chapter_{request.chapter}.txt"
-        all_pages_responses = []
-        all_extra_line_ids = set()
-        page_to_ids = {}
-        
-        page_idx = 1
-        shared_game_id = random.randint(1000, 9999)
-        while (shared_game_id in active_games):
-            shared_game_id = random.randint(1000, 9999)
-        line_id_counter = 1 
-
-        while True:
-            page_content = read_page(extract_path, page_idx)
-            if not page_content:
-                break
-            
-            riddle_text = generate_riddle(page_content, extract_path)
-            lines_text_list = transform_to_crossout_model(riddle_text)
-            
-            original_lines = {line.strip() for line in page_content.split("\n") if line.strip()}
-            
-            current_page_lines = []
-            current_page_ids = set()
-            
-            for line_text in lines_text_list:
-                line_id = str(line_id_counter)
-                line_id_counter += 1
-                
-                current_page_ids.add(line_id)
-                
-                if line_text not in original_lines:
-                    all_extra_line_ids.add(line_id)
-                
-                current_page_lines.append(CrossoutLine(id=line_id, text=line_text))
-
-            page_to_ids[page_idx] = current_page_ids
-            all_pages_responses.append(CrossoutResponse(
-                gameId=shared_game_id,
-                riddle=CrossoutRiddle(lines=current_page_lines)
-            ))
-            page_idx += 1
-
-        if not all_pages_responses:
-            raise HTTPException(status_code=404, detail="No content found")
-
-        active_games[shared_game_id] = {
-            "start_time": datetime.now(),
-            "correct_ids": all_extra_line_ids,
-            "page_to_ids": page_to_ids,
-            "total_pages": len(all_pages_responses)
-        }
-
-        return all_pages_responses
+        riddles, game_state = await generate(build_crossout_game, extract_path, request.difficulty)
+    except GenerationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except GenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not riddles:
+        raise HTTPException(status_code=404, detail="No content found")
+
+    shared_game_id = random.randint(1000, 9999)
+    while (shared_game_id in active_games):
+        shared_game_id = random.randint(1000, 9999)
+    active_games[shared_game_id] = {**game_state, "start_time": datetime.now()}
+
+    return [CrossoutResponse(gameId=shared_game_id, riddle=CrossoutRiddle(**riddle)) for riddle in riddles]
+
 
 @router.post("/crossout/submit", response_model=ResultResponse)
 async def submit_crossout_answers(request: CrossoutAnswerRequest):
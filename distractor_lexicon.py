@@ -0,0 +1,86 @@
+import json
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+from spacy.symbols import VERB
+
+from choice import FormIndex, form_key, VERB_FEATURES, VERB_SHARED_FEATURES
+from morph_table import MORPHS
+
+'''Same form words of a whole book, the wrong options choice falls back to when a page has too few of its own
+Built by book_management/build_distractor_lexicon.py into extracts/book_N/lexicon.json,
+the words are bucketed the way choice.FormIndex buckets a page: by part of speech and the compared features,
+verbs by their VERB_FEATURES values. A book's lexicon is loaded the first time one of its chapters asks for it.
+'''
+
+LEXICON_NAME = "lexicon.json"
+# random draws per wanted word before sample() gives up on a bucket made of excluded words
+SAMPLE_TRIES = 8
+
+_lexicons: Dict[str, Optional["DistractorLexicon"]] = {}
+
+
+class DistractorLexicon:
+    def __init__(self, buckets: Dict[Tuple, List[str]], verb_groups: Dict[Tuple, List[str]]):
+        self.buckets = buckets
+        self.verb_groups = verb_groups
+        self._verb_words: Dict[Tuple, List[str]] = {}
+
+    @classmethod
+    def from_index(cls, form_index: FormIndex) -> "DistractorLexicon":
+        return cls({key: sorted(words) for key, words in form_index.buckets.items()},
+                   {key: sorted(words) for key, words in form_index.verb_groups.items()})
+
+    @classmethod
+    def load(cls, path: str) -> "DistractorLexicon":
+        with open(path, encoding='utf-8') as lexicon_file:
+            data = json.load(lexicon_file)
+        return cls({(pos, tuple(features)): words for pos, features, words in data["buckets"]},
+                   {tuple(features): words for features, words in data["verb_groups"]})
+
+    def save(self, path: str):
+        data = {
+            "buckets": [[pos, list(features), words] for (pos, features), words in sorted(self.buckets.items(), key=str)],
+            "verb_groups": [[list(features), words] for features, words in sorted(self.verb_groups.items(), key=str)],
+        }
+        with open(path, 'w', encoding='utf-8') as lexicon_file:
+            json.dump(data, lexicon_file, ensure_ascii=False)
+
+    def words(self, word_token) -> List[str]:
+        '''every word of the book with the form of word_token, word_token's own word included'''
+        if word_token.pos != VERB:
+            return self.buckets.get(form_key(word_token), [])
+        features = MORPHS.key(word_token.morph_id, VERB_FEATURES)
+        words = self._verb_words.get(features)
+        if words is None:
+            joined = set()
+            for group, group_words in self.verb_groups.items():
+                if sum(1 for value, correct in zip(group, features) if value == correct) >= VERB_SHARED_FEATURES:
+                    joined.update(group_words)
+            words = sorted(joined)
+            self._verb_words[features] = words
+        return words
+
+    def sample(self, word_token, count: int, exclude=()) -> List[str]:
+        '''up to count different words with the form of word_token that are not in exclude'''
+        words = self.words(word_token)
+        picked: List[str] = []
+        if not words:
+            return picked
+        for _ in range(count * SAMPLE_TRIES):
+            word = words[random.randrange(len(words))]
+            if word not in exclude and word not in picked:
+                picked.append(word)
+                if len(picked) == count:
+                    break
+        return picked
+
+
+def for_extract(extract_path: str) -> Optional[DistractorLexicon]:
+    '''lexicon of the book an extract belongs to, None when it was not built'''
+    book_dir = os.path.normpath(os.path.dirname(extract_path))
+    if book_dir not in _lexicons:
+        path = os.path.join(book_dir, LEXICON_NAME)
+        _lexicons[book_dir] = DistractorLexicon.load(path) if os.path.isfile(path) else None
+    return _lexicons[book_dir]
@@ -1,9 +1,12 @@
-from helpers import read_page, get_token_info_basic
+from helpers import iter_pages, get_token_info_basic, get_token_info_batch
 import random
 from typing import List, Tuple, Dict, Any
 import uuid
 import sys
 
+from alias_table import AliasTable
+import word_frequency
+
 MIN_WORDS = 3
 MAX_WORDS = 5
 ''' This module handles logic for fill type riddles
@@ -19,31 +22,46 @@ COLOR_RESET = "\033[0m"
 COLOR_START = ""
 COLOR_RESET = ""
 
-def pick_words_to_remove(word_tokens ,n):
-    ''' picks random words that are different from each other'''
+def pick_words_to_remove(word_tokens, n, weight=None):
+    ''' picks n random words that are different from each other, fewer only when the page has fewer different words
+    without weight every occurrence is equally likely, weight(word) scales how likely the occurrences of a word are
+    the draws come from an alias table over the different words, rebuilt without the picked words
+    once they make up half of its weight, so a draw hits an already picked word at most every other time'''
+    occurrences = {}
+    for token in word_tokens:
+        occurrences.setdefault(token.original_text.lower(), []).append(token)
+    words = list(occurrences)
+    weights = [len(occurrences[word]) * (weight(word) if weight else 1.0) for word in words]
+    n = min(n, len(words))
+
     words_to_remove = []
-    tries = 0
-    for i in range(n):
-        random_word = random.choice(word_tokens)
-        if random_word.original_text.lower() not in [w.original_text.lower() for w in words_to_remove]:
-            words_to_remove.append(random_word)
-        else:
-            i -= 1
-            tries += 1
-        if tries == 5:
-            break
+    picked = set()
+    while len(words_to_remove) < n:
+        remaining = [k for k in range(len(words)) if k not in picked]
+        table = AliasTable([weights[k] for k in remaining])
+        table_weight = sum(weights[k] for k in remaining)
+        picked_weight = 0.0
+        while len(words_to_remove) < n and picked_weight * 2 <= table_weight:
+            k = remaining[table.draw()]
+            if k in picked:
+                continue
+            picked.add(k)
+            picked_weight += weights[k]
+            words_to_remove.append(random.choice(occurrences[words[k]]))
     return words_to_remove
 
-def generate_level(page: str, n_words: int = None):
+def generate_level(page: str, n_words: int = None, word_tokens_data: List = None, weight=None):
+    ''' picks the words removed from a page, weight is passed on to pick_words_to_remove'''
     if n_words is None:
         n_words = random.randint(MIN_WORDS, MAX_WORDS)
-    word_tokens_data = get_token_info_basic(page)
+    if word_tokens_data is None:
+        word_tokens_data = get_token_info_basic(page)
     if not word_tokens_data:
         return None, None
     
     word_tokens = [t for t in word_tokens_data]
     n = min(len(word_tokens), n_words)
-    words_to_remove = pick_words_to_remove(word_tokens, n)
+    words_to_remove = pick_words_to_remove(word_tokens, n, weight)
     return word_tokens, words_to_remove
 
 def replace_word_token(page: str, word_token):
@@ -54,14 +72,14 @@ def replace_word_token(page: str, word_token):
     page = page[:start] + replacement + page[end:]
     return page
 
-def generate_riddle_for_printing(page:str, number_of_words_to_be_taken:int=5):
+def generate_riddle_for_printing(page:str, number_of_words_to_be_taken:int=5, word_tokens: List = None):
     '''
     chooses number of words to remove then calls function remove_words to remove them
     It is used for printing when running module as main, it is not used by frontend
     '''
 
     words_taken = []
-    words_tokens, words_to_remove = generate_level(page, number_of_words_to_be_taken)
+    words_tokens, words_to_remove = generate_level(page, number_of_words_to_be_taken, word_tokens)
     words_to_remove.sort(key=lambda x:x.start,reverse=True)
 
     for word in words_to_remove:
@@ -73,14 +91,10 @@ def generate_riddle_for_printing(page:str, number_of_words_to_be_taken:int=5):
 def generate_level_for_printing(extract_path: str) -> List[Tuple[str, List[str]]]:
     ''' repeats generate level for each page'''
     pages_and_words = []
-    count = 1
-    while True:
-        page_content = read_page(extract_path, count)
-        if not page_content:
-            break
-        riddle_page, riddle_words = generate_riddle_for_printing(page_content, random.randint(MIN_WORDS, MAX_WORDS)) 
+    pages_content = [page_content for _, page_content in iter_pages(extract_path)]
+    for page_content, word_tokens in zip(pages_content, get_token_info_batch(pages_content)):
+        riddle_page, riddle_words = generate_riddle_for_printing(page_content, random.randint(MIN_WORDS, MAX_WORDS), word_tokens) 
         pages_and_words.append((riddle_page, riddle_words))
-        count += 1
     return pages_and_words
 
 def transform_to_fill_model(page_text: str, word_tokens: List, words_to_remove: List, game_id: int) -> Dict[str, Any]:
@@ -128,6 +142,57 @@ def transform_to_fill_model(page_text: str, word_tokens: List, words_to_remove:
     }
 
 
+def build_fill_gaps_game(extract_path: str, difficulty: str = "normal"):
+    '''riddles of every page of a chapter and the state needed to check the answers,
+    difficulty is one of DIFFICULTIES and only matters for books with a frequency table'''
+    frequencies = word_frequency.for_extract(extract_path)
+    weight = None
+    if frequencies is not None and difficulty != "normal":
+        weight = lambda word: frequencies.weight(word, difficulty)
+    all_pages_riddles = []
+    correct_answers_state = {}
+    page_to_gaps = {} 
+    global_gap_counter = 0
+
+    pages = list(iter_pages(extract_path))
+    pages_tokens = get_token_info_batch([page_content for _, page_content in pages])
+
+    for (page_idx, page_content), page_tokens in zip(pages, pages_tokens):
+        word_tokens, words_to_remove = generate_level(page_content, word_tokens_data=page_tokens, weight=weight)
+        if not word_tokens:
+            continue
+
+
+        for t in word_tokens:
+            if not hasattr(t, 'display_word'):
+                t.display_word = t.original_text.lower()
+
+        
+        # the game id is picked by start_fill_gaps_game
+        game_data = transform_to_fill_model(page_content, word_tokens, words_to_remove, 0)
+        
+
+        current_page_gaps = []
+        sorted_words = sorted(words_to_remove, key=lambda x: x.start)
+        for i, word in enumerate(sorted_words):
+            for option in game_data["riddle"]["options"]:
+                if option["label"] == word.display_word:
+                    correct_answers_state[global_gap_counter] = option["id"]
+                    current_page_gaps.append(global_gap_counter)
+                    global_gap_counter += 1
+                    break
+
+        page_to_gaps[page_idx] = current_page_gaps
+        all_pages_riddles.append(game_data["riddle"])
+
+    return all_pages_riddles, {
+        "total_gaps": global_gap_counter,
+        "correct_answers": correct_answers_state,
+        "page_to_gaps": page_to_gaps,
+        "total_pages": len(all_pages_riddles)
+    }
+
+
 if __name__=="__main__":
     '''prints page as string, then prints options in random and correct order'''
     extract_file_path = FILE_PATH
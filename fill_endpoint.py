@@ -4,8 +4,9 @@ import random
 from datetime import datetime, timedelta
 import uuid
 
-from helpers import read_page
-from fill import transform_to_fill_model, generate_level
+from fill import build_fill_gaps_game
+from word_frequency import DIFFICULTIES
+from generation_service import generate, GenerationBusy, GenerationTimeout
 
 
 from typing import Optional
@@ -16,6 +17,7 @@ class GameRequest(BaseModel):
     bookId: int
     gameType: str  
     chapter: int
+    difficulty: str = "normal"
 
 class FillGapAnswer(BaseModel):
     gapIndex: int
@@ -69,70 +71,26 @@ async def start_fill_gaps_game(request: GameRequest, background_tasks: Backgroun
     background_tasks.add_task(cleanup_expired_games)
     if request.gameType != 'fill-gaps':
         raise HTTPException(status_code=400, detail="Invalid game type")
+    if request.difficulty not in DIFFICULTIES:
+        raise HTTPException(status_code=400, detail="Invalid difficulty")
     
     try:
         extract_path = f"extracts/book_{request.bookId}/chapter_{request.chapter}.txt"
-                
-        game_id = random.randint(1000, 9999)
-        while (game_id in active_games):
-            game_id = random.randint(1000, 9999)
-        
-        all_pages_riddles = []
-        correct_answers_state = {}
-        page_to_gaps = {} 
-        global_gap_counter = 0
-        page_idx = 1
-
-        while True:
-            page_content = read_page(extract_path, page_idx)
-            if not page_content:
-                break
-            
-            word_tokens, words_to_remove = generate_level(page_content)
-            if not word_tokens:
-                page_idx += 1
-                continue
-
-
-            for t in word_tokens:
-                if not hasattr(t, 'display_word'):
-                    t.display_word = t.original_text.lower()
-
-            
-            
-            game_data = transform_to_fill_model(page_content, word_tokens, words_to_remove, game_id)
-            
-
-            current_page_gaps = []
-            sorted_words = sorted(words_to_remove, key=lambda x: x.start)
-            for i, word in enumerate(sorted_words):
-                for option in game_data["riddle"]["options"]:
-                    if option["label"] == word.display_word:
-                        correct_answers_state[global_gap_counter] = option["id"]
-                        current_page_gaps.append(global_gap_counter)
-                        global_gap_counter += 1
-                        break
-
-            page_to_gaps[page_idx] = current_page_gaps
-            all_pages_riddles.append({
-                "gameId": game_id,
-                "riddle": game_data["riddle"]
-            })
-            page_idx += 1
-
-        active_games[game_id] = {
-            "start_time": datetime.now(),
-            "total_gaps": global_gap_counter,
-            "correct_answers": correct_answers_state,
-            "page_to_gaps": page_to_gaps,
-            "total_pages": len(all_pages_riddles)
-        }
-
-        return all_pages_riddles
-        
+        riddles, game_state = await generate(build_fill_gaps_game, extract_path, request.difficulty)
+    except GenerationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except GenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    game_id = random.randint(1000, 9999)
+    while (game_id in active_games):
+        game_id = random.randint(1000, 9999)
+    active_games[game_id] = {**game_state, "start_time": datetime.now()}
+
+    return [{"gameId": game_id, "riddle": riddle} for riddle in riddles]
+
 @router.post("/fill-gaps/submit", response_model=ResultResponse)
 async def submit_fill_gaps_answers(request: FillGapsAnswerRequest):
     if request.gameId not in active_games:
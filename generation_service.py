@@ -0,0 +1,87 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import helpers
+
+'''Runs the riddle generation of start requests
+GENERATION_WORKERS=0 (the default) generates in the request handler itself.
+With GENERATION_WORKERS=N a pool of N processes does the work, each worker loads the spaCy pipelines
+and the token stores once when it starts, so start requests use every core instead of one.
+At most GENERATION_QUEUE jobs wait for a free worker, the request after that is refused (GenerationBusy),
+a job that takes longer than GENERATION_TIMEOUT seconds is given up (GenerationTimeout).
+A process cannot be interrupted, so a job that timed out still keeps its worker busy until it is done.
+'''
+
+GENERATION_WORKERS = int(os.environ.get("GENERATION_WORKERS", 0))
+GENERATION_QUEUE = int(os.environ.get("GENERATION_QUEUE", 32))
+GENERATION_TIMEOUT = float(os.environ.get("GENERATION_TIMEOUT", 30))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
+_stats = {"jobs": 0, "refused": 0, "timeouts": 0}
+
+
+class GenerationBusy(Exception):
+    pass
+
+
+class GenerationTimeout(Exception):
+    pass
+
+
+def warm_up():
+    '''runs once in every worker'''
+    helpers.preload()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=GENERATION_WORKERS, initializer=warm_up)
+    return _pool
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _job_done(_):
+    global _in_flight
+    _in_flight -= 1
+
+
+async def generate(build: Callable, *args) -> Any:
+    '''returns build(*args), computed by a worker when GENERATION_WORKERS > 0
+    build has to be a module level function and its arguments and result have to be picklable
+    '''
+    global _in_flight
+    _stats["jobs"] += 1
+    if GENERATION_WORKERS <= 0:
+        return build(*args)
+
+    if _in_flight >= GENERATION_WORKERS + GENERATION_QUEUE:
+        _stats["refused"] += 1
+        raise GenerationBusy("Too many games are being generated, try again later")
+    job = asyncio.wrap_future(get_pool().submit(build, *args))
+    _in_flight += 1
+    job.add_done_callback(_job_done)
+    try:
+        # shielded so that a job that timed out still counts until its worker is free
+        return await asyncio.wait_for(asyncio.shield(job), GENERATION_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise GenerationTimeout(f"Generation took longer than {GENERATION_TIMEOUT:g}s")
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "workers": GENERATION_WORKERS,
+        "max_queued": GENERATION_QUEUE,
+        "in_flight": _in_flight,
+        **_stats,
+    }
@@ -0,0 +1,34 @@
+import gc
+import os
+
+'''Multi-worker launch: gunicorn -c gunicorn.conf.py main:app
+The master imports the app and loads the spaCy pipelines, token stores and books before forking,
+so the workers share those pages copy-on-write instead of each holding a copy.
+gc.freeze() moves everything loaded so far out of the collector's reach, otherwise the first collection
+in a worker writes to every object header and copies the shared pages anyway.
+WEB_CONCURRENCY sets the number of workers, PRELOAD_APP=0 loads everything in each worker instead.
+'''
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.environ.get("PRELOAD_APP", "1") != "0"
+timeout = 120
+
+
+def when_ready(server):
+    import helpers
+    import process_memory
+    if preload_app:
+        helpers.preload()
+        gc.collect()
+        gc.freeze()
+    server.log.info("master %s: %s", os.getpid(), process_memory.describe(process_memory.memory()))
+
+
+def post_worker_init(worker):
+    import helpers
+    import process_memory
+    if not preload_app:
+        helpers.preload()
+    worker.log.info("worker %s: %s", worker.pid, process_memory.describe(process_memory.memory()))
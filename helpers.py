@@ -1,52 +1,276 @@
 from typing import List, Tuple, Dict, Any
-from word_token import Word_Token
-from word_token_detailed import Word_Token_Detailed
 import string
+import re
+import os
+import bisect
 import spacy
+import corpus
+import token_store
+import regex_tokenizer
+import lemma_index
+import line_index
+import line_features
+import anagram_index
+import vocabulary
+from chapter_cache import ChapterCache
+from token_memo import TokenMemo
+from token_table import TokenTable
 
 COLOR_START = "\033[91m"
 COLOR_RESET = "\033[0m"
 
 
-try:
-    NLP = spacy.load("pl_core_news_sm")
-except OSError:
-    spacy.cli.download("pl_core_news_sm")
-    NLP = spacy.load("pl_core_news_sm")
+MODEL_NAME = "pl_core_news_sm"
+# components of the full model that none of the games read
+UNUSED_PIPES = ["parser", "ner", "lemmatizer", "trainable_lemmatizer", "senter"]
+# components that produce pos and morph, the basic path only needs the tokenizer
+TAGGING_PIPES = ["tok2vec", "morphologizer", "tagger", "attribute_ruler"]
+
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", 16))
+# "regex" tokenizes the basic path with regex_tokenizer, spaCy is then only loaded for choice
+BASIC_TOKENIZER = os.environ.get("BASIC_TOKENIZER", "spacy")
+
+_basic_nlp = None
+_detailed_nlp = None
+TOKEN_MEMO = TokenMemo()
+
+def load_pipeline(exclude):
+    try:
+        return spacy.load(MODEL_NAME, exclude=exclude)
+    except OSError:
+        spacy.cli.download(MODEL_NAME)
+        return spacy.load(MODEL_NAME, exclude=exclude)
+
+def get_basic_nlp():
+    '''tokenizer only pipeline used for anagram, spellcheck, fill and switch, loaded on first use'''
+    global _basic_nlp
+    if _basic_nlp is None:
+        _basic_nlp = load_pipeline(UNUSED_PIPES + TAGGING_PIPES)
+    return _basic_nlp
+
+def get_detailed_nlp():
+    '''pipeline with pos and morph used for choice, loaded on first use'''
+    global _detailed_nlp
+    if _detailed_nlp is None:
+        _detailed_nlp = load_pipeline(UNUSED_PIPES)
+    return _detailed_nlp
+
+PAGE_HEADER = re.compile(rb"\| Page (\d+) \|")
+
+EXTRACT_PATH = re.compile(r"book_(\d+)[\\/]chapter_(\d+)\.txt$")
+CHAPTER_CACHE = ChapterCache()
+
+_page_indexes: Dict[str, Tuple[float, Dict[int, Tuple[int, int]]]] = {}
+
+def build_page_index(extract_path):
+    '''scans the extract once and returns {page_index: (start, end)} byte offsets of every page,
+    the blank line after "| Page N |" and the one before the next header are already left out'''
+    line_starts = []
+    headers = []
+    offset = 0
+    with open(extract_path, 'rb') as extract_file:
+        for line in extract_file:
+            line_starts.append(offset)
+            header = PAGE_HEADER.fullmatch(line.strip())
+            if header:
+                headers.append((int(header.group(1)), offset, offset + len(line)))
+            offset += len(line)
+    line_starts.append(offset)
+
+    regions = {}
+    waiting = {}
+    for number, header_start, header_end in headers:
+        for page_number in waiting.pop(number, []):
+            regions[page_number] = (regions[page_number][0], header_start)
+        if number not in regions:
+            regions[number] = (header_end, offset)
+            waiting.setdefault(number + 1, []).append(number)
+
+    index = {}
+    for number, (region_start, region_end) in regions.items():
+        first = bisect.bisect_left(line_starts, region_start)
+        last = bisect.bisect_left(line_starts, region_end)
+        if last - first < 2:
+            index[number] = (region_start, region_start)
+        else:
+            index[number] = (line_starts[first + 1], line_starts[last - 1])
+    return index
+
+def get_page_index(extract_path):
+    '''returns page offsets of the extract, rebuilding them only when the file changed'''
+    mtime = os.stat(extract_path).st_mtime
+    cached = _page_indexes.get(extract_path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, build_page_index(extract_path))
+        _page_indexes[extract_path] = cached
+    return cached[1]
+
+def read_page_direct(extract_path, page_index):
+    '''reads a single page from disk without going through the chapter cache'''
+    packed = corpus.find_chapter(extract_path)
+    if packed:
+        book, chapter = packed
+        return book.page_text(chapter, page_index)
+    span = get_page_index(extract_path).get(page_index)
+    if span is None:
+        return None
+    start, end = span
+    with open(extract_path, 'rb') as extract_file:
+        extract_file.seek(start)
+        page = extract_file.read(end - start)
+    return page.decode('utf-8')
+
+def read_chapter_pages(extract_path):
+    '''reads every page of a chapter from disk in one go,
+    returns {page_index: page} together with the file the pages came from'''
+    packed = corpus.find_chapter(extract_path)
+    if packed:
+        book, chapter = packed
+        return {page_index: book.page_text(chapter, page_index) for page_index in range(1, book.page_count(chapter) + 1)}, book.path
+    pages = {}
+    with open(extract_path, 'rb') as extract_file:
+        for page_index, (start, end) in sorted(get_page_index(extract_path).items()):
+            extract_file.seek(start)
+            pages[page_index] = extract_file.read(end - start).decode('utf-8')
+    return pages, extract_path
+
+def chapter_key(extract_path):
+    '''(bookId, chapter) for extracts/book_N/chapter_M.txt, the normalized path for any other extract'''
+    extract_path = os.path.normpath(extract_path)
+    chapter_file = EXTRACT_PATH.search(extract_path)
+    if chapter_file:
+        return int(chapter_file.group(1)), int(chapter_file.group(2))
+    return extract_path
+
+def get_chapter_pages(extract_path):
+    '''returns {page_index: page} of a chapter, served from CHAPTER_CACHE while the file on disk is unchanged'''
+    packed = corpus.find_chapter(extract_path)
+    source_path = packed[0].path if packed else extract_path
+    return CHAPTER_CACHE.get(chapter_key(extract_path), source_path, lambda: read_chapter_pages(extract_path)[0])
 
 def read_page(extract_path, page_index):
-    with open(extract_path, 'r', encoding='utf-8') as extract_file:
-        line = extract_file.readline()
-        while (line.strip()!= f"| Page {page_index} |"):
-            if not line:
+    return get_chapter_pages(extract_path).get(page_index)
+
+def iter_pages(extract_path):
+    '''yields (page_index, page) for every page of the extract in order,
+    stops at the first missing or empty page just like looping over read_page did'''
+    pages = get_chapter_pages(extract_path)
+    page_index = 1
+    while pages.get(page_index):
+        yield page_index, pages[page_index]
+        page_index += 1
+
+
+def list_books(extracts_dir="extracts"):
+    '''paths of every extracts/book_N folder'''
+    return sorted(os.path.join(extracts_dir, name) for name in os.listdir(extracts_dir)
+                  if os.path.isdir(os.path.join(extracts_dir, name)))
+
+def list_chapters(book_dir):
+    '''chapter numbers of a book, taken from its pack when there is one'''
+    book = corpus.open_book(book_dir)
+    if book:
+        return sorted(book.chapters)
+    chapters = []
+    for name in os.listdir(book_dir):
+        chapter_file = corpus.CHAPTER_FILE.fullmatch(name)
+        if chapter_file:
+            chapters.append(int(chapter_file.group(1)))
+    return sorted(chapters)
+
+def preload(extracts_dir="extracts"):
+    '''loads the pipelines, token stores and books the games read,
+    a process forked afterwards shares them with its parent instead of loading its own copy'''
+    get_detailed_nlp()
+    if BASIC_TOKENIZER != "regex":
+        get_basic_nlp()
+    token_store.load_stores(extracts_dir)
+    if os.path.isdir(extracts_dir):
+        for book_dir in list_books(extracts_dir):
+            corpus.open_book(book_dir)
+            line_index.for_book(book_dir)
+            line_features.for_book(book_dir)
+    lemma_index.get_index()
+    anagram_index.get_index()
+    vocabulary.get_vocabulary()
+
+
+def is_word_token(token):
+    '''tokens the games work with: no punctuation, no whitespace, at least two characters'''
+    word = token.text
+    return not token.is_punct and not token.is_space and word.strip() and len(word) > 1
+
+def tokens_from_store(text, stored, detailed):
+    spans = [(start, finish, i) for start, finish, i, _, _ in stored]
+    if detailed:
+        return TokenTable(text, spans, [pos for _, _, _, pos, _ in stored], [morph for _, _, _, _, morph in stored])
+    return TokenTable(text, spans)
+
+def tokens_from_spans(text, spans):
+    return TokenTable(text, spans)
+
+def tokens_from_doc(doc, detailed):
+    spans = []
+    pos = []
+    morphs = []
+    for token in doc:
+        if is_word_token(token):
+            spans.append((token.idx, token.idx + len(token.text), token.i))
+            if detailed:
+                pos.append(token.pos)
+                morphs.append(str(token.morph))
+    if detailed:
+        return TokenTable(doc.text, spans, pos, morphs)
+    return TokenTable(doc.text, spans)
+
+def cached_tokens(text, detailed):
+    '''tokens of a page from the memo, the regex tokenizer or the token store, None when the model has to run'''
+    tokens = TOKEN_MEMO.get(text, detailed)
+    if tokens is None:
+        if not detailed and BASIC_TOKENIZER == "regex":
+            tokens = tokens_from_spans(text, regex_tokenizer.tokenize(text))
+        else:
+            stored = token_store.lookup(text)
+            if stored is None:
                 return None
-            line = extract_file.readline()
-        line = extract_file.readline()
-        page = []
-        while (line and line.strip()!= f"| Page {page_index+1} |"):
-            page.append(line)
-            line = extract_file.readline()
-    page = "".join(page[1:-1])
-    return page
+            tokens = tokens_from_store(text, stored, detailed)
+        TOKEN_MEMO.put(text, detailed, tokens)
+    return tokens
 
+def get_token_info_batch(pages, detailed=False, batch_size=NLP_BATCH_SIZE, n_process=1, use_store=True):
+    '''tokenizes a list of pages (usually a whole chapter) with one nlp.pipe call,
+    returns a list of word tokens per page with offsets relative to that page,
+    pages found in the memo or the token store are not sent to the model unless use_store is False'''
+    results = [None] * len(pages)
+    missing = []
+    for page_number, page in enumerate(pages):
+        tokens = cached_tokens(page, detailed) if use_store else None
+        if tokens is None:
+            missing.append(page_number)
+        else:
+            results[page_number] = tokens
+    if missing:
+        nlp = get_detailed_nlp() if detailed else get_basic_nlp()
+        docs = nlp.pipe((pages[page_number] for page_number in missing), batch_size=batch_size, n_process=n_process)
+        for page_number, doc in zip(missing, docs):
+            results[page_number] = tokens_from_doc(doc, detailed)
+            if use_store:
+                TOKEN_MEMO.put(pages[page_number], detailed, results[page_number])
+    return results
 
 def get_token_info(text):
-    doc = NLP(text)
-    word_tokens = []
-    for token in doc:
-        word = token.text
-        if not token.is_punct and not token.is_space and word.strip() and len(word) > 1:
-            word_tokens.append(Word_Token_Detailed(word, token.idx, token.idx+len(word), token.i, token.morph, token.pos))
-    return word_tokens
+    tokens = cached_tokens(text, True)
+    if tokens is None:
+        tokens = tokens_from_doc(get_detailed_nlp()(text), True)
+        TOKEN_MEMO.put(text, True, tokens)
+    return tokens
 
 def get_token_info_basic(text:str):
-    doc = NLP(text)
-    word_tokens = []
-    for token in doc:
-        word = token.text
-        if not token.is_punct and not token.is_space and word.strip() and len(word) > 1:
-            word_tokens.append(Word_Token(word, token.idx, token.idx+len(word), token.i))
-    return word_tokens
+    tokens = cached_tokens(text, False)
+    if tokens is None:
+        tokens = tokens_from_doc(get_basic_nlp()(text), False)
+        TOKEN_MEMO.put(text, False, tokens)
+    return tokens
 
 def is_punctuation(text: str) -> bool:
     dash_chars = "-–——" 
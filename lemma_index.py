@@ -0,0 +1,64 @@
+import json
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+'''Every inflected form of every lemma in extracts/, for the choice mode where the options are forms of one word
+Built once by book_management/build_lemma_index.py from the spaCy lemmatizer into extracts/lemma_forms.json,
+requests only read this file and never run spaCy.
+Words are lowercased, a form the lemmatizer gave several lemmas belongs to the most frequent one,
+and each form keeps its most frequent morph string so spelling variants of one form are not offered together.
+'''
+
+LEMMA_INDEX_PATH = os.path.join("extracts", "lemma_forms.json")
+
+_index: Optional["LemmaIndex"] = None
+
+
+class LemmaIndex:
+    def __init__(self, lemmas: Dict[str, List[Tuple[str, str]]]):
+        '''lemmas maps a lemma to its (form, morph) pairs'''
+        self.lemmas = lemmas
+        self.form_lemmas: Dict[str, str] = {}
+        self.form_morphs: Dict[str, str] = {}
+        for lemma, forms in lemmas.items():
+            for form, morph in forms:
+                self.form_lemmas[form] = lemma
+                self.form_morphs[form] = morph
+
+    @classmethod
+    def load(cls, path: str = LEMMA_INDEX_PATH) -> "LemmaIndex":
+        with open(path, encoding='utf-8') as index_file:
+            data = json.load(index_file)
+        return cls({lemma: [tuple(form) for form in forms] for lemma, forms in data.items()})
+
+    def save(self, path: str = LEMMA_INDEX_PATH):
+        with open(path, 'w', encoding='utf-8') as index_file:
+            json.dump({lemma: [list(form) for form in forms] for lemma, forms in sorted(self.lemmas.items())},
+                      index_file, ensure_ascii=False)
+
+    def other_forms(self, word: str) -> List[str]:
+        '''forms of the lemma of word with a different morph than word, empty for an unknown word'''
+        lemma = self.form_lemmas.get(word)
+        if lemma is None:
+            return []
+        morph = self.form_morphs[word]
+        seen = {morph}
+        forms = []
+        for form, form_morph in self.lemmas[lemma]:
+            if form_morph not in seen:
+                seen.add(form_morph)
+                forms.append(form)
+        return forms
+
+    def sample(self, word: str, count: int) -> List[str]:
+        forms = self.other_forms(word)
+        return random.sample(forms, min(count, len(forms)))
+
+
+def get_index() -> LemmaIndex:
+    '''the index of extracts/, loaded on first use, empty when it was not built'''
+    global _index
+    if _index is None:
+        _index = LemmaIndex.load() if os.path.isfile(LEMMA_INDEX_PATH) else LemmaIndex({})
+    return _index
@@ -0,0 +1,95 @@
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import line_index
+
+'''A feature vector for every line of a book, crossout slips in lines that look like the page's own
+Built by book_management/build_line_features.py into extracts/book_N/line_features.npy, one float32 row per line
+of line_index.LineIndex in the same order. A row holds the line length, counts of a few kinds of punctuation
+and the character trigrams of the line hashed into TRIGRAM_BUCKETS buckets and scaled to unit length.
+The matrix is memory mapped, finding the lines closest to a few lines is one matrix product over the book.
+'''
+
+LINE_FEATURES_NAME = "line_features.npy"
+TRIGRAM_BUCKETS = 32
+PUNCTUATION_KINDS = (".!?…", ",;:", "—–-", "\"'„”«»", "()")
+# how much a feature counts in the distance, one extra character in the length is 1 / LENGTH_SCALE
+LENGTH_SCALE = 10.0
+PUNCTUATION_WEIGHT = 0.5
+FEATURE_COUNT = 2 + len(PUNCTUATION_KINDS) + TRIGRAM_BUCKETS
+
+_features: Dict[str, Optional["LineFeatures"]] = {}
+
+
+def line_vector(line: str) -> np.ndarray:
+    vector = np.zeros(FEATURE_COUNT, dtype=np.float32)
+    vector[0] = len(line) / LENGTH_SCALE
+    vector[1] = PUNCTUATION_WEIGHT if line and not line[-1].isalnum() else 0.0
+    for kind, chars in enumerate(PUNCTUATION_KINDS):
+        vector[2 + kind] = PUNCTUATION_WEIGHT * sum(line.count(char) for char in chars)
+    padded = f" {line.lower()} "
+    trigrams = vector[2 + len(PUNCTUATION_KINDS):]
+    for i in range(len(padded) - 2):
+        trigrams[zlib.crc32(padded[i:i + 3].encode('utf-8')) % TRIGRAM_BUCKETS] += 1.0
+    norm = np.linalg.norm(trigrams)
+    if norm:
+        trigrams /= norm
+    return vector
+
+
+class LineFeatures:
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+        self.norms = np.einsum('ij,ij->i', matrix, matrix)
+
+    @classmethod
+    def from_index(cls, index: "line_index.LineIndex") -> "LineFeatures":
+        matrix = np.zeros((len(index), FEATURE_COUNT), dtype=np.float32)
+        for k in range(len(index)):
+            matrix[k] = line_vector(index.line(k))
+        return cls(matrix)
+
+    @classmethod
+    def load(cls, path: str) -> "LineFeatures":
+        return cls(np.load(path, mmap_mode='r'))
+
+    def save(self, path: str):
+        np.save(path, np.asarray(self.matrix, dtype=np.float32))
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def nearest(self, vectors: np.ndarray, count: int, skip: Tuple[int, int] = (0, 0)) -> List[Tuple[np.ndarray, np.ndarray]]:
+        '''(rows, squared distances) of the count lines closest to each of vectors, closest first, rows in skip left out'''
+        vectors = np.atleast_2d(vectors)
+        # |row - vector|^2 without the |vector|^2 term, which is the same for every row and added back at the end
+        distances = self.matrix @ vectors.T
+        distances *= -2.0
+        distances += self.norms[:, None]
+        distances[skip[0]:skip[1]] = np.inf
+        count = min(count, len(distances) - (skip[1] - skip[0]))
+        if count <= 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in vectors]
+        closest = np.argpartition(distances, count - 1, axis=0)[:count]
+        nearest = []
+        for column, vector in enumerate(vectors):
+            rows = closest[:, column]
+            row_distances = distances[rows, column]
+            order = np.argsort(row_distances)
+            nearest.append((rows[order], row_distances[order] + float(vector @ vector)))
+        return nearest
+
+
+def for_book(book_dir: str) -> Optional[LineFeatures]:
+    '''features of a folder in extracts/, None when they were not built or no longer match the book's lines'''
+    book_dir = os.path.normpath(book_dir)
+    if book_dir not in _features:
+        path = os.path.join(book_dir, LINE_FEATURES_NAME)
+        features = LineFeatures.load(path) if os.path.isfile(path) else None
+        if features is not None and len(features) != len(line_index.for_book(book_dir)):
+            features = None
+        _features[book_dir] = features
+    return _features[book_dir]
@@ -0,0 +1,104 @@
+import os
+import random
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import corpus
+import helpers
+
+'''Every non empty line of a book, crossout draws the lines it slips into a page from here
+The lines of all chapters are kept in chapter order in one string, line k is text[offsets[k]:offsets[k+1] - 1],
+and each chapter records the range of line numbers it covers. Lines from other chapters are drawn
+by picking a random number outside that range, no filtered copy of the book is made.
+A book's index is read from its chapters the first time one of them is played and kept for the process.
+'''
+
+# random draws per wanted line before sample() gives up, only lines equal to one of the chapter's are drawn again
+SAMPLE_TRIES = 8
+
+_indexes: Dict[str, "LineIndex"] = {}
+
+
+def read_chapter_lines(extract_path: str) -> List[str]:
+    '''all non empty lines of a chapter, stripped, page headers left out'''
+    packed = corpus.find_chapter(extract_path)
+    if packed:
+        book, chapter = packed
+        return book.chapter_lines(chapter)
+    with open(extract_path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip() and "| Page " not in line]
+    return lines
+
+
+class LineIndex:
+    def __init__(self, chapters: Iterable[Tuple[int, List[str]]]):
+        '''chapters are (chapter number, lines) in book order'''
+        pieces = []
+        self.offsets = array('I', [0])
+        self.ranges: Dict[int, Tuple[int, int]] = {}
+        for chapter, lines in chapters:
+            first = len(pieces)
+            for line in lines:
+                pieces.append(line + "\n")
+                self.offsets.append(self.offsets[-1] + len(line) + 1)
+            self.ranges[chapter] = (first, len(pieces))
+        self.text = "".join(pieces)
+        self._chapter_sets: Dict[int, FrozenSet[str]] = {}
+
+    @classmethod
+    def from_book(cls, book_dir: str) -> "LineIndex":
+        return cls((chapter, read_chapter_lines(os.path.join(book_dir, f"chapter_{chapter}.txt")))
+                   for chapter in helpers.list_chapters(book_dir))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def line(self, k: int) -> str:
+        return self.text[self.offsets[k]:self.offsets[k + 1] - 1]
+
+    def chapter_lines(self, chapter: int) -> List[str]:
+        first, end = self.ranges.get(chapter, (0, 0))
+        return [self.line(k) for k in range(first, end)]
+
+    def chapter_set(self, chapter: int) -> FrozenSet[str]:
+        '''the lines of a chapter as a set, made once per chapter'''
+        lines = self._chapter_sets.get(chapter)
+        if lines is None:
+            lines = frozenset(self.chapter_lines(chapter))
+            self._chapter_sets[chapter] = lines
+        return lines
+
+    def sample(self, count: int, chapter: Optional[int] = None, exclude=frozenset()) -> List[str]:
+        '''up to count different lines from outside the chapter, none of them equal to a line of the chapter or in exclude'''
+        first, end = self.ranges.get(chapter, (0, 0))
+        outside = len(self) - (end - first)
+        picked: List[str] = []
+        if outside <= 0:
+            return picked
+        chapter_lines = self.chapter_set(chapter) if chapter in self.ranges else frozenset()
+        for _ in range(count * SAMPLE_TRIES):
+            k = random.randrange(outside)
+            if k >= first:
+                k += end - first
+            line = self.line(k)
+            if line not in chapter_lines and line not in exclude and line not in picked:
+                picked.append(line)
+                if len(picked) == count:
+                    break
+        return picked
+
+
+def for_book(book_dir: str) -> LineIndex:
+    '''index of a folder in extracts/, empty when there is no such folder'''
+    book_dir = os.path.normpath(book_dir)
+    index = _indexes.get(book_dir)
+    if index is None:
+        index = LineIndex.from_book(book_dir) if os.path.isdir(book_dir) else LineIndex([])
+        _indexes[book_dir] = index
+    return index
+
+
+def for_extract(extract_path: str) -> Tuple[LineIndex, Optional[int]]:
+    '''index of the book an extract belongs to and the extract's chapter number, None for a file not named chapter_N.txt'''
+    chapter_file = corpus.CHAPTER_FILE.fullmatch(os.path.basename(extract_path))
+    return for_book(os.path.dirname(extract_path)), int(chapter_file.group(1)) if chapter_file else None
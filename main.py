@@ -7,6 +7,9 @@ import choice_endpoint
 import spellcheck_endpoint
 import switch_endpoint
 import crossout_endpoints
+import helpers
+import generation_service
+import process_memory
 
 app = FastAPI()
 
@@ -38,6 +41,22 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.on_event("shutdown")
+def stop_generation_workers():
+    generation_service.shutdown()
+
+@app.get("/generation")
+async def generation_stats():
+    return generation_service.stats()
+
+@app.get("/memory")
+async def memory_stats():
+    return {"pid": os.getpid(), **process_memory.memory()}
+
+@app.get("/cache")
+async def cache_stats():
+    return {"chapters": helpers.CHAPTER_CACHE.stats(), "tokens": helpers.TOKEN_MEMO.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
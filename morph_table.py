@@ -0,0 +1,74 @@
+from typing import Dict, List, Optional, Tuple
+
+'''Morph strings of every token interned into one process wide table
+Each distinct string such as "Case=Nom|Gender=Fem|Number=Sing" is parsed once into an immutable
+tuple of (field, value) pairs and gets an integer id, tokens only carry the id.
+Two tokens have the same morph exactly when their ids are equal, and comparing a few fields
+is a comparison of the small tuples key() returns, which are computed once per id.
+'''
+
+Features = Tuple[Tuple[str, str], ...]
+
+
+def parse_features(features: str) -> Features:
+    return tuple(sorted(tuple(feature.split("=", 1)) for feature in features.split("|") if "=" in feature))
+
+
+class Morph:
+    '''read only stand-in for spaCy's MorphAnalysis, there is one per id'''
+    __slots__ = ("id", "features", "_string")
+
+    def __init__(self, morph_id: int, string: str, features: Features):
+        self.id = morph_id
+        self.features = features
+        self._string = string
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.features)
+
+    def get(self, field: str, default=None) -> List[str]:
+        for name, value in self.features:
+            if name == field:
+                return value.split(",")
+        return default if default is not None else []
+
+    def __str__(self):
+        return self._string
+
+    def __repr__(self):
+        return f"Morph({self._string!r})"
+
+
+class MorphTable:
+    def __init__(self):
+        self.morphs: List[Morph] = []
+        self._ids: Dict[str, int] = {}
+        self._keys: Dict[Tuple[int, Tuple[str, ...]], Tuple[Optional[str], ...]] = {}
+
+    def intern(self, string: str) -> int:
+        '''id of a morph string, the string is parsed the first time it is seen'''
+        morph_id = self._ids.get(string)
+        if morph_id is None:
+            morph_id = len(self.morphs)
+            self.morphs.append(Morph(morph_id, string, parse_features(string)))
+            self._ids[string] = morph_id
+        return morph_id
+
+    def key(self, morph_id: int, fields: Tuple[str, ...]) -> Tuple[Optional[str], ...]:
+        '''values of fields in the morph, None for a missing field'''
+        cache_key = (morph_id, fields)
+        key = self._keys.get(cache_key)
+        if key is None:
+            features = dict(self.morphs[morph_id].features)
+            key = tuple(features.get(field) for field in fields)
+            self._keys[cache_key] = key
+        return key
+
+    def __getitem__(self, morph_id: int) -> Morph:
+        return self.morphs[morph_id]
+
+    def __len__(self):
+        return len(self.morphs)
+
+
+MORPHS = MorphTable()
@@ -0,0 +1,90 @@
+import bisect
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+from helpers import is_punctuation
+
+'''A page split once into the lines and words the id based games (anagram, spellcheck, switch) show
+A word is a run of characters between spaces, exactly what the frontend gets one id for,
+its value carries the line break when it is the last piece of a line followed by another line.
+Token offsets from spaCy or regex_tokenizer are aligned to words by containment, so a token
+whose word starts with a quote or a bracket ("„Może") still finds its word.
+'''
+
+
+class Word(NamedTuple):
+    start: int
+    end: int
+    line: int
+    ends_line: bool
+
+
+def merge_parts_with_punctuation(parts: List[str]) -> List[str]:
+    '''merges a word with standalone punctuations and "-"'''
+
+    merged = []
+    buffer = ""
+    for p in parts:
+        if is_punctuation(p) or p in ["—", "-", "–"]:
+            buffer += p + " "
+        else:
+            merged.append(buffer + p)
+            buffer = ""
+    if buffer:
+        if merged:
+            merged[-1] = merged[-1] + " " + buffer.strip()
+        else:
+            merged.append(buffer.strip())
+    return merged
+
+
+class Page:
+    def __init__(self, text: str):
+        self.text = text
+        self.lines = text.split('\n')
+        self.line_starts: List[int] = []
+        self.words: List[Word] = []
+        self._merged: Dict[int, List[str]] = {}
+        position = 0
+        for line_idx, line in enumerate(self.lines):
+            self.line_starts.append(position)
+            has_next_line = line_idx < len(self.lines) - 1
+            parts = line.split(' ')
+            for part_idx, part in enumerate(parts):
+                if part:
+                    self.words.append(Word(position, position + len(part), line_idx, has_next_line and part_idx == len(parts) - 1))
+                position += len(part) + 1
+        self._word_starts = [word.start for word in self.words]
+
+    def value(self, word: Word) -> str:
+        '''what the frontend shows for a word'''
+        text = self.text[word.start:word.end]
+        return text + '\n' if word.ends_line else text
+
+    def words_containing(self, offsets: Iterable[int]) -> Set[int]:
+        '''indices of the words holding any of offsets, offsets in the spaces between words hold none'''
+        found = set()
+        for offset in offsets:
+            k = bisect.bisect_right(self._word_starts, offset) - 1
+            if k >= 0 and offset < self.words[k].end:
+                found.add(k)
+        return found
+
+    def merged(self, line_idx: int) -> List[str]:
+        '''the words of a line with standalone punctuation and dashes merged into them, as switch moves them'''
+        merged = self._merged.get(line_idx)
+        if merged is None:
+            merged = merge_parts_with_punctuation([p for p in self.lines[line_idx].split(' ') if p])
+            self._merged[line_idx] = merged
+        return merged
+
+    def to_model(self, start_id: int, marked_offsets: Iterable[int] = ()):
+        '''(words with ids from start_id, the next free id, ids of the words holding marked_offsets in page order)'''
+        marked = self.words_containing(marked_offsets)
+        words_list = []
+        marked_ids = []
+        for k, word in enumerate(self.words):
+            word_id = str(start_id + k)
+            words_list.append({"id": word_id, "value": self.value(word)})
+            if k in marked:
+                marked_ids.append(word_id)
+        return words_list, start_id + len(self.words), marked_ids
@@ -0,0 +1,38 @@
+from typing import Dict, List
+
+'''Memory of a process as Linux reports it in /proc/<pid>/smaps_rollup
+    rss     every page the process maps, shared ones included
+    pss     shared pages divided among the processes that map them
+    uss     pages only this process maps, what stopping it would free
+After a copy-on-write fork uss is what a worker costs on top of its master
+'''
+
+FIELDS = {"Rss": "rss", "Pss": "pss", "Private_Clean": "uss", "Private_Dirty": "uss"}
+
+
+def memory(pid="self") -> Dict[str, int]:
+    '''rss, pss and uss of a process in bytes, empty when /proc is not available'''
+    usage: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                name, _, value = line.partition(":")
+                if name in FIELDS:
+                    key = FIELDS[name]
+                    usage[key] = usage.get(key, 0) + int(value.split()[0]) * 1024
+    except OSError:
+        return {}
+    return usage
+
+
+def children(pid) -> List[int]:
+    '''ids of the direct child processes'''
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as task_children:
+            return [int(child) for child in task_children.read().split()]
+    except OSError:
+        return []
+
+
+def describe(usage: Dict[str, int]) -> str:
+    return " ".join(f"{key} {usage[key] / 2**20:.1f} MB" for key in ("rss", "pss", "uss") if key in usage)
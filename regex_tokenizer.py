@@ -0,0 +1,287 @@
+import re
+import sys
+import unicodedata
+from typing import Dict, List, Tuple
+
+'''Pure Python tokenizer giving the same word tokens as the pl_core_news_sm tokenizer
+It follows the steps of the spaCy tokenizer: the text is cut at whitespace, prefixes and suffixes
+are peeled off every chunk, the rest is split at infixes and special cases (emoticons) are kept whole.
+The rules below are the Polish rules of spaCy written with plain regular expressions,
+only word tokens are returned, with the token index they would have in the spaCy doc.
+book_management/check_regex_tokenizer.py compares it with spaCy over extracts/.
+'''
+
+WordSpan = Tuple[int, int, int]
+
+LETTER = r"[^\W\d_]"
+LAST_CODE_POINT = 0x2FFFF
+
+
+def char_class(chars: str) -> str:
+    return "".join("\\" + char if char in "\\]^-[" else char for char in chars)
+
+
+def chars_where(predicate) -> str:
+    '''body of a regex character class matching every character up to LAST_CODE_POINT for which predicate holds'''
+    ranges = []
+    for code in range(LAST_CODE_POINT + 1):
+        if predicate(chr(code)):
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+    return "".join(char_class(chr(first)) if first == last else f"{char_class(chr(first))}-{char_class(chr(last))}"
+                   for first, last in ranges)
+
+
+# as in spaCy, letters of scripts without case count as both lower and upper case
+LOWER = chars_where(lambda char: char.isalpha() and not char.isupper())
+UPPER = chars_where(lambda char: char.isalpha() and not char.islower())
+# other symbols (emoji, arrows, box drawing, the degree sign...) are split off like punctuation
+SYMBOLS = chars_where(lambda char: unicodedata.category(char) == "So")
+
+PUNCT = "…,:;!?¿؟¡()[]{}<>_#*&。？！，、；：～·।،۔؛٪"
+QUOTES = "'\"”“`‘´’‚,„»«「」『』（）〔〕【】《》〈〉〈〉⟦⟧"
+HYPHENS = "-–—~"
+CURRENCY = r"\$|£|€|¥|฿|US\$|C\$|A\$|₽|﷼|₴|₠|₡|₢|₣|₤|₥|₦|₧|₨|₩|₪|₫|₭|₮|₯|₰|₱|₲|₳|₵|₶|₷|₸|₹|₺|₻|₼|₾|₿"
+UNITS = ("km|km²|km³|m|m²|m³|dm|dm²|dm³|cm|cm²|cm³|mm|mm²|mm³|ha|µm|nm|yd|in|ft|kg|g|mg|µg|t|lb|oz|m/s|km/h|kmh|mph|"
+         "hPa|Pa|mbar|mb|MB|kb|KB|gb|GB|tb|TB|T|G|M|K|%|км|км²|км³|м|м²|м³|дм|дм²|дм³|см|см²|см³|мм|мм²|мм³|нм|кг|г|мг|"
+         "м/с|км/ч|кПа|Па|мбар|Кб|КБ|кб|Мб|МБ|мб|Гб|ГБ|гб|Тб|ТБ|тбكم|كم²|كم³|م|م²|م³|سم|سم²|سم³|مم|مم²|مم³|كم|غرام|جرام|جم|كغ|ملغ|كوب|اكواب")
+
+# chunks kept as one token even though the affix rules would split them
+SPECIALS = frozenset(r"""
+\t \n — ' \") <space> '' C++ v.v (: (._.) V.V :-o =D :-| ]= (*_*) :-/ [= :-] XDD v_v </3 :-(( (-; :-D ;D ಠ︵ಠ
+:() <333 ಠ_ಠ (= :'-) :/ :] :))) :3 0.0 :-p :x :-))) =] :| ^__^ o.0 0_0 :-)) :-( [: :-3 xD O.o :((( =3 :-X :o)
+>:( -__- 8) :'( @_@ >:o :-x <3 :) =| (¬_¬) :o :> (ಠ_ಠ) :p =( :P 0.o ;_; 8D :1 =) >.< -_- o.o >.> :} xDD (-: :'-(
+o_0 8-D :* (-8 =/ :-O [-: O_O O_o (o: :-> :D ;) :-* :-P 0_o :') :)) ^___^ :( :(( :-((( o_o (-_-) o_O )-: :-0 V_V
+(╯°□°）╯︵┻━┻ ): o.O O.O :X 8-) (>_<) ><(((*> :-} ;-) <33 (^_^) XD ^_^ (; =[ :0 <.< :O ¯\(ツ)/¯ :-) ;-D
+""".split())
+
+PREFIX = re.compile(
+    r"(?:długo|krótko|jedno|dwu|trzy|cztero)-|\.\.+|US\$|C\$|A\$|\+(?![0-9])"
+    rf"|[§%=—–{char_class(PUNCT + QUOTES)}$£€¥฿₽﷼₠-₿{SYMBOLS}]")
+
+SUFFIX = re.compile(
+    rf"(?:''|’’|\.|……|[{char_class(PUNCT + QUOTES)}{SYMBOLS}]"
+    rf"|(?<=[0-9])\+|(?<=[0-9])(?:{CURRENCY})|(?<=[0-9])(?:{UNITS}))$")
+
+INFIX = re.compile(
+    rf"\.\.+|…|[{SYMBOLS}]|[{char_class(HYPHENS)}]"
+    rf"|(?<=[0-9]|{LETTER})\.(?=[0-9{UPPER}])"
+    rf"|(?<={LETTER})[,!?](?={LETTER})"
+    rf"|(?<={LETTER})[:<>=/](?={LETTER})"
+    rf"|(?<={LETTER})[{char_class(QUOTES[1:] + ')]([')}](?=-|{LETTER})")
+
+URL = re.compile(
+    r"(?:[\w+\-.]{2,}://)?(?:\S+(?::\S*)?@)?"
+    r"(?:\d{1,3}(?:\.\d{1,3}){3}"
+    r"|(?:(?:[A-Za-z0-9¡-￿][A-Za-z0-9¡-￿_-]{0,62})?[A-Za-z0-9¡-￿]\.)+"
+    rf"(?:[{LOWER}]{{2,63}}))"
+    r"(?::\d{2,5})?(?:[/?#]\S*)?$")
+
+RUNS = re.compile(r"\S+|\s+")
+CHUNKS = re.compile(r"\S+")
+
+CHUNK_CACHE_SIZE = 200_000
+_chunks: Dict[str, tuple] = {}
+
+
+def is_punct(text: str) -> bool:
+    return all(unicodedata.category(char).startswith("P") for char in text)
+
+
+def is_word(piece: str) -> bool:
+    '''same test as helpers.is_word_token'''
+    return len(piece) > 1 and not piece.isspace() and not is_punct(piece)
+
+
+def prefix_length(text: str) -> int:
+    match = PREFIX.match(text)
+    return match.end() if match else 0
+
+
+def suffix_length(text: str) -> int:
+    match = SUFFIX.search(text)
+    return len(text) - match.start() if match else 0
+
+
+def split_affixes(text: str, specials=SPECIALS):
+    prefixes = []
+    suffixes = []
+    last_size = 0
+    while text and len(text) != last_size:
+        if text in specials:
+            break
+        last_size = len(text)
+        pre_len = prefix_length(text)
+        if pre_len:
+            prefix = text[:pre_len]
+            minus_pre = text[pre_len:]
+            if minus_pre and minus_pre in specials:
+                text = minus_pre
+                prefixes.append(prefix)
+                break
+        suf_len = suffix_length(text[pre_len:])
+        if suf_len:
+            suffix = text[-suf_len:]
+            minus_suf = text[:-suf_len]
+            if minus_suf and minus_suf in specials:
+                text = minus_suf
+                suffixes.append(suffix)
+                break
+        if pre_len and suf_len and pre_len + suf_len <= len(text):
+            text = text[pre_len:-suf_len]
+            prefixes.append(prefix)
+            suffixes.append(suffix)
+        elif pre_len:
+            text = minus_pre
+            prefixes.append(prefix)
+        elif suf_len:
+            text = minus_suf
+            suffixes.append(suffix)
+        if text and text in specials:
+            break
+    return prefixes, text, suffixes
+
+
+def split_infixes(text: str, specials=SPECIALS) -> List[str]:
+    if text in specials or URL.match(text):
+        return [text]
+    pieces = []
+    start = 0
+    for match in INFIX.finditer(text):
+        if match.start() == 0:
+            continue
+        if match.start() != start:
+            pieces.append(text[start:match.start()])
+        if match.start() != match.end():
+            pieces.append(match.group())
+        start = match.end()
+    if text[start:]:
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_pieces(chunk: str, specials=SPECIALS) -> List[str]:
+    prefixes, text, suffixes = split_affixes(chunk, specials)
+    pieces = prefixes
+    if text:
+        pieces.extend(split_infixes(text, specials))
+    pieces.extend(reversed(suffixes))
+    return pieces
+
+
+def special_patterns():
+    '''special cases that the rules split, keyed by the pieces they are split into'''
+    patterns = {}
+    for special in SPECIALS:
+        special_pieces = tuple(split_pieces(special, frozenset()))
+        if len(special_pieces) > 1:
+            patterns[special_pieces] = special
+    return patterns
+
+
+SPECIAL_PATTERNS = special_patterns()
+SPECIAL_LENGTHS = sorted({len(special_pieces) for special_pieces in SPECIAL_PATTERNS})
+# neighbouring pieces of those special cases, used to notice a special case spread over two chunks
+SPECIAL_PAIRS = {pair for special_pieces in SPECIAL_PATTERNS for pair in zip(special_pieces, special_pieces[1:])}
+PAIR_FIRSTS = {first for first, _ in SPECIAL_PAIRS}
+PAIR_SECONDS = {second for _, second in SPECIAL_PAIRS}
+
+
+def special_spans(pieces: List[str]) -> List[Tuple[int, int]]:
+    '''(first, last) of the pieces to join into special cases, longest and leftmost matches first,
+    a match whose first or last piece was already matched is dropped, like in spaCy'''
+    matches = [(first, first + length) for first in range(len(pieces)) for length in SPECIAL_LENGTHS
+               if first + length <= len(pieces) and tuple(pieces[first:first + length]) in SPECIAL_PATTERNS]
+    matches.sort(key=lambda match: (match[0] - match[1], match[0]))
+    seen = set()
+    kept = []
+    for first, last in matches:
+        if first not in seen and last - 1 not in seen:
+            kept.append((first, last))
+        seen.update(range(first, last))
+    return sorted(kept, reverse=True)
+
+
+def split_chunk(chunk: str) -> List[str]:
+    '''tokens of a run of text without whitespace'''
+    if chunk.isalpha() and chunk not in SPECIALS:
+        return [chunk]
+    pieces = split_pieces(chunk)
+    for first, last in special_spans(pieces):
+        pieces[first:last] = ["".join(pieces[first:last])]
+    return pieces
+
+
+def chunk_tokens(chunk: str):
+    '''(offset, length, index) of the word tokens of a chunk and its number of tokens, cached by chunk text,
+    with the first and last piece of the chunk when they can be part of a special case'''
+    cached = _chunks.get(chunk)
+    if cached is None:
+        pieces = split_chunk(chunk)
+        words = []
+        offset = 0
+        for index, piece in enumerate(pieces):
+            if is_word(piece):
+                words.append((offset, len(piece), index))
+            offset += len(piece)
+        unmerged = pieces if len(pieces) == 1 else split_pieces(chunk)
+        head = unmerged[0] if unmerged[0] in PAIR_SECONDS else None
+        tail = unmerged[-1] if unmerged[-1] in PAIR_FIRSTS else None
+        cached = (tuple(words), len(pieces), head, tail)
+        if len(_chunks) >= CHUNK_CACHE_SIZE:
+            _chunks.clear()
+        _chunks[sys.intern(chunk)] = cached
+    return cached
+
+
+def tokenize_pieces(text: str) -> List[WordSpan]:
+    '''slow path of tokenize, splits the whole text before looking for special cases,
+    needed when a special case might be spread over two chunks: spaCy drops such a match
+    but it still hides other matches that overlap it'''
+    pieces = []
+    for run in RUNS.finditer(text):
+        chunk = run.group()
+        start = run.start()
+        if chunk[0].isspace():
+            if pieces and chunk[0] == " ":
+                pieces[-1][2] = True
+                chunk = chunk[1:]
+                start += 1
+            if chunk:
+                pieces.append([start, chunk, False])
+            continue
+        for piece in split_pieces(chunk):
+            pieces.append([start, piece, False])
+            start += len(piece)
+    texts = [piece for _, piece, _ in pieces]
+    for first, last in special_spans(texts):
+        if not any(space_after for _, _, space_after in pieces[first:last - 1]):
+            pieces[first:last] = [[pieces[first][0], "".join(texts[first:last]), pieces[last - 1][2]]]
+    return [(start, start + len(piece), i) for i, (start, piece, _) in enumerate(pieces) if is_word(piece)]
+
+
+def tokenize(text: str) -> List[WordSpan]:
+    '''(start, finish, i) of every word token of a text, i counts all tokens as in a spaCy doc'''
+    words = []
+    i = 0
+    end = 0
+    previous_tail = None
+    for run in CHUNKS.finditer(text):
+        start, stop = run.span()
+        # a single space after a token belongs to that token, any other whitespace is a token of its own
+        if start != end and (end == 0 or start - end > 1 or text[end] != " "):
+            i += 1
+            previous_tail = None
+        end = stop
+        chunk = run.group()
+        cached = _chunks.get(chunk) or chunk_tokens(chunk)
+        chunk_words, count, head, tail = cached
+        if head is not None and (previous_tail, head) in SPECIAL_PAIRS:
+            return tokenize_pieces(text)
+        for offset, length, index in chunk_words:
+            words.append((start + offset, start + offset + length, i + index))
+        i += count
+        previous_tail = tail
+    return words
@@ -1,8 +1,12 @@
-from helpers import read_page, get_token_info_basic
+from helpers import iter_pages, get_token_info_basic, get_token_info_batch
 import random
-from typing import List, Tuple, Dict, Any
-import re
+from typing import List, Tuple, Dict, Any, NamedTuple
+import os
 import sys
+from functools import lru_cache
+
+from vocabulary import get_vocabulary
+from page import Page
 
 ''' 
 Spellcheck module is responsible for generating spellcheck type riddles
@@ -25,238 +29,174 @@ COLOR_RESET = "\033[0m"
 
 MIN_WORD_LENGTH_FOR_TYPO = 3
 
-def swap_adjacent_letters(word: str) -> str:
-    ''' swaps places of a randomly chosen letter and the one directly behind it, 
-    already considering words with double letters like for example "inny"'''
-    word_list = list(word)
-    if len(word_list) < 2:
-        return "".join(word_list)
-    
-    old_word = "".join(word_list)
-    new_word = old_word
-    
-    while old_word == new_word:
-        if len(set(word_list.lower() if hasattr(word_list, 'lower') else [c.lower() for c in word_list])) == 1:
-            break
-            
-        swap_index = random.randint(0, len(word_list) - 2)
-        idx1, idx2 = swap_index, swap_index + 1
-        
-        is_upper1 = word_list[idx1].isupper()
-        is_upper2 = word_list[idx2].isupper()
-        
+# words whose typo variants are kept, least recently used ones are computed again
+TYPO_VARIANTS_SIZE = int(os.environ.get("TYPO_VARIANTS_SIZE", 65536))
 
-        word_list[idx1], word_list[idx2] = word_list[idx2], word_list[idx1]
-        
-        if is_upper1:
-            word_list[idx1] = word_list[idx1].upper()
-        else:
-            word_list[idx1] = word_list[idx1].lower()
-            
-        if is_upper2:
-            word_list[idx2] = word_list[idx2].upper()
-        else:
-            word_list[idx2] = word_list[idx2].lower()
-            
-        new_word = "".join(word_list)
-        
-    return new_word
 
+def with_case_of(char: str, model: str) -> str:
+    return char.upper() if model.isupper() else char.lower()
 
-def change_u(word: str) -> str:
-    ''' changes a randomly chosen u/ó into the other one'''
+
+def swap_variants(word: str) -> Tuple[str, ...]:
+    '''every word made by swapping two adjacent letters, each position keeps its casing,
+    swaps of equal letters (like "nn" in "inny") change nothing and are left out'''
+    variants = []
+    for i in range(len(word) - 1):
+        if word[i].lower() != word[i + 1].lower():
+            variants.append(word[:i] + with_case_of(word[i + 1], word[i]) + with_case_of(word[i], word[i + 1]) + word[i + 2:])
+    return tuple(variants)
+
+
+def u_variants(word: str) -> Tuple[str, ...]:
+    '''every word made by changing one u/ó into the other one'''
     replacements = {'u': 'ó', 'ó': 'u', 'U': 'Ó', 'Ó': 'U'}
-    indices = [i for i, char in enumerate(word) if char.lower() in 'uó']
-    
-    if not indices:
-        return word
-        
-    char_index = random.choice(indices)
-    original_char = word[char_index]
-    
-    return word[:char_index] + replacements[original_char] + word[char_index+1:]
+    return tuple(word[:i] + replacements[char] + word[i + 1:] for i, char in enumerate(word) if char in replacements)
 
 
-def change_rz(word: str) -> str:
-    ''' changes a randomly chosen rz/ż into the other one keeping correct casing '''
+def digraph_variants(word: str, digraph: str, letter: str) -> Tuple[str, ...]:
+    '''every word made by changing one digraph (like "rz") into letter (like "ż") or one letter into the digraph,
+    keeping the casing: "Rz" and "RZ" become "Ż", "Ż" becomes "RZ" in an all caps word and "Rz" otherwise'''
+    lower = word.lower()
+    variants = []
+    for i in range(len(word)):
+        if lower.startswith(digraph, i):
+            variants.append(word[:i] + with_case_of(letter, word[i]) + word[i + 2:])
+        elif lower[i] == letter and not (digraph[1] == letter and i > 0 and lower[i - 1] == digraph[0]):
+            if word[i].isupper():
+                is_all_caps = i + 1 < len(word) and word[i + 1].isupper()
+                replacement = digraph.upper() if is_all_caps else digraph.capitalize()
+            else:
+                replacement = digraph
+            variants.append(word[:i] + replacement + word[i + 1:])
+    return tuple(variants)
 
-    indices_rz = [m.start() for m in re.finditer('rz', word.lower())]
-    indices_z = [m.start() for m in re.finditer('ż', word.lower())]
-    indices = indices_rz + indices_z
 
-    if not indices:
-        return word
-    
-    char_index = random.choice(indices)
-    
-    if word[char_index].lower() == 'r':
-        res = "Ż" if word[char_index].isupper() else "ż"
-        return word[:char_index] + res + word[char_index+2:]
-    
-    else:
-        original_h = word[char_index]
-        if original_h.isupper():
-            is_all_caps = (char_index + 1 < len(word) and word[char_index+1].isupper())
-            res = "RZ" if is_all_caps else "Rz"
-        else:
-            res = "rz"
-            
-        return word[:char_index] + res + word[char_index+1:]
-        
+def rz_variants(word: str) -> Tuple[str, ...]:
+    return digraph_variants(word, "rz", "ż")
 
-def change_ch(word: str) -> str:
-    ''' changes a randomly chosen ch/h into the other one keeping correct casing '''
 
+def ch_variants(word: str) -> Tuple[str, ...]:
+    return digraph_variants(word, "ch", "h")
 
-    indices_ch = [m.start() for m in re.finditer('ch', word.lower())]
-    indices_h = [m.start() for m in re.finditer('h', word.lower()) if m.start() == 0 or word[m.start()-1].lower() != 'c']
-    indices = indices_ch + indices_h
 
-    if not indices:
-        return word
-    
-    char_index = random.choice(indices)
-    
+@lru_cache(maxsize=TYPO_VARIANTS_SIZE)
+def typo_families(word: str) -> Tuple[Tuple[str, ...], ...]:
+    '''the typos of a word grouped by kind (swap, u/ó, rz/ż, ch/h), kinds without any typo are left out,
+    words shorter than MIN_WORD_LENGTH_FOR_TYPO only get swaps,
+    a variant that is a word of the corpus vocabulary (like "morze" for "może") is not a typo'''
+    kinds = [swap_variants] if len(word) < MIN_WORD_LENGTH_FOR_TYPO else [swap_variants, u_variants, rz_variants, ch_variants]
+    vocabulary = get_vocabulary()
+    families = []
+    for kind in kinds:
+        variants = tuple(dict.fromkeys(variant for variant in kind(word) if variant != word and variant not in vocabulary))
+        if variants:
+            families.append(variants)
+    return tuple(families)
 
-    if word[char_index].lower() == 'c':
-        res = "H" if word[char_index].isupper() else "h"
-        return word[:char_index] + res + word[char_index+2:]
-    
 
-    else:
-        original_h = word[char_index]
-        if original_h.isupper():
-            is_all_caps = (char_index + 1 < len(word) and word[char_index+1].isupper())
-            res = "CH" if is_all_caps else "Ch"
-        else:
-            res = "ch"
-            
-        return word[:char_index] + res + word[char_index+1:]
+def has_typo(word: str) -> bool:
+    return bool(typo_families(word))
 
 
-def generate_typo_distractor(correct_word: str) -> str:
-    '''randomly chooses what type of type the word will have'''
-    word_lower = correct_word.lower()
-    
-    if len(correct_word) < MIN_WORD_LENGTH_FOR_TYPO:
-        return swap_adjacent_letters(correct_word)
+def pick_variant(word: str, variants: Tuple[str, ...]) -> str:
+    return random.choice(variants) if variants else word
 
-    options = [swap_adjacent_letters]
 
-    if any(c in word_lower for c in 'uó'):
-        options.append(change_u)
-    
-    if any(sub in word_lower for sub in ['rz', 'ż']):
-        options.append(change_rz)
+def swap_adjacent_letters(word: str) -> str:
+    ''' swaps places of a randomly chosen letter and the one directly behind it, 
+    already considering words with double letters like for example "inny"'''
+    return pick_variant(word, swap_variants(word))
+
+
+def change_u(word: str) -> str:
+    ''' changes a randomly chosen u/ó into the other one'''
+    return pick_variant(word, u_variants(word))
+
+
+def change_rz(word: str) -> str:
+    ''' changes a randomly chosen rz/ż into the other one keeping correct casing '''
+    return pick_variant(word, rz_variants(word))
         
-    if any(sub in word_lower for sub in ['ch', 'h']):
-        options.append(change_ch)
 
-    chosen_transform = random.choice(options)
-    
-    return chosen_transform(correct_word)
+def change_ch(word: str) -> str:
+    ''' changes a randomly chosen ch/h into the other one keeping correct casing '''
+    return pick_variant(word, ch_variants(word))
 
 
-def generate_riddle(page: str) -> Tuple[str, List[Tuple[str, str]]]:
-    ''' this function generates a singular page of riddle'''
-    word_tokens = get_token_info_basic(page) 
+def generate_typo_distractor(correct_word: str) -> str:
+    '''randomly chooses what type of typo the word will have, then one typo of that type,
+    returns the word itself only when it has no typo at all (see has_typo)'''
+    families = typo_families(correct_word)
+    if not families:
+        return correct_word
+    return random.choice(random.choice(families))
+
+
+class Typo(NamedTuple):
+    '''a word of the page replaced by a typo, start is the word's offset in the page,
+    masked_start the typo's offset in the masked page and i the index of the word's token'''
+    correct: str
+    typo: str
+    start: int
+    masked_start: int
+    i: int
+
+
+def generate_riddle(page: str, word_tokens: List = None) -> Tuple[str, List[Typo]]:
+    ''' this function generates a singular page of riddle, word_tokens can be passed if the page was already tokenized
+    returns the masked page and its typos in page order'''
+    if word_tokens is None:
+        word_tokens = get_token_info_basic(page) 
     
-    maskable_tokens = [t for t in word_tokens if len(t.original_text) >= MIN_WORD_LENGTH_FOR_TYPO]
+    maskable_tokens = [t for t in word_tokens if len(t.original_text) >= MIN_WORD_LENGTH_FOR_TYPO and has_typo(t.original_text)]
     
-    riddle_words_data: List[Tuple[str, str]] = []
+    typos: List[Typo] = []
     
     if not maskable_tokens:
-        return page, riddle_words_data
+        return page, typos
 
     max_to_mask = min(len(maskable_tokens), MAX_WORDS)
-    words_count = random.randint(MIN_WORDS, max_to_mask)
+    words_count = random.randint(min(MIN_WORDS, max_to_mask), max_to_mask)
     
-    tokens_to_mask = random.sample(maskable_tokens, words_count)
+    tokens_to_mask = sorted(random.sample(maskable_tokens, words_count), key=lambda t: t.start)
     
-    replacements = [] 
+    masked_parts = []
+    last_end = 0
+    shift = 0
     
     for token_info in tokens_to_mask:
         correct_word = token_info.original_text
-        if len(correct_word)<2:
-            continue
         typo_to_insert = generate_typo_distractor(correct_word)
         
-        while typo_to_insert == correct_word:
-            typo_to_insert = generate_typo_distractor(correct_word)
-        
-        
         start = token_info.start
         end = token_info.finish
-        riddle_words_data.append((correct_word, typo_to_insert, start))
+        typos.append(Typo(correct_word, typo_to_insert, start, start + shift + len(COLOR_START), token_info.i))
         
         replacement = f"{COLOR_START}{typo_to_insert}{COLOR_RESET}"
-        replacements.append((start, end, replacement))
+        masked_parts.append(page[last_end:start])
+        masked_parts.append(replacement)
+        last_end = end
+        shift += len(replacement) - (end - start)
 
-    replacements.sort(key=lambda x: x[0], reverse=True)
-    riddle_words_data.sort(key=lambda x: x[2])
-    riddle_words_data = [(original, typo) for original, typo, _ in riddle_words_data]
-    masked_page = page
-    
-    for start, end, replacement in replacements:
-        masked_page = masked_page[:start] + replacement + masked_page[end:]
-        
-    return masked_page, riddle_words_data
+    masked_parts.append(page[last_end:])
+    return "".join(masked_parts), typos
 
 
-def generate_level(extract_path: str) -> List[Tuple[str, List[Tuple[str, str]]]]:
+def generate_level(extract_path: str) -> List[Tuple[str, List[Typo]]]:
     ''' this function generates a full riddle of all the pages'''
     pages_and_words = []
-    count = 1
+    pages_content = [page_content for _, page_content in iter_pages(extract_path)]
     
-    while True:
-        page_content = read_page(extract_path, count)
-        if not page_content:
-            break
-        
-        masked_page, riddle_words_data = generate_riddle(page_content) 
+    for page_content, word_tokens in zip(pages_content, get_token_info_batch(pages_content)):
+        masked_page, riddle_words_data = generate_riddle(page_content, word_tokens) 
         pages_and_words.append((masked_page, riddle_words_data))
-        count += 1
         
     return pages_and_words
 
 
-def transform_to_spellcheck_model(page_text: str, all_tokens: List, typos_data: List[Tuple[str, str, int]], start_id: int, game_id: int) -> Tuple[Dict[str, Any], int, List[str]]:
-    ''' this transforms the riddle into the form needed by the endpoint'''
-    words_list = []
-    current_id = start_id
-    typo_ids = []
-    
-    typo_starts = {pos for _, _, pos in typos_data}
-    
-    current_pos = 0
-    lines = page_text.split('\n')
-    
-    for line_idx, line in enumerate(lines):
-        if not line and line_idx < len(lines) - 1:
-            current_pos += 1
-            continue
-            
-        parts = line.split(' ')
-        for part_idx, part in enumerate(parts):
-            if not part:
-                current_pos += 1
-                continue
-            
-            word_id = str(current_id)
-            is_last_in_line = line_idx < len(lines) - 1 and part_idx == len(parts) - 1
-            display_val = part + '\n' if is_last_in_line else part
-            
-            words_list.append({
-                "id": word_id,
-                "value": display_val
-            })
-            
-            if current_pos in typo_starts:
-                typo_ids.append(word_id)
-            
-            current_pos += len(part) + 1
-            current_id += 1
-            
+def transform_to_spellcheck_model(page_text: str, all_tokens: List, typos_data: List[Typo], start_id: int, game_id: int) -> Tuple[Dict[str, Any], int, List[str]]:
+    ''' this transforms the riddle into the form needed by the endpoint, page_text is the masked page'''
+    words_list, next_id, typo_ids = Page(page_text).to_model(start_id, (typo.masked_start for typo in typos_data))
     return {
         "gameId": game_id,
         "riddle": {
@@ -264,7 +204,43 @@ def transform_to_spellcheck_model(page_text: str, all_tokens: List, typos_data:
                 "words": words_list
             }
         }
-    }, current_id, typo_ids
+    }, next_id, typo_ids
+
+
+def build_spellcheck_game(extract_path: str):
+    '''riddles of every page of a chapter and the state needed to check the answers'''
+    pages = list(iter_pages(extract_path))
+    pages_tokens = get_token_info_batch([page_content for _, page_content in pages])
+    
+    riddles = []
+    all_typo_ids = set()
+    page_to_ids = {}
+    current_word_id = 1
+    
+    for (page_idx, original_page), word_tokens in zip(pages, pages_tokens):
+        masked_page, typos = generate_riddle(original_page, word_tokens)
+        if not word_tokens: continue
+
+        spellcheck_model, next_id, page_typo_ids = transform_to_spellcheck_model(
+            masked_page, 
+            word_tokens, 
+            typos,
+            current_word_id,
+            0  # the game id is picked by start_spellcheck_game
+        )
+        
+        p_ids = {w["id"] for w in spellcheck_model["riddle"]["prompt"]["words"]}
+        page_to_ids[page_idx] = p_ids
+        all_typo_ids.update(page_typo_ids)
+        current_word_id = next_id
+        riddles.append(spellcheck_model["riddle"])
+    
+    return riddles, {
+        "correct_ids": all_typo_ids,
+        "page_to_ids": page_to_ids,
+        "total_pages": len(riddles)
+    }
+
 
 if __name__=="__main__":
     extract_file_path = FILE_PATH
@@ -282,6 +258,6 @@ if __name__=="__main__":
             
         print("| Solutions |")
         
-        for correct, typo in riddle_data:
-            print(f"Typo: {typo} | Correct: {correct}")
+        for typo in riddle_data:
+            print(f"Typo: {typo.typo} | Correct: {typo.correct}")
         
\ No newline at end of file
@@ -4,8 +4,8 @@ from pydantic import BaseModel
 from datetime import datetime, timedelta
 import random
 
-from helpers import read_page, get_token_info_basic
-from spellcheck import generate_level, transform_to_spellcheck_model
+from spellcheck import build_spellcheck_game
+from generation_service import generate, GenerationBusy, GenerationTimeout
 
 '''this module handles endpoints responsible for spellcheck riddle'''
 
@@ -63,61 +63,21 @@ async def start_spellcheck_game(request: GameRequest, background_tasks: Backgrou
     
     try:
         extract_path = f"extracts/book_{request.bookId}/chapter_{request.chapter}.txt"
-        game_id = random.randint(1000, 9999)
-        while (game_id in active_games):
-            game_id = random.randint(1000, 9999)
-        pages_with_typos = generate_level(extract_path)
-        
-        all_pages_responses = []
-        all_typo_ids = set()
-        page_to_ids = {}
-        current_word_id = 1
-        
-        for page_idx, (masked_page, typo_data) in enumerate(pages_with_typos, 1):
-            original_page = read_page(extract_path, page_idx)
-            if not original_page: continue
-                
-            word_tokens = get_token_info_basic(original_page)
-            if not word_tokens: continue
-
-            typos_with_positions = []
-            for correct_word, typo_word in typo_data:
-                for token in word_tokens:
-                    if token.original_text == correct_word and not token.original_text == typo_word:
-                        typos_with_positions.append((correct_word, typo_word, token.start))
-                        break
-
-
-            spellcheck_model, next_id, page_typo_ids = transform_to_spellcheck_model(
-                masked_page, 
-                word_tokens, 
-                typos_with_positions,
-                current_word_id,
-                game_id 
-            )
-            
-            p_ids = {w["id"] for w in spellcheck_model["riddle"]["prompt"]["words"]}
-            page_to_ids[page_idx] = p_ids
-            all_typo_ids.update(page_typo_ids)
-            current_word_id = next_id
-            
-            riddle_words = [RiddleWord(id=w["id"], value=w["value"]) for w in spellcheck_model["riddle"]["prompt"]["words"]]
-            all_pages_responses.append(SpellcheckResponse(
-                gameId=game_id,
-                riddle=SpellcheckRiddle(prompt=GameText(words=riddle_words))
-            ))
-        
-        active_games[game_id] = {
-            "start_time": datetime.now(),
-            "correct_ids": all_typo_ids,
-            "page_to_ids": page_to_ids,
-            "total_pages": len(all_pages_responses)
-        }
-        return all_pages_responses
-        
+        riddles, game_state = await generate(build_spellcheck_game, extract_path)
+    except GenerationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except GenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    game_id = random.randint(1000, 9999)
+    while (game_id in active_games):
+        game_id = random.randint(1000, 9999)
+    active_games[game_id] = {**game_state, "start_time": datetime.now()}
+
+    return [SpellcheckResponse(gameId=game_id, riddle=SpellcheckRiddle(**riddle)) for riddle in riddles]
+
 @router.post("/spellcheck/submit", response_model=ResultResponse)
 async def submit_spellcheck_answers(request: SpellcheckAnswerRequest):
     ''' checks solution '''
@@ -1,4 +1,5 @@
-from helpers import read_page, is_punctuation
+from helpers import iter_pages, get_token_info_batch
+from page import Page
 import random
 from typing import List, Dict, Any
 import sys
@@ -15,40 +16,19 @@ MAX_PAIRS = 5
 COLOR_START = ""
 COLOR_RESET = ""
 
-def merge_parts_with_punctuation(parts: List[str]) -> List[str]:
-    '''merges a word with standalone punctuations and "-"'''
-
-    merged = []
-    buffer = ""
-    for p in parts:
-        if is_punctuation(p) or p in ["—", "-", "–"]:
-            buffer += p + " "
-        else:
-            merged.append(buffer + p)
-            buffer = ""
-    if buffer:
-        if merged:
-            merged[-1] = merged[-1] + " " + buffer.strip()
-        else:
-            merged.append(buffer.strip())
-    return merged
-
-def switch_word_riddle(page, swapped_word):
-    '''swaps a position of 2 consecutive words'''
-    lines = page.split("\n")
-    content_lines_indices = [i for i, line in enumerate(lines) if line.strip()]
+def switch_word_riddle(page: Page, swapped_lines: Dict[int, List[str]], swapped_word):
+    '''swaps a position of 2 consecutive words of a random line, swapped_lines holds the merged words
+    of the lines swapped so far and gets the new order, returns (line_index, swap_index) or (None, None)'''
+    content_lines_indices = [i for i, line in enumerate(page.lines) if line.strip()]
     
     if not content_lines_indices:
-        return page, (None, None)
+        return None, None
 
     line_index = random.choice(content_lines_indices)
-    original_line = lines[line_index]
-    
-    parts = [p for p in original_line.split(' ') if p]
-    words = merge_parts_with_punctuation(parts)
+    words = list(swapped_lines.get(line_index, page.merged(line_index)))
     
     if len(words) < 2:
-        return page, (None, None)
+        return None, None
 
     valid_pairs = []
     for i in range(len(words) - 1):
@@ -56,17 +36,17 @@ def switch_word_riddle(page, swapped_word):
             valid_pairs.append(i)
 
     if not valid_pairs:
-        return page, (None, None)
+        return None, None
 
     swap_index = select_swap_index(valid_pairs, line_index, swapped_word)
     if swap_index is None:
-        return page, (None, None)
+        return None, None
 
     word1, word2 = words[swap_index], words[swap_index + 1]
     words[swap_index], words[swap_index + 1] = word2, word1
     
-    lines[line_index] = ' '.join(words)
-    return "\n".join(lines), (line_index, swap_index)
+    swapped_lines[line_index] = words
+    return line_index, swap_index
 
 def select_swap_index(valid_pairs, line_index, swapped_word):
     '''selects an index for word to be swapped, making sure none of words were already swapped'''
@@ -81,54 +61,48 @@ def select_swap_index(valid_pairs, line_index, swapped_word):
             return idx
     return None
 
-def generate_riddle(page):
-    '''generates a singular page of riddle'''
-    riddle = page
+def swap_words(page: Page):
+    '''swaps up to MIN_PAIRS pairs of the page, returns the riddle text and the swapped lines as merged words'''
+    swapped_lines: Dict[int, List[str]] = {}
     swapped_words = []
     for _ in range(MIN_PAIRS):
-        riddle_text, coords = switch_word_riddle(riddle, swapped_words)
+        coords = switch_word_riddle(page, swapped_lines, swapped_words)
         if coords[0] is not None:
             swapped_words.append(coords)
-            riddle = riddle_text
+    lines = list(page.lines)
+    for line_index, words in swapped_lines.items():
+        lines[line_index] = ' '.join(words)
+    return "\n".join(lines), swapped_lines
+
+def generate_riddle(page):
+    '''generates a singular page of riddle'''
+    riddle, _ = swap_words(Page(page))
     return riddle
 
 def generate_level(extract_path):
     '''generates a level'''
     pages = []
-    count = 1
-    while True:
-        content = read_page(extract_path, count)
-        if not content:
-            break
+    for _, content in iter_pages(extract_path):
         pages.append(generate_riddle(content))
-        count += 1
     return pages
 
 def transform_to_switch_model(page_content: str, word_tokens: List, starting_id: int) -> Dict[str, Any]:
-
-    riddle_text = generate_riddle(page_content)
-    og_lines = page_content.split('\n')
-    rid_lines = riddle_text.split('\n')
+    '''words of the page with the swapped pairs, a word whose position holds a different word than on the page is swapped'''
+    page = Page(page_content)
+    _, swapped_lines = swap_words(page)
     
     words_data = []
     swapped_ids = set()
     current_id = starting_id
     
-    for line_idx, (og_line, rid_line) in enumerate(zip(og_lines, rid_lines)):
-        og_parts = merge_parts_with_punctuation([p for p in og_line.split(' ') if p])
-        rid_parts = merge_parts_with_punctuation([p for p in rid_line.split(' ') if p])
+    for line_idx in range(len(page.lines)):
+        og_parts = page.merged(line_idx)
+        rid_parts = swapped_lines.get(line_idx, og_parts)
         
-        count = max(len(og_parts), len(rid_parts))
-        for i in range(count):
-            o_val = og_parts[i] if i < len(og_parts) else ""
-            r_val = rid_parts[i] if i < len(rid_parts) else ""
-            
-            if not r_val and not o_val:
-                continue
-            
+        is_not_last_line = line_idx < len(page.lines) - 1
+        for i, (o_val, r_val) in enumerate(zip(og_parts, rid_parts)):
             word_id = str(current_id)
-            is_last = line_idx < len(rid_lines) - 1 and i == count - 1
-            display_val = r_val + '\n' if is_last else r_val
+            display_val = r_val + '\n' if is_not_last_line and i == len(rid_parts) - 1 else r_val
             
             words_data.append({"id": word_id, "value": display_val})
             if o_val != r_val:
@@ -141,6 +115,39 @@ def transform_to_switch_model(page_content: str, word_tokens: List, starting_id:
         "next_id": current_id
     }
 
+
+def build_switch_game(extract_path: str):
+    '''riddles of every page of a chapter and the state needed to check the answers'''
+    riddles = []
+    all_correct_swapped_ids = set()
+    
+    page_to_ids = {}
+    
+    current_id = 1
+
+    pages = list(iter_pages(extract_path))
+    pages_tokens = get_token_info_batch([page_content for _, page_content in pages])
+
+    for (page_idx, page_content), word_tokens in zip(pages, pages_tokens):
+        if not word_tokens:
+            continue
+
+        page_data = transform_to_switch_model(page_content, word_tokens, current_id)
+        
+        page_ids = {w["id"] for w in page_data["words"]}
+        page_to_ids[page_idx] = page_ids
+        
+        current_id = page_data["next_id"]
+        all_correct_swapped_ids.update(page_data["swapped_ids"])
+        riddles.append({"prompt": {"words": page_data["words"]}})
+
+    return riddles, {
+        "correct_ids": all_correct_swapped_ids,
+        "page_to_ids": page_to_ids,
+        "total_pages": len(riddles)
+    }
+
+
 if __name__ == "__main__":
     extract_file_path = FILE_PATH
     if len(sys.argv) > 1:
@@ -4,8 +4,8 @@ from pydantic import BaseModel
 from datetime import datetime, timedelta
 import random
 
-from helpers import read_page, get_token_info_basic
-from switch import transform_to_switch_model
+from switch import build_switch_game
+from generation_service import generate, GenerationBusy, GenerationTimeout
 
 class GameRequest(BaseModel):
     bookId: int
@@ -63,54 +63,21 @@ async def start_switch_game(request: GameRequest, background_tasks: BackgroundTa
         
     try:
         extract_path = f"extracts/book_{request.bookId}/chapter_{request.chapter}.txt"
-        game_id = random.randint(1000, 9999)
-        while (game_id in active_games):
-            game_id = random.randint(1000, 9999)
-        all_pages_responses = []
-        all_correct_swapped_ids = set()
-        
-        page_to_ids = {}
-        
-        page_idx = 1
-        current_id = 1
-
-        while True:
-            page_content = read_page(extract_path, page_idx)
-            if not page_content:
-                break
-            
-            word_tokens = get_token_info_basic(page_content)
-            if not word_tokens:
-                page_idx += 1
-                continue
-
-            page_data = transform_to_switch_model(page_content, word_tokens, current_id)
-            
-            page_ids = {w["id"] for w in page_data["words"]}
-            page_to_ids[page_idx] = page_ids
-            
-            current_id = page_data["next_id"]
-            all_correct_swapped_ids.update(page_data["swapped_ids"])
-
-            all_pages_responses.append(SwitchResponse(
-                gameId=game_id,
-                riddle=SwitchRiddle(
-                    prompt=GameText(words=[RiddleWord(**w) for w in page_data["words"]])
-                )
-            ))
-            page_idx += 1
-
-        active_games[game_id] = {
-            "start_time": datetime.now(),
-            "correct_ids": all_correct_swapped_ids,
-            "page_to_ids": page_to_ids,
-            "total_pages": len(all_pages_responses)
-        }
-
-        return all_pages_responses
+        riddles, game_state = await generate(build_switch_game, extract_path)
+    except GenerationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except GenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    game_id = random.randint(1000, 9999)
+    while (game_id in active_games):
+        game_id = random.randint(1000, 9999)
+    active_games[game_id] = {**game_state, "start_time": datetime.now()}
+
+    return [SwitchResponse(gameId=game_id, riddle=SwitchRiddle(**riddle)) for riddle in riddles]
+
 @router.post("/switch/submit", response_model=ResultResponse)
 async def submit_switch_answers(request: SwitchAnswerRequest):
     if request.gameId not in active_games:
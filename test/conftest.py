@@ -0,0 +1,44 @@
+import contextlib
+import sys
+
+sys.path.append('.')
+import helpers
+from token_table import TokenTable
+
+import pytest
+
+
+class ModelMustNotRun:
+    '''stands in for a spaCy pipeline on paths that must not parse anything'''
+
+    def __call__(self, text):
+        raise AssertionError("spaCy ran where it should not")
+
+    def pipe(self, texts, **kwargs):
+        raise AssertionError("spaCy ran where it should not")
+
+
+@pytest.fixture
+def spacy_must_not_run():
+    '''a context manager in which running either spaCy pipeline fails the test, it yields its MonkeyPatch'''
+    @contextlib.contextmanager
+    def must_not_run():
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(helpers, "_basic_nlp", ModelMustNotRun())
+            patch.setattr(helpers, "_detailed_nlp", ModelMustNotRun())
+            yield patch
+    return must_not_run
+
+
+@pytest.fixture
+def detailed_tokens():
+    '''builds a TokenTable of (word, pos, morph) triples, the words separated by spaces'''
+    def build(words):
+        text = " ".join(word for word, _, _ in words)
+        spans = []
+        start = 0
+        for i, (word, _, _) in enumerate(words):
+            spans.append((start, start + len(word), i))
+            start += len(word) + 1
+        return TokenTable(text, spans, [pos for _, pos, _ in words], [morph for _, _, morph in words])
+    return build
@@ -1,9 +1,17 @@
 import pytest
 import sys
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 sys.path.append('.')
 import anagram
+import anagram_index
+from anagram_index import AnagramIndex
+
+
+@pytest.fixture(autouse=True)
+def no_anagram_index(monkeypatch):
+    '''every word counts as the only one of its letters unless a test sets an index, whatever extracts/ has'''
+    monkeypatch.setattr(anagram_index, "_index", AnagramIndex({}))
 
 def test_get_anagram():
     with patch('random.shuffle') as mock_shuffle:
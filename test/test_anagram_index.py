@@ -0,0 +1,59 @@
+import random
+import sys
+
+sys.path.append('.')
+import anagram
+import anagram_index
+from anagram_index import AnagramIndex, signature
+
+import pytest
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = AnagramIndex.from_words(["kot", "Kto", "tok", "lato", "może", "Anna", "ponieważ", "poważnie"])
+    monkeypatch.setattr(anagram_index, "_index", index)
+    return index
+
+
+def test_only_shared_signatures_are_kept(index):
+    assert index.signatures == {signature("kot"): ["kot", "kto", "tok"], signature("ponieważ"): ["ponieważ", "poważnie"]}
+    assert index.anagrams("Kot") == ["kto", "tok"]
+    assert index.is_unique("lato") and index.is_unique("Anna") and index.is_unique("pies")
+    assert not index.is_unique("ponieważ")
+
+
+def test_is_solution(index):
+    assert index.is_solution("Kot", "KTO")
+    assert index.is_solution("kot", "kot")
+    assert not index.is_solution("kot", "okt")
+    assert index.is_solution("lato", "Lato")
+    assert not index.is_solution("lato", "tola")
+    assert not index.is_solution("lato", "kot")
+
+
+def test_save_and_load(index, tmp_path):
+    path = str(tmp_path / "anagram_signatures.json")
+    index.save(path)
+    assert AnagramIndex.load(path).signatures == index.signatures
+
+
+def test_get_anagram_never_returns_a_word(index):
+    random.seed(0)
+    for _ in range(20):
+        assert anagram.get_anagram("kot") in ("okt", "otk", "tko")
+        assert anagram.get_anagram("Anna").lower() != "anna"
+
+
+def test_generate_riddle_prefers_unique_words(index, monkeypatch):
+    monkeypatch.setattr(anagram, "MIN_WORDS", 2)
+    monkeypatch.setattr(anagram, "MAX_WORDS", 2)
+    page = "kot lato tok aa może"
+    tokens = anagram.get_token_info_basic(page)
+    for _ in range(10):
+        _, masked = anagram.generate_riddle(page, tokens)
+        assert sorted(token.original_text for token in masked) == ["lato", "może"]
+    monkeypatch.setattr(anagram, "MAX_WORDS", 3)
+    monkeypatch.setattr(anagram, "MIN_WORDS", 3)
+    _, masked = anagram.generate_riddle(page, tokens)
+    assert {"lato", "może"} < {token.original_text for token in masked}
@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.append('.')
+from chapter_cache import ChapterCache, pages_size
+import helpers
+
+import pytest
+
+
+@pytest.fixture
+def chapter_file(tmp_path):
+    path = tmp_path / "chapter_1.txt"
+    path.write_text("x", encoding='utf-8')
+    return str(path)
+
+
+def test_hit_after_miss(chapter_file):
+    cache = ChapterCache(10_000)
+    loads = []
+    load = lambda: loads.append(1) or {1: "page one", 2: "page two"}
+    assert cache.get((1, 1), chapter_file, load) == {1: "page one", 2: "page two"}
+    assert cache.get((1, 1), chapter_file, load)[2] == "page two"
+    assert len(loads) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_reload_when_mtime_changes(chapter_file):
+    cache = ChapterCache(10_000)
+    cache.get((1, 1), chapter_file, lambda: {1: "old"})
+    stat = os.stat(chapter_file)
+    os.utime(chapter_file, (stat.st_atime, stat.st_mtime + 10))
+    assert cache.get((1, 1), chapter_file, lambda: {1: "new"}) == {1: "new"}
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["entries"] == 1
+
+
+def test_evicts_least_recently_used(chapter_file):
+    load = lambda: {1: "a" * 100}
+    cache = ChapterCache(2 * pages_size(load()))
+    cache.get(1, chapter_file, load)
+    cache.get(2, chapter_file, load)
+    cache.get(1, chapter_file, load)
+    cache.get(3, chapter_file, load)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    cache.get(1, chapter_file, load)
+    assert cache.stats()["hits"] == 2
+
+
+def test_chapter_key():
+    assert helpers.chapter_key("extracts/book_3/chapter_12.txt") == (3, 12)
+    assert helpers.chapter_key("test/books_for_tests/Pan_Tadeusz/Księga pierwsza_part_1.txt") == os.path.normpath("test/books_for_tests/Pan_Tadeusz/Księga pierwsza_part_1.txt")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,103 +6,70 @@ import io
 
 sys.path.append('.')
 import choice  
+from spacy.symbols import NOUN, VERB, ADJ, ADV
 
-def test_find_same_form_candidates_noun():
+def test_find_same_form_candidates_noun(detailed_tokens):
     """Test noun with matching case and number."""
-    mock_word_token = MagicMock()
-    mock_word_token.display_word = "kot"
-    mock_word_token.pos = "NOUN"
-    mock_word_token.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing"}
-    
-    mock_other1 = MagicMock()
-    mock_other1.display_word = "pies"
-    mock_other1.pos = "NOUN"
-    mock_other1.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing"}
-    
-    mock_other2 = MagicMock()
-    mock_other2.display_word = "psa"
-    mock_other2.pos = "NOUN"
-    mock_other2.morph.to_dict.return_value = {"Case": "Gen", "Number": "Sing"}
-    
-    mock_other3 = MagicMock()
-    mock_other3.display_word = "kot" 
-    mock_other3.pos = "NOUN"
-    mock_other3.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing"}
-    
-    all_tokens = [mock_word_token, mock_other1, mock_other2, mock_other3]
-    
-    result = choice.find_same_form_candidates(mock_word_token, all_tokens)
+    all_tokens = detailed_tokens([
+        ("kot", NOUN, "Case=Nom|Number=Sing"),
+        ("pies", NOUN, "Case=Nom|Number=Sing"),
+        ("psa", NOUN, "Case=Gen|Number=Sing"),
+        ("kot", NOUN, "Case=Nom|Number=Sing"),
+    ])
+    
+    result = choice.find_same_form_candidates(all_tokens[0], all_tokens)
     assert "pies" in result
     assert "psa" not in result
     assert "kot" not in result
 
-def test_find_same_form_candidates_verb():
+def test_find_same_form_candidates_verb(detailed_tokens):
     """Test verb with sufficient shared features."""
-    mock_word_token = MagicMock()
-    mock_word_token.display_word = "czytał"
-    mock_word_token.pos = "VERB"
-    mock_word_token.morph.to_dict.return_value = {"Mood": "Ind", "Tense": "Past", "Person": "3", "Number": "Sing", "Aspect": "Imp"}
-    
-    mock_other1 = MagicMock()
-    mock_other1.display_word = "pisał"
-    mock_other1.pos = "VERB"
-    mock_other1.morph.to_dict.return_value = {"Mood": "Ind", "Tense": "Past", "Person": "3", "Number": "Sing", "Aspect": "Imp"}
-    
-    mock_other2 = MagicMock()
-    mock_other2.display_word = "czyta"
-    mock_other2.pos = "VERB"
-    mock_other2.morph.to_dict.return_value = {"Mood": "Ind", "Tense": "Pres", "Person": "3", "Number": "Sing", "Aspect": "Imp"}
-    
-    all_tokens = [mock_word_token, mock_other1, mock_other2]
-    
-    result = choice.find_same_form_candidates(mock_word_token, all_tokens)
+    all_tokens = detailed_tokens([
+        ("czytał", VERB, "Aspect=Imp|Mood=Ind|Number=Sing|Person=3|Tense=Past"),
+        ("pisał", VERB, "Aspect=Imp|Mood=Ind|Number=Sing|Person=3|Tense=Past"),
+        ("czyta", VERB, "Aspect=Imp|Mood=Ind|Number=Sing|Person=3|Tense=Pres"),
+        ("szła", VERB, "Aspect=Perf|Mood=Imp|Number=Plur|Person=1|Tense=Past"),
+    ])
+    
+    result = choice.find_same_form_candidates(all_tokens[0], all_tokens)
     assert "pisał" in result 
+    assert "czyta" in result
+    assert "szła" not in result
 
-def test_find_same_form_candidates_adjective():
+def test_find_same_form_candidates_adjective(detailed_tokens):
     """Test adjective with matching case, number and gender."""
-    mock_word_token = MagicMock()
-    mock_word_token.display_word = "duży"
-    mock_word_token.pos = "ADJ"
-    mock_word_token.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing", "Gender": "Masc"}
-    
-    mock_other1 = MagicMock()
-    mock_other1.display_word = "mały"
-    mock_other1.pos = "ADJ"
-    mock_other1.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing", "Gender": "Masc"}
-    
-    mock_other2 = MagicMock()
-    mock_other2.display_word = "duża"
-    mock_other2.pos = "ADJ"
-    mock_other2.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing", "Gender": "Fem"}
+    all_tokens = detailed_tokens([
+        ("duży", ADJ, "Case=Nom|Gender=Masc|Number=Sing"),
+        ("mały", ADJ, "Case=Nom|Gender=Masc|Number=Sing"),
+        ("duża", ADJ, "Case=Nom|Gender=Fem|Number=Sing"),
+    ])
     
-    all_tokens = [mock_word_token, mock_other1, mock_other2]
-    
-    result = choice.find_same_form_candidates(mock_word_token, all_tokens)
+    result = choice.find_same_form_candidates(all_tokens[0], all_tokens)
     assert "mały" in result
     assert "duża" not in result
 
-def test_find_same_form_candidates_adverb():
+def test_find_same_form_candidates_adverb(detailed_tokens):
     """Test adverb - all adverbs should be candidates."""
-    mock_word_token = MagicMock()
-    mock_word_token.display_word = "szybko"
-    mock_word_token.pos = "ADV"
-    mock_word_token.morph.to_dict.return_value = {}
-    
-    mock_other1 = MagicMock()
-    mock_other1.display_word = "wolno"
-    mock_other1.pos = "ADV"
-    mock_other1.morph.to_dict.return_value = {}
-    
-    mock_other2 = MagicMock()
-    mock_other2.display_word = "ładnie"
-    mock_other2.pos = "ADJ"  
+    all_tokens = detailed_tokens([
+        ("szybko", ADV, ""),
+        ("wolno", ADV, "Degree=Pos"),
+        ("ładnie", ADJ, ""),
+    ])
     
-    all_tokens = [mock_word_token, mock_other1, mock_other2]
-    
-    result = choice.find_same_form_candidates(mock_word_token, all_tokens)
+    result = choice.find_same_form_candidates(all_tokens[0], all_tokens)
     assert "wolno" in result
     assert "ładnie" not in result
 
+def test_find_same_form_candidates_uses_spacy_pos_ids(detailed_tokens):
+    """Tokens carry spaCy's integer pos ids, they are matched as such."""
+    all_tokens = detailed_tokens([
+        ("kot", NOUN, "Case=Nom|Number=Sing"),
+        ("pies", NOUN, "Case=Nom|Number=Sing"),
+        ("biały", ADJ, "Case=Nom|Gender=Masc|Number=Sing"),
+    ])
+    assert all_tokens[0].pos == NOUN
+    assert choice.find_same_form_candidates(all_tokens[0], all_tokens) == ["pies"]
+
 def test_generate_riddle_empty_page():
     """Test with empty page."""
     result_page, result_tokens = choice.generate_riddle("")
@@ -135,31 +102,15 @@ def test_generate_riddle_with_mock_tokens(monkeypatch):
                 
                 assert len(result_tokens) == 3
 
-def test_generate_options_for_masked_few_candidates():
+def test_generate_options_for_masked_few_candidates(detailed_tokens):
     """Test when there are few candidates."""
-    mock_masked_token = MagicMock()
-    mock_masked_token.display_word = "kot"
-    mock_masked_token.pos = "NOUN"
-    mock_masked_token.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing"}
-    
-    mock_all_token1 = MagicMock()
-    mock_all_token1.display_word = "kot"
-    mock_all_token1.pos = "NOUN"
-    
-    mock_all_token2 = MagicMock()
-    mock_all_token2.display_word = "pies"
-    mock_all_token2.pos = "NOUN"
-    
-    mock_all_token3 = MagicMock()
-    mock_all_token3.display_word = "dom"
-    mock_all_token3.pos = "NOUN"
-    
-    mock_all_token4 = MagicMock()
-    mock_all_token4.display_word = "stół"
-    mock_all_token4.pos = "NOUN"
-    
-    masked_tokens = [mock_masked_token]
-    all_tokens = [mock_all_token1, mock_all_token2, mock_all_token3, mock_all_token4]
+    all_tokens = detailed_tokens([
+        ("kot", NOUN, "Case=Nom|Number=Sing"),
+        ("pies", NOUN, "Case=Gen|Number=Sing"),
+        ("dom", NOUN, "Case=Acc|Number=Sing"),
+        ("stół", NOUN, "Case=Ins|Number=Sing"),
+    ])
+    masked_tokens = [all_tokens[0]]
     
     with patch('random.sample') as mock_sample:
         mock_sample.return_value = ["pies", "dom"]
@@ -172,33 +123,70 @@ def test_generate_options_for_masked_few_candidates():
         assert "pies" in result["kot"]
         assert "dom" in result["kot"]
 
-def test_generate_options_for_masked_many_candidates():
+def test_generate_options_for_masked_many_candidates(detailed_tokens):
     """Test when there are many candidates."""
-    mock_masked_token = MagicMock()
-    mock_masked_token.display_word = "kot"
-    mock_masked_token.pos = "NOUN"
-    mock_masked_token.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing"}
-    
-
-    mock_candidates = []
-    for i in range(10):
-        mock_tok = MagicMock()
-        mock_tok.display_word = f"word{i}"
-        mock_tok.pos = "NOUN"
-        mock_tok.morph.to_dict.return_value = {"Case": "Nom", "Number": "Sing"}
-        mock_candidates.append(mock_tok)
-    
-    all_tokens = [mock_masked_token] + mock_candidates
+    all_tokens = detailed_tokens([("kot", NOUN, "Case=Nom|Number=Sing")] +
+                                 [(f"word{i}", NOUN, "Case=Nom|Number=Sing") for i in range(10)])
     
     with patch('random.sample') as mock_sample:
         mock_sample.return_value = ["word0", "word1"]
         
-        result = choice.generate_options_for_masked([mock_masked_token], all_tokens)
+        result = choice.generate_options_for_masked([all_tokens[0]], all_tokens)
         
         assert "kot" in result
         assert len(result["kot"]) == 3
         assert "word0" in result["kot"]
         assert "word1" in result["kot"]
 
+def scan_same_form_candidates(word_token, all_tokens, morphs):
+    """The linear scan FormIndex replaces, rule by rule, morphs holds the morph dict of every token."""
+    correct_morph = word_token.morph.to_dict()
+    candidates = set()
+    for tok, tok_morph in zip(all_tokens, morphs):
+        if tok.display_word == word_token.display_word or tok.pos != word_token.pos:
+            continue
+        if word_token.pos == NOUN:
+            if all(tok_morph.get(f) == correct_morph.get(f) for f in ["Case", "Number"]):
+                candidates.add(tok.display_word)
+        elif word_token.pos == VERB:
+            features = ["Mood", "Tense", "Person", "Number", "Aspect"]
+            if sum(1 for f in features if tok_morph.get(f) == correct_morph.get(f)) >= 2:
+                candidates.add(tok.display_word)
+        elif word_token.pos == ADJ:
+            if all(tok_morph.get(f) == correct_morph.get(f) for f in ["Case", "Number", "Gender"]):
+                candidates.add(tok.display_word)
+        else:
+            candidates.add(tok.display_word)
+    return candidates
+
+def assert_index_matches_scan(all_tokens, masked_tokens=None):
+    form_index = choice.FormIndex(all_tokens)
+    morphs = [tok.morph.to_dict() for tok in all_tokens]
+    for tok in all_tokens if masked_tokens is None else masked_tokens:
+        assert form_index.candidates(tok) == scan_same_form_candidates(tok, all_tokens, morphs), tok
+
+def test_form_index_matches_scan_on_random_forms(detailed_tokens):
+    """Random words, parts of speech and features, with repeated words and missing features."""
+    rng = random.Random(0)
+    values = {"Case": ["Nom", "Gen", "Acc"], "Number": ["Sing", "Plur"], "Gender": ["Masc", "Fem"],
+              "Mood": ["Ind", "Imp"], "Tense": ["Past", "Pres"], "Person": ["1", "3"], "Aspect": ["Imp", "Perf"]}
+    for _ in range(20):
+        words = []
+        for _ in range(60):
+            features = [f"{field}={rng.choice(options)}" for field, options in sorted(values.items()) if rng.random() < 0.7]
+            words.append((f"w{rng.randrange(25)}", rng.choice([NOUN, VERB, ADJ, ADV]), "|".join(features)))
+        assert_index_matches_scan(detailed_tokens(words))
+
+def test_form_index_matches_scan_on_corpus():
+    """A few dozen pages of extracts/ picked with a fixed seed, parsing every page is too slow for the suite."""
+    from book_management.check_regex_tokenizer import corpus_pages
+    from helpers import get_token_info_batch
+    rng = random.Random(0)
+    pages = [page for _, _, page in corpus_pages()]
+    pages = rng.sample(pages, min(len(pages), 30))
+    for all_tokens in get_token_info_batch(pages, detailed=True):
+        # as many gaps as a choice riddle has, the scan is quadratic in the page
+        assert_index_matches_scan(all_tokens, rng.sample(list(all_tokens), min(len(all_tokens), choice.MAX_WORDS)))
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,85 @@
+import os
+import shutil
+import sys
+
+sys.path.append('.')
+import corpus
+from helpers import read_page, iter_pages
+from book_management.corpus_packer import pack_book, compress_book
+
+import pytest
+
+TEST_BOOK = "test/books_for_tests/Pan_Tadeusz"
+
+
+@pytest.fixture
+def packed_book_dir(tmp_path):
+    book_dir = tmp_path / "book_1"
+    book_dir.mkdir()
+    for number in (1, 2):
+        shutil.copy(os.path.join(TEST_BOOK, f"Księga pierwsza_part_{number}.txt"), book_dir / f"chapter_{number}.txt")
+    with open(book_dir / "all_lines.txt", 'w', encoding='utf-8') as lines_file:
+        lines_file.write("Litwo! Ojczyzno moja!\n\nTy jesteś jak zdrowie\n")
+    pack_book(str(book_dir))
+    compress_book(str(book_dir), block_pages=4)
+    yield str(book_dir)
+    corpus.close_books()
+
+
+def test_packed_pages_match_text_pages(packed_book_dir):
+    for number in (1, 2):
+        text_path = os.path.join(TEST_BOOK, f"Księga pierwsza_part_{number}.txt")
+        packed_path = os.path.join(packed_book_dir, f"chapter_{number}.txt")
+        assert corpus.find_chapter(packed_path) is not None
+        assert list(iter_pages(packed_path)) == list(iter_pages(text_path))
+        assert read_page(packed_path, 3) == read_page(text_path, 3)
+        assert read_page(packed_path, 100) is None
+
+
+def test_packed_page_is_a_view(packed_book_dir):
+    book = corpus.open_book(packed_book_dir)
+    page = book.page(1, 2)
+    assert isinstance(page, memoryview)
+    assert str(page, 'utf-8') == book.page_text(1, 2)
+    assert book.page(3, 1) is None
+
+
+def test_packed_line_pool(packed_book_dir):
+    book = corpus.open_book(packed_book_dir)
+    assert book.line_pool() == ["Litwo! Ojczyzno moja!", "Ty jesteś jak zdrowie"]
+
+
+def test_compressed_book_matches_packed_book(packed_book_dir):
+    packed = corpus.open_book(packed_book_dir, "packed")
+    compressed = corpus.open_book(packed_book_dir, "compressed")
+    assert isinstance(compressed, corpus.CompressedBook)
+    assert compressed.chapters == packed.chapters
+    for chapter in (1, 2):
+        assert list(compressed.iter_pages(chapter)) == list(packed.iter_pages(chapter))
+        assert compressed.chapter_lines(chapter) == packed.chapter_lines(chapter)
+    assert compressed.line_pool() == packed.line_pool()
+
+
+def test_text_format_skips_packed_books(packed_book_dir):
+    assert corpus.find_chapter(os.path.join(packed_book_dir, "chapter_1.txt"), "text") is None
+
+
+def test_edited_chapter_is_read_from_text(packed_book_dir):
+    chapter_path = os.path.join(packed_book_dir, "chapter_1.txt")
+    book = corpus.open_book(packed_book_dir)
+    with open(chapter_path, encoding='utf-8') as chapter_file:
+        text = chapter_file.read()
+    with open(chapter_path, 'w', encoding='utf-8') as chapter_file:
+        chapter_file.write(text.replace("Gospodarstwo", "Gospodarstwo\nDopisana linia", 1))
+    os.utime(chapter_path, (book.mtime + 10, book.mtime + 10))
+    assert corpus.find_chapter(chapter_path) is None
+    assert "Dopisana linia" in "".join(page for _, page in iter_pages(chapter_path))
+    assert corpus.find_chapter(os.path.join(packed_book_dir, "chapter_2.txt")) is not None
+
+
+def test_unpacked_folder_is_not_found():
+    assert corpus.find_chapter(os.path.join(TEST_BOOK, "chapter_1.txt")) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,34 +4,21 @@ import os
 import sys 
 sys.path.append('.')
 import crossout
+import line_index
 
 
 @pytest.fixture
 def mock_extract_content():
     return "Line 1\n| Page 1 |\nLine 2\n\n"
 
-def test_load_line_pool_filters_metadata(mock_extract_content):
-    with patch("os.path.exists", return_value=True):
-        with patch("builtins.open", mock_open(read_data=mock_extract_content)):
-            pool = crossout.load_line_pool("extracts/book/chapter.txt")
-            assert pool == ["Line 1", "Line 2"]
-
-def test_load_line_pool_returns_empty_on_missing_file():
-    with patch("os.path.exists", return_value=False):
-        pool = crossout.load_line_pool("fake/path.txt")
-        assert pool == []
-
-def test_get_lines_from_extract(mock_extract_content):
+def test_read_chapter_lines(mock_extract_content):
     with patch("builtins.open", mock_open(read_data=mock_extract_content)):
-        lines = crossout.get_lines_from_extract("dummy.txt")
+        lines = line_index.read_chapter_lines("dummy.txt")
         assert lines == ["Line 1", "Line 2"]
 
 def test_generate_riddle_behavior():
-    with patch("crossout.load_line_pool") as mock_pool, \
-         patch("crossout.get_lines_from_extract") as mock_ext:
-        
-        mock_pool.return_value = ["Fake Line A", "Fake Line B", "Story Line 1"]
-        mock_ext.return_value = ["Story Line 1"]
+    index = line_index.LineIndex([(1, ["Story Line 1"]), (2, ["Fake Line A", "Story Line 1", "Fake Line B"])])
+    with patch("line_index.for_extract", return_value=(index, 1)):
         
         page_content = "Story Line 1"
         result = crossout.generate_riddle(page_content, "path")
@@ -0,0 +1,69 @@
+import random
+import sys
+
+sys.path.append('.')
+import choice
+import distractor_lexicon
+from distractor_lexicon import DistractorLexicon
+from spacy.symbols import NOUN, VERB, ADJ
+
+import pytest
+
+BOOK = [
+    ("kot", NOUN, "Case=Nom|Number=Sing"),
+    ("pies", NOUN, "Case=Nom|Number=Sing"),
+    ("dom", NOUN, "Case=Nom|Number=Sing"),
+    ("psa", NOUN, "Case=Gen|Number=Sing"),
+    ("duży", ADJ, "Case=Nom|Gender=Masc|Number=Sing"),
+    ("czytał", VERB, "Aspect=Imp|Mood=Ind|Number=Sing|Person=3|Tense=Past"),
+    ("pisał", VERB, "Aspect=Imp|Mood=Ind|Number=Sing|Person=3|Tense=Past"),
+    ("szli", VERB, "Aspect=Perf|Mood=Imp|Number=Plur|Person=1|Tense=Pres"),
+]
+
+
+@pytest.fixture
+def lexicon(detailed_tokens):
+    return DistractorLexicon.from_index(choice.FormIndex(detailed_tokens(BOOK)))
+
+
+def test_words_of_the_same_form(lexicon, detailed_tokens):
+    tokens = detailed_tokens(BOOK)
+    assert lexicon.words(tokens[0]) == ["dom", "kot", "pies"]
+    assert lexicon.words(tokens[3]) == ["psa"]
+    assert lexicon.words(tokens[5]) == ["czytał", "pisał"]
+
+
+def test_sample_skips_excluded_words(lexicon, detailed_tokens):
+    kot = detailed_tokens(BOOK)[0]
+    random.seed(0)
+    for _ in range(20):
+        picked = lexicon.sample(kot, 2, {"kot"})
+        assert sorted(picked) == ["dom", "pies"]
+    assert lexicon.sample(kot, 2, {"kot", "dom", "pies"}) == []
+
+
+def test_save_and_load(lexicon, tmp_path):
+    path = str(tmp_path / distractor_lexicon.LEXICON_NAME)
+    lexicon.save(path)
+    loaded = DistractorLexicon.load(path)
+    assert loaded.buckets == lexicon.buckets
+    assert loaded.verb_groups == lexicon.verb_groups
+
+
+def test_lexicon_is_loaded_once_per_book(lexicon, tmp_path, monkeypatch):
+    monkeypatch.setattr(distractor_lexicon, "_lexicons", {})
+    book_dir = tmp_path / "book_1"
+    book_dir.mkdir()
+    assert distractor_lexicon.for_extract(str(book_dir / "chapter_1.txt")) is None
+    lexicon.save(str(tmp_path / distractor_lexicon.LEXICON_NAME))
+    first = distractor_lexicon.for_extract(str(tmp_path / "chapter_1.txt"))
+    assert first.buckets == lexicon.buckets
+    assert distractor_lexicon.for_extract(str(tmp_path / "chapter_2.txt")) is first
+
+
+def test_choice_falls_back_to_the_lexicon(lexicon, detailed_tokens):
+    page = detailed_tokens([("kot", NOUN, "Case=Nom|Number=Sing"), ("duży", ADJ, "Case=Nom|Gender=Masc|Number=Sing")])
+    page_text = "kot duży"
+    model = choice.transform_to_choice_model(page_text, page, {0}, lexicon)
+    labels = {option["label"] for option in model["gaps"][0]["options"]}
+    assert labels == {"kot", "pies", "dom"}
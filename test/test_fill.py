@@ -4,6 +4,8 @@ import sys
 sys.path.append('.')
 import fill
 import helpers
+import random
+from alias_table import AliasTable
 
 def test_pick_words_to_remove():
     #does it pick good amount of words and are they all tokens from passed lists
@@ -28,6 +30,33 @@ def test_replace_word_token(monkeypatch):
     assert fill.replace_word_token(page, tokens[0]) == "[x] page"
     assert fill.replace_word_token(page, tokens[1]) == "Test [x]"
 
+def test_pick_words_to_remove_gives_every_different_word():
+    tokens = helpers.get_token_info_basic("Test test1 Test2 test1 Test Test1 inne słowo")
+    for i in range(20):
+        chosen = fill.pick_words_to_remove(tokens, 5)
+        assert len(chosen) == 5
+        assert len({w.original_text.lower() for w in chosen}) == 5
+    assert len(fill.pick_words_to_remove(tokens, 10)) == 5
+
+def test_pick_words_to_remove_follows_weight():
+    tokens = helpers.get_token_info_basic("rzadkie często często często często często")
+    random.seed(0)
+    picks = [fill.pick_words_to_remove(tokens, 1, lambda word: 100.0 if word == "rzadkie" else 1.0)[0].original_text
+             for i in range(200)]
+    assert 150 < picks.count("rzadkie") < 200
+
+def test_alias_table_draws_by_weight():
+    random.seed(0)
+    table = AliasTable([1, 0, 3, 6])
+    counts = [0] * len(table)
+    for i in range(20000):
+        counts[table.draw()] += 1
+    assert counts[1] == 0
+    for k, weight in enumerate([0.1, 0.0, 0.3, 0.6]):
+        assert abs(counts[k] / 20000 - weight) < 0.02
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,52 @@
+import asyncio
+import sys
+import time
+
+sys.path.append('.')
+import generation_service
+from generation_service import generate, GenerationBusy, GenerationTimeout
+
+import pytest
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setattr(generation_service, "GENERATION_WORKERS", 1)
+    monkeypatch.setattr(generation_service, "warm_up", lambda: None)
+    yield
+    generation_service.shutdown()
+
+
+def test_inline_when_no_workers(monkeypatch):
+    monkeypatch.setattr(generation_service, "GENERATION_WORKERS", 0)
+    assert asyncio.run(generate(pow, 2, 10)) == 1024
+    assert generation_service._pool is None
+
+
+def test_job_runs_in_worker(workers):
+    assert asyncio.run(generate(pow, 2, 10)) == 1024
+    assert generation_service.stats()["in_flight"] == 0
+
+
+def test_full_queue_is_refused(workers, monkeypatch):
+    monkeypatch.setattr(generation_service, "GENERATION_QUEUE", 0)
+
+    async def two_jobs():
+        first = asyncio.ensure_future(generate(time.sleep, 0.5))
+        await asyncio.sleep(0)
+        with pytest.raises(GenerationBusy):
+            await generate(pow, 2, 10)
+        await first
+
+    asyncio.run(two_jobs())
+
+
+def test_slow_job_times_out(workers, monkeypatch):
+    monkeypatch.setattr(generation_service, "GENERATION_TIMEOUT", 0.1)
+
+    async def slow_job():
+        with pytest.raises(GenerationTimeout):
+            await generate(time.sleep, 1)
+        assert generation_service.stats()["in_flight"] == 1
+
+    asyncio.run(slow_job())
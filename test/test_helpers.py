@@ -1,7 +1,7 @@
 import string
 import sys
 sys.path.append('.')
-from helpers import read_page, get_token_info, get_token_info_basic, is_punctuation
+from helpers import read_page, iter_pages, build_page_index, get_token_info, get_token_info_basic, get_token_info_batch, is_punctuation
 
 import pytest
 
@@ -17,6 +17,24 @@ def test_read_page():
     assert result2 == expected2
     assert result10 == expected10
 
+def test_build_page_index():
+    path = "test/books_for_tests/Pan_Tadeusz/Księga pierwsza_part_1.txt"
+    index = build_page_index(path)
+    with open(path, 'rb') as extract_file:
+        data = extract_file.read()
+    start, end = index[2]
+    assert data[start:end].decode('utf-8') == read_page(path, 2)
+    assert sorted(index) == list(range(1, len(index) + 1))
+    assert read_page(path, len(index) + 1) is None
+
+def test_iter_pages_matches_read_page():
+    path = "test/books_for_tests/Pan_Tadeusz/Księga pierwsza_part_1.txt"
+    pages = list(iter_pages(path))
+    assert [page_index for page_index, _ in pages] == list(range(1, len(pages) + 1))
+    for page_index, page in pages:
+        assert page == read_page(path, page_index)
+    assert not read_page(path, len(pages) + 1)
+
 def test_get_token_info_basic():
     word_tokens = get_token_info_basic("Litwo, Ojczyzno ty Moja!")
     assert len(word_tokens) == 4
@@ -45,6 +63,17 @@ def test_get_token_info():
     assert word_tokens[1].finish== 15
     assert word_tokens[1].display_word == "ojczyzno"
 
+def test_get_token_info_batch_matches_single_pages():
+    pages = [page for _, page in iter_pages("test/books_for_tests/Pan_Tadeusz/Księga pierwsza_part_1.txt")]
+    for detailed, single in [(False, get_token_info_basic), (True, get_token_info)]:
+        batch = get_token_info_batch(pages, detailed, batch_size=3, use_store=False)
+        assert len(batch) == len(pages)
+        for page, tokens in zip(pages, batch):
+            expected = single(page)
+            assert [(t.original_text, t.start, t.finish, t.i) for t in tokens] == [(t.original_text, t.start, t.finish, t.i) for t in expected]
+            if detailed:
+                assert [(t.pos, str(t.morph)) for t in tokens] == [(t.pos, str(t.morph)) for t in expected]
+
 def test_is_punctuation_edge_cases():
 
 
@@ -0,0 +1,66 @@
+import random
+import sys
+from collections import Counter
+
+sys.path.append('.')
+import choice
+import lemma_index
+from lemma_index import LemmaIndex
+from book_management.build_lemma_index import build_index
+from choice import build_choice_game
+from helpers import iter_pages, get_token_info_batch
+from spacy.symbols import NOUN
+
+import pytest
+
+
+@pytest.fixture
+def index():
+    return LemmaIndex({
+        "ojczyzna": [("ojczyzna", "Case=Nom|Number=Sing"), ("ojczyzno", "Case=Voc|Number=Sing"),
+                     ("ojczyzny", "Case=Gen|Number=Sing"), ("ojczyzny", "Case=Gen|Number=Sing")],
+        "kot": [("kot", "Case=Nom|Number=Sing"), ("kota", "Case=Gen|Number=Sing"), ("kotu", "Case=Gen|Number=Sing")],
+    })
+
+
+def test_other_forms(index):
+    assert index.other_forms("ojczyzno") == ["ojczyzna", "ojczyzny"]
+    assert index.other_forms("kot") == ["kota"]
+    assert index.other_forms("pies") == []
+    assert sorted(index.sample("ojczyzno", 5)) == ["ojczyzna", "ojczyzny"]
+
+
+def test_build_index_keeps_most_frequent_lemma_and_morph():
+    form_lemmas = {"psa": Counter({"pies": 3, "pas": 1}), "pies": Counter({"pies": 2}), "pas": Counter({"pas": 1})}
+    form_morphs = {"psa": Counter({"Case=Gen": 2, "Case=Acc": 3}), "pies": Counter({"Case=Nom": 2}),
+                   "pas": Counter({"Case=Nom": 1})}
+    index = build_index(form_lemmas, form_morphs)
+    assert index.lemmas == {"pies": [("pies", "Case=Nom"), ("psa", "Case=Acc")]}
+
+
+def test_save_and_load(index, tmp_path):
+    path = str(tmp_path / "lemma_forms.json")
+    index.save(path)
+    assert LemmaIndex.load(path).lemmas == index.lemmas
+
+
+def test_correct_form_options(index, detailed_tokens):
+    page_text = "ojczyzno kot"
+    tokens = detailed_tokens([("ojczyzno", NOUN, "Case=Voc|Number=Sing"), ("kot", NOUN, "Case=Nom|Number=Sing")])
+    assert choice.correct_form_indices(tokens, index) == [0]
+    model = choice.transform_to_choice_model(page_text, tokens, {0}, forms=index)
+    assert {option["label"] for option in model["gaps"][0]["options"]} == {"ojczyzno", "ojczyzna", "ojczyzny"}
+
+
+def test_correct_form_game(monkeypatch):
+    extract_path = "extracts/book_2/chapter_1.txt"
+    _, page = next(iter_pages(extract_path))
+    words = [tok.display_word for tok in get_token_info_batch([page], detailed=True)[0]]
+    forms = {word: [(word, "A"), (word + "x", "B"), (word + "y", "C")] for word in words}
+    monkeypatch.setattr(lemma_index, "_index", LemmaIndex(forms))
+    random.seed(0)
+    riddles, state = build_choice_game(extract_path, "correct-form")
+    assert riddles
+    for gap in riddles[0]["gaps"]:
+        labels = sorted(option["label"] for option in gap["options"])
+        assert labels[1] == labels[0] + "x" and labels[2] == labels[0] + "y"
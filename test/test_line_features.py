@@ -0,0 +1,80 @@
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append('.')
+import crossout
+import line_features
+import line_index
+from line_features import LineFeatures, line_vector
+from line_index import LineIndex
+
+
+@pytest.fixture
+def book(tmp_path, monkeypatch):
+    '''a book of three chapters in tmp_path/book_test with its line features built'''
+    chapters = [
+        (1, ["Stoi na stacji lokomotywa,", "Ciężka, ogromna i pot z niej spływa:", "Tłusta oliwa."]),
+        (2, ["Stoi i sapie, dyszy i dmucha,", "Buch — jak gorąco!", "Tłusta oliwa."]),
+        (3, ["A", "Wagony do niej podoczepiali wielkie i ciężkie, z żelaza, stali,", "Uff — jak gorąco!"]),
+    ]
+    book_dir = str(tmp_path / "book_test")
+    index = LineIndex(chapters)
+    monkeypatch.setitem(line_index._indexes, book_dir, index)
+    monkeypatch.setitem(line_features._features, book_dir, LineFeatures.from_index(index))
+    return book_dir, index
+
+
+def test_line_vector():
+    vector = line_vector("Buch — jak gorąco!")
+    assert vector.shape == (line_features.FEATURE_COUNT,)
+    assert vector[0] == pytest.approx(18 / line_features.LENGTH_SCALE)
+    trigrams = vector[-line_features.TRIGRAM_BUCKETS:]
+    assert np.linalg.norm(trigrams) == pytest.approx(1.0)
+    assert np.array_equal(line_vector("BUCH — jak gorąco!")[-line_features.TRIGRAM_BUCKETS:], trigrams)
+
+
+def test_nearest_matches_a_full_scan(book):
+    _, index = book
+    features = line_features.for_book(book[0])
+    rng = np.random.default_rng(0)
+    vectors = rng.random((3, line_features.FEATURE_COUNT), dtype=np.float32)
+    for vector, (rows, distances) in zip(vectors, features.nearest(vectors, 4, (3, 6))):
+        expected = sorted((float(np.sum((features.matrix[k] - vector) ** 2)), k) for k in range(len(index)) if not 3 <= k < 6)
+        assert rows.tolist() == [k for _, k in expected[:4]]
+        assert distances.tolist() == pytest.approx([distance for distance, _ in expected[:4]], rel=1e-4)
+
+
+def test_similar_lines_come_from_other_chapters(book, monkeypatch):
+    book_dir, index = book
+    random.seed(0)
+    page = ["Stoi i sapie, dyszy i dmucha,", "Buch — jak gorąco!"]
+    for _ in range(10):
+        picked = crossout.pick_similar_lines(page, f"{book_dir}/chapter_2.txt", index, 2, 2)
+        assert len(picked) == 2
+        assert not set(picked) & set(index.chapter_lines(2))
+    monkeypatch.setattr(crossout, "NEIGHBOURS", 1)
+    # the line of another chapter closest to "Buch — jak gorąco!"
+    assert crossout.pick_similar_lines(["Buch — jak gorąco!"], f"{book_dir}/chapter_2.txt", index, 2, 1) == ["Uff — jak gorąco!"]
+
+
+def test_features_of_another_version_of_the_book_are_ignored(tmp_path):
+    book_dir = tmp_path / "book_test"
+    book_dir.mkdir()
+    (book_dir / "chapter_1.txt").write_text("| Page 1 |\n\nStoi na stacji\nlokomotywa\n\n", encoding='utf-8')
+    LineFeatures.from_index(LineIndex([(1, ["Stoi na stacji"])])).save(str(book_dir / line_features.LINE_FEATURES_NAME))
+    assert line_features.for_book(str(book_dir)) is None
+
+
+def test_crossout_difficulties():
+    extract_path = "extracts/book_2/chapter_1.txt"
+    _, page = next(crossout.iter_pages(extract_path))
+    index, chapter = line_index.for_extract(extract_path)
+    page_lines = {line.strip() for line in page.split("\n") if line.strip()}
+    for difficulty in crossout.CROSSOUT_DIFFICULTIES:
+        lines = crossout.generate_riddle(page, extract_path, difficulty).split("\n")
+        extras = [line for line in lines if line not in page_lines]
+        assert len(extras) == crossout.MAX_EXTRA_LINES
+        assert not set(extras) & index.chapter_set(chapter)
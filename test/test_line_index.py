@@ -0,0 +1,43 @@
+import pytest
+import random
+import sys
+
+sys.path.append('.')
+import line_index
+from line_index import LineIndex
+
+
+@pytest.fixture
+def index():
+    return LineIndex([(1, ["Stoi na stacji", "Tłusta oliwa."]), (2, ["Buch — jak gorąco!", "Tłusta oliwa."]),
+                      (3, ["Uch — jak gorąco!", "Puff — jak gorąco!"])])
+
+
+def test_lines_and_ranges(index):
+    assert len(index) == 6
+    assert index.line(2) == "Buch — jak gorąco!"
+    assert index.ranges == {1: (0, 2), 2: (2, 4), 3: (4, 6)}
+    assert index.chapter_lines(3) == ["Uch — jak gorąco!", "Puff — jak gorąco!"]
+    assert index.chapter_lines(7) == []
+
+
+def test_sample_skips_the_chapter(index):
+    random.seed(0)
+    for _ in range(30):
+        picked = index.sample(2, 1)
+        assert len(picked) == 2 and len(set(picked)) == 2
+        # a line of chapter 1 repeated in chapter 2 is never drawn
+        assert not set(picked) & {"Stoi na stacji", "Tłusta oliwa."}
+    assert set(index.sample(5, 1, {"Uch — jak gorąco!"})) <= {"Buch — jak gorąco!", "Puff — jak gorąco!"}
+    assert LineIndex([(1, ["a", "b"])]).sample(2, 1) == []
+
+
+def test_index_of_a_book():
+    book_dir = "extracts/book_2"
+    index = line_index.for_book(book_dir)
+    assert line_index.for_book(book_dir + "/") is index
+    for chapter in (1, 2):
+        path = f"{book_dir}/chapter_{chapter}.txt"
+        assert index.chapter_lines(chapter) == line_index.read_chapter_lines(path)
+        assert line_index.for_extract(path) == (index, chapter)
+    assert len(line_index.for_book("extracts/no_such_book")) == 0
@@ -0,0 +1,48 @@
+import sys
+
+sys.path.append('.')
+import anagram
+import spellcheck
+from page import Page, Word
+from helpers import get_token_info_basic
+
+
+def test_words_and_values():
+    page = Page("Stoi na  stacji\n\n„Może” — lokomotywa \nkoniec")
+    assert [page.text[word.start:word.end] for word in page.words] == ["Stoi", "na", "stacji", "„Może”", "—", "lokomotywa", "koniec"]
+    assert page.words[2] == Word(9, 15, 0, True)
+    assert [page.value(word) for word in page.words][2] == "stacji\n"
+    # a line ending in a space gives no word the line break, as the games always did
+    assert page.value(page.words[5]) == "lokomotywa"
+    assert page.value(page.words[6]) == "koniec"
+    assert page.line_starts == [0, 16, 17, 38]
+    assert page.text[page.line_starts[3]:] == "koniec"
+
+
+def test_words_containing():
+    text = "„Może” morze,\n(kot) i pies"
+    page = Page(text)
+    starts = [token.start for token in get_token_info_basic(text)]
+    assert page.words_containing(starts) == {0, 1, 2, 4}
+    # offsets on spaces or line breaks hold no word
+    assert page.words_containing([6, 13]) == set()
+
+
+def test_merged():
+    page = Page("Buch — jak gorąco !\n— Uff")
+    assert page.merged(0) == ["Buch", "— jak", "gorąco !"]
+    assert page.merged(1) == ["— Uff"]
+    assert page.merged(0) is page.merged(0)
+
+
+def test_transforms_find_words_after_a_quote():
+    text = "Rzekł: „Może pójdziemy?”\nI poszli."
+    tokens = get_token_info_basic(text)
+    masked = [token for token in tokens if token.original_text == "Może"]
+    _, _, anagram_ids = anagram.transform_to_model(text, tokens, [(0, masked[0])], 1, 0)
+    assert anagram_ids == ["2"]
+    typo = spellcheck.Typo("Może", "Morze", masked[0].start, masked[0].start, masked[0].i)
+    model, next_id, typo_ids = spellcheck.transform_to_spellcheck_model(text, tokens, [typo], 1, 0)
+    assert typo_ids == ["2"]
+    assert next_id == 6
+    assert [word["value"] for word in model["riddle"]["prompt"]["words"]] == ["Rzekł:", "„Może", "pójdziemy?”\n", "I", "poszli."]
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.append('.')
+import process_memory
+
+import pytest
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+def test_memory_of_this_process():
+    usage = process_memory.memory()
+    assert 0 < usage["uss"] <= usage["rss"]
+    assert 0 < usage["pss"] <= usage["rss"]
+
+
+def test_missing_process():
+    assert process_memory.memory(2**31) == {}
+    assert process_memory.children(2**31) == []
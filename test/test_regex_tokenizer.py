@@ -0,0 +1,53 @@
+import random
+import sys
+
+sys.path.append('.')
+import helpers
+import regex_tokenizer
+from book_management.check_regex_tokenizer import corpus_pages, divergences
+
+import pytest
+
+TRICKY_TEXTS = [
+    "Litwo, Ojczyzno moja! ty jesteś jak zdrowie;",
+    "— Mości panowie — rzekł — „tak”—rzekł «Tak» (a)(b)",
+    "  wcięcie\n\n  i spacje  podwójne \n",
+    "ha--ha x...y słowo… …tak…… Tak.Ale tak.ale tak,ale 7. ok.:",
+    "jedno-dwa długo-letni półtora- 5kg 10zł. 3+ US$5 o'clock ''tak''",
+    "(tak): tak:) (tak) :) =(; x( ;) ] =) :-]□7 mówił: o tym",
+    "www.example.pl http://example.com/a?b a.b.c 2024.10 °C ♥□😀 a\xadb",
+]
+# pages of extracts/ compared with spaCy here, book_management/check_regex_tokenizer.py compares all of them
+SAMPLE_PAGES = 40
+SAMPLE_SEED = 10
+
+
+def spacy_spans(text):
+    return [(token.start, token.finish, token.i) for token in helpers.tokens_from_doc(helpers.get_basic_nlp()(text), False)]
+
+
+@pytest.mark.parametrize("text", TRICKY_TEXTS)
+def test_same_tokens_as_spacy(text):
+    assert regex_tokenizer.tokenize(text) == spacy_spans(text)
+
+
+def test_regex_path_does_not_load_spacy(spacy_must_not_run):
+    page = TRICKY_TEXTS[0]
+    with spacy_must_not_run() as patch:
+        patch.setattr(helpers, "BASIC_TOKENIZER", "regex")
+        patch.setattr(helpers, "TOKEN_MEMO", helpers.TokenMemo(0))
+        single = helpers.get_token_info_basic(page)
+        batch = helpers.get_token_info_batch([page, page])
+    assert [(t.original_text, t.start, t.finish, t.i) for t in single] == [(page[s:f], s, f, i) for s, f, i in spacy_spans(page)]
+    assert [[t.i for t in tokens] for tokens in batch] == [[t.i for t in single]] * 2
+
+
+def test_sampled_pages_match_spacy():
+    pages = list(corpus_pages())
+    sample = random.Random(SAMPLE_SEED).sample(pages, min(SAMPLE_PAGES, len(pages)))
+    found = list(divergences(sample))
+    assert found == [], f"{len(found)} pages differ, first ones: {found[:5]}"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
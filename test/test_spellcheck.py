@@ -4,6 +4,25 @@ import sys
 
 sys.path.append('.')
 import spellcheck
+import helpers
+import regex_tokenizer
+import vocabulary
+from vocabulary import Vocabulary
+import random
+
+
+@pytest.fixture(autouse=True)
+def no_vocabulary(monkeypatch):
+    '''typos are checked against an empty vocabulary unless a test sets one, whatever extracts/ has'''
+    monkeypatch.setattr(vocabulary, "_vocabulary", Vocabulary.from_words([]))
+    spellcheck.typo_families.cache_clear()
+    yield
+    spellcheck.typo_families.cache_clear()
+
+
+def use_vocabulary(monkeypatch, words):
+    monkeypatch.setattr(vocabulary, "_vocabulary", Vocabulary.from_words(words))
+    spellcheck.typo_families.cache_clear()
 
 def test_swap_adjecet_letters():
     for i in range(3):
@@ -42,5 +61,76 @@ def test_generate_typo_distractor_ch_h_logic():
     assert (result == "hata") or (sorted(result) == sorted("chata"))
 
 
+def test_swap_variants():
+    assert spellcheck.swap_variants("kot") == ("okt", "kto")
+    assert spellcheck.swap_variants("inny") == ("niny", "inyn")
+    assert spellcheck.swap_variants("Kot") == ("Okt", "Kto")
+    assert spellcheck.swap_variants("aaa") == ()
+
+def test_u_variants():
+    assert spellcheck.u_variants("Ustrój") == ("Óstrój", "Ustruj")
+    assert spellcheck.u_variants("kot") == ()
+
+def test_rz_variants():
+    assert spellcheck.rz_variants("Rzerzucha") == ("Żerzucha", "Rzeżucha")
+    assert spellcheck.rz_variants("może") == ("morze",)
+    assert spellcheck.rz_variants("ŻEBY") == ("RZEBY",)
+    assert spellcheck.rz_variants("Żeby") == ("Rzeby",)
+    assert spellcheck.rz_variants("RZEKA") == ("ŻEKA",)
+
+def test_ch_variants():
+    assert spellcheck.ch_variants("Chochoł") == ("Hochoł", "Chohoł")
+    assert spellcheck.ch_variants("hala") == ("chala",)
+    assert spellcheck.ch_variants("Hala") == ("Chala",)
+    assert spellcheck.ch_variants("HALA") == ("CHALA",)
+
+def test_typo_families():
+    assert spellcheck.typo_families("ab") == (("ba",),)
+    assert spellcheck.typo_families("morze") == (spellcheck.swap_variants("morze"), ("może",))
+    assert spellcheck.typo_families("aaa") == ()
+    assert not spellcheck.has_typo("aaa")
+    assert spellcheck.generate_typo_distractor("aaa") == "aaa"
+
+def test_typo_families_leave_out_real_words(monkeypatch):
+    use_vocabulary(monkeypatch, ["może", "kto", "Morze"])
+    assert spellcheck.typo_families("morze") == (spellcheck.swap_variants("morze"),)
+    assert spellcheck.typo_families("Może") == (spellcheck.swap_variants("Może"),)
+    assert spellcheck.typo_families("kot") == (("okt",),)
+    for _ in range(10):
+        assert spellcheck.generate_typo_distractor("kot") == "okt"
+    use_vocabulary(monkeypatch, ["ab", "ba"])
+    assert not spellcheck.has_typo("ab")
+
+def test_generate_riddle_skips_words_without_typos():
+    page = "aaa bbb kot"
+    masked_page, typos = spellcheck.generate_riddle(page, page_tokens(page))
+    assert [typo.correct for typo in typos] == ["kot"]
+
+PAGE = "Morze, morze i rzeka.\nChata nad morzem, chata nad rzeką.\n"
+
+def page_tokens(page):
+    return helpers.tokens_from_spans(page, regex_tokenizer.tokenize(page))
+
+def test_generate_riddle_typo_offsets():
+    tokens = page_tokens(PAGE)
+    for seed in range(50):
+        random.seed(seed)
+        masked_page, typos = spellcheck.generate_riddle(PAGE, tokens)
+        assert [typo.start for typo in typos] == sorted(typo.start for typo in typos)
+        for typo in typos:
+            assert PAGE[typo.start:typo.start + len(typo.correct)] == typo.correct
+            assert masked_page[typo.masked_start:typo.masked_start + len(typo.typo)] == typo.typo
+            assert tokens[[t.i for t in tokens].index(typo.i)].start == typo.start
+
+def test_transform_marks_every_typo_once():
+    tokens = page_tokens(PAGE)
+    for seed in range(50):
+        random.seed(seed)
+        masked_page, typos = spellcheck.generate_riddle(PAGE, tokens)
+        model, _, typo_ids = spellcheck.transform_to_spellcheck_model(masked_page, tokens, typos, 1, 0)
+        values = {w["id"]: w["value"] for w in model["riddle"]["prompt"]["words"]}
+        assert len(typo_ids) == len(typos)
+        assert [values[word_id].strip(",.\n") for word_id in typo_ids] == [typo.typo for typo in typos]
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,66 @@
+import sys
+
+sys.path.append('.')
+from token_memo import TokenMemo
+import helpers
+
+import pytest
+
+PAGE = "Litwo, Ojczyzno moja! ty jesteś jak zdrowie;\n"
+
+
+def test_hit_after_put():
+    memo = TokenMemo(4)
+    assert memo.get(PAGE, False) is None
+    memo.put(PAGE, False, ["token"])
+    assert memo.get(PAGE, False) == ["token"]
+    assert memo.get(PAGE, True) is None
+    assert memo.stats()["hits"] == 1
+    assert memo.stats()["misses"] == 2
+
+
+def test_get_returns_copy():
+    memo = TokenMemo(4)
+    memo.put(PAGE, False, ["a", "b"])
+    memo.get(PAGE, False).pop()
+    assert memo.get(PAGE, False) == ["a", "b"]
+
+
+def test_least_recently_used_is_evicted():
+    memo = TokenMemo(2)
+    memo.put("one", False, [1])
+    memo.put("two", False, [2])
+    memo.get("one", False)
+    memo.put("three", False, [3])
+    assert memo.get("two", False) is None
+    assert memo.get("one", False) == [1]
+    assert memo.stats()["evictions"] == 1
+
+
+def test_disabled_memo_keeps_nothing():
+    memo = TokenMemo(0)
+    memo.put(PAGE, False, ["token"])
+    assert memo.get(PAGE, False) is None
+
+
+class CountingModel:
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.vocab = nlp.vocab
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.nlp(text)
+
+
+def test_page_is_tokenized_once():
+    model = CountingModel(helpers.get_basic_nlp())
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(helpers, "_basic_nlp", model)
+        patch.setattr(helpers, "TOKEN_MEMO", TokenMemo(4))
+        patch.setattr(helpers.token_store, "lookup", lambda text: None)
+        first = helpers.get_token_info_basic(PAGE)
+        second = helpers.get_token_info_basic(PAGE)
+    assert model.calls == 1
+    assert [t.original_text for t in first] == [t.original_text for t in second]
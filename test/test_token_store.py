@@ -0,0 +1,39 @@
+import sys
+
+sys.path.append('.')
+import token_store
+import helpers
+
+import pytest
+
+PAGE = "Litwo, Ojczyzno moja! ty jesteś jak zdrowie;\nIle cię trzeba cenić, ten tylko się dowie,\n"
+
+
+@pytest.fixture
+def stored_page(tmp_path):
+    book_dir = tmp_path / "book_1"
+    book_dir.mkdir()
+    tokens = [(token.start, token.finish, token.i, token.pos, str(token.morph)) for token in helpers.get_token_info(PAGE)]
+    token_store.write_store(str(book_dir / token_store.TOKEN_STORE_NAME), [(PAGE, tokens)])
+    token_store.load_stores(str(tmp_path))
+    helpers.TOKEN_MEMO.clear()
+    yield tokens
+    token_store._pages = None
+
+
+def test_lookup_returns_stored_tokens(stored_page):
+    assert token_store.lookup(PAGE) == stored_page
+    assert token_store.lookup(PAGE + "x") is None
+
+
+def test_get_token_info_reads_store(stored_page, spacy_must_not_run):
+    with spacy_must_not_run():
+        detailed = helpers.get_token_info(PAGE)
+        basic = helpers.get_token_info_basic(PAGE)
+    assert [(t.start, t.finish, t.i, t.pos, str(t.morph)) for t in detailed] == stored_page
+    assert [t.original_text for t in basic] == [PAGE[start:finish] for start, finish, _, _, _ in stored_page]
+    assert basic[1].display_word == "ojczyzno"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,72 @@
+import random
+import sys
+
+sys.path.append('.')
+from token_table import TokenTable
+from morph_table import MORPHS, MorphTable
+
+import pytest
+
+PAGE = "Litwo, Ojczyzno moja! ty jesteś jak zdrowie;\n"
+SPANS = [(0, 5, 0), (7, 15, 2), (16, 20, 3), (22, 24, 5), (25, 31, 6)]
+
+
+def test_views_read_like_tokens():
+    table = TokenTable(PAGE, SPANS)
+    assert len(table) == 5
+    assert [t.original_text for t in table] == ["Litwo", "Ojczyzno", "moja", "ty", "jesteś"]
+    assert table[1].display_word == "ojczyzno"
+    assert (table[-1].start, table[-1].finish, table[-1].i) == (25, 31, 6)
+    assert table[0].pos is None and table[0].morph is None
+    with pytest.raises(IndexError):
+        table[5]
+
+
+def test_views_of_the_same_token_are_equal():
+    table = TokenTable(PAGE, SPANS)
+    assert table[2] == table[2]
+    assert table[2] != table[3]
+    assert table[2] != TokenTable(PAGE, SPANS)[2]
+    assert len({table[2], table[2]}) == 1
+
+
+def test_table_works_as_a_sequence():
+    table = TokenTable(PAGE, SPANS)
+    assert [t.i for t in table[1:3]] == [2, 3]
+    assert len(random.sample(table, 3)) == 3
+    assert random.choice(table) in table
+    assert not TokenTable(PAGE, [])
+
+
+def test_detailed_columns():
+    table = TokenTable(PAGE, SPANS[:2], [96, 92], ["Case=Nom|Gender=Fem|Number=Sing", "Case=Voc|Gender=Fem|Number=Sing"])
+    assert table.detailed
+    assert table[0].pos == 96
+    assert str(table[0].morph) == "Case=Nom|Gender=Fem|Number=Sing"
+    assert table[1].morph.to_dict() == {"Case": "Voc", "Gender": "Fem", "Number": "Sing"}
+    assert table[1].morph.get("Case") == ["Voc"]
+
+
+def test_morph_strings_are_interned():
+    morphs = MorphTable()
+    first = morphs.intern("Aspect=Imp|Mood=Ind")
+    assert morphs.intern("Aspect=Imp|Mood=Ind") == first
+    assert morphs.intern("Aspect=Perf|Mood=Ind") != first
+    assert morphs[first].get("Gender") == []
+    assert morphs[morphs.intern("Gender=Masc,Neut")].get("Gender") == ["Masc", "Neut"]
+    assert morphs[morphs.intern("")].to_dict() == {}
+
+
+def test_morph_keys():
+    morphs = MorphTable()
+    noun = morphs.intern("Case=Nom|Gender=Fem|Number=Sing")
+    assert morphs.key(noun, ("Case", "Number")) == ("Nom", "Sing")
+    assert morphs.key(noun, ("Tense",)) == (None,)
+    assert morphs.key(noun, ("Case", "Number")) is morphs.key(noun, ("Case", "Number"))
+
+
+def test_tables_share_morph_ids():
+    first = TokenTable(PAGE, SPANS[:1], [92], ["Case=Nom|Number=Sing"])
+    second = TokenTable(PAGE, SPANS[1:2], [92], ["Case=Nom|Number=Sing"])
+    assert first[0].morph_id == second[0].morph_id
+    assert first[0].morph is MORPHS[first[0].morph_id]
@@ -0,0 +1,54 @@
+import random
+import sys
+
+sys.path.append('.')
+import vocabulary
+from vocabulary import Vocabulary
+from book_management.build_vocabulary import corpus_words
+
+
+def test_lookup():
+    words = ["może", "morze", "Żółw", "kot", "kota", "a", "źdźbło"]
+    vocab = Vocabulary.from_words(words)
+    assert len(vocab) == len(words)
+    for word in words:
+        assert word in vocab
+        assert word.upper() in vocab
+    for word in ["mrze", "moze", "ko", "kotaa", "", "źdźbła", "żółwie"]:
+        assert word not in vocab
+    assert [vocab.word(k) for k in range(len(vocab))] == sorted(word.lower() for word in words)
+
+
+def test_empty_vocabulary():
+    vocab = Vocabulary.from_words([])
+    assert len(vocab) == 0
+    assert "kot" not in vocab
+
+
+def test_bloom_filter_has_no_false_negatives():
+    rng = random.Random(3)
+    words = {"".join(rng.choice("abcęłóżź") for _ in range(rng.randint(2, 9))) for _ in range(3000)}
+    vocab = Vocabulary.from_words(words)
+    for word in words:
+        for position in vocabulary.bloom_positions(word.encode('utf-8'), vocab.bloom_hashes, vocab.bloom_bits):
+            assert vocab.bloom[position >> 3] & (1 << (position & 7))
+    others = {"".join(rng.choice("abcęłóżź") for _ in range(10)) for _ in range(3000)} - words
+    assert all(word not in vocab for word in others)
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "vocabulary.npz")
+    Vocabulary.from_words(["może", "kot", "żółw"]).save(path)
+    vocab = Vocabulary.load(path)
+    assert len(vocab) == 3
+    assert "Może" in vocab and "żółw" in vocab and "morze" not in vocab
+
+
+def test_corpus_words(tmp_path):
+    book_dir = tmp_path / "book_test"
+    book_dir.mkdir()
+    (book_dir / "chapter_1.txt").write_text("| Page 1 |\n\nMoże w morze, Może!\n\n", encoding='utf-8')
+    words = corpus_words(str(tmp_path))
+    assert words == {"może", "morze"}
+    vocab = Vocabulary.from_words(words)
+    assert all(word in vocab for word in words)
@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+
+sys.path.append('.')
+import word_frequency
+from word_frequency import FrequencyTable
+from fill import build_fill_gaps_game
+from book_management.build_frequency_table import build_table
+
+
+def test_weight():
+    table = FrequencyTable({"się": 100, "kot": 2})
+    assert table.weight("Się", "normal") == 1.0
+    assert table.weight("Się", "easy") == 100.0
+    assert table.weight("kot", "hard") == 0.5
+    assert table.weight("nieznane", "hard") == 1.0
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "frequencies.json")
+    FrequencyTable({"się": 100, "kot": 2}).save(path)
+    assert FrequencyTable.load(path).counts == {"kot": 2, "się": 100}
+
+
+def test_build_table(tmp_path):
+    book_dir = tmp_path / "book_test"
+    book_dir.mkdir()
+    (book_dir / "chapter_1.txt").write_text("| Page 1 |\n\nKot i kot, pies.\n\n| Page 2 |\n\nKot.\n\n", encoding='utf-8')
+    _, table = build_table(str(book_dir))
+    assert table.counts == {"kot": 3, "pies": 1}
+    assert word_frequency.for_extract(str(book_dir / "chapter_1.txt")).counts == table.counts
+
+
+COMMON_WORDS = ["kot", "pies", "dom", "las", "sad"]
+RARE_WORDS = ["brzoza", "czapla", "dzwon", "fujarka", "gwiazda", "hamak", "igła", "jaskółka",
+              "kruk", "lilia", "młyn", "nora", "osika", "pstrąg", "rosa"]
+
+
+def test_hard_game_avoids_common_words(tmp_path, monkeypatch):
+    book_dir = tmp_path / "book_test"
+    book_dir.mkdir()
+    rng = random.Random(0)
+    pages = []
+    for page_index in range(1, 11):
+        words = COMMON_WORDS + RARE_WORDS
+        rng.shuffle(words)
+        pages.append(f"| Page {page_index} |\n\n{' '.join(words[:10])}\n{' '.join(words[10:])}\n\n")
+    extract_path = str(book_dir / "chapter_1.txt")
+    with open(extract_path, 'w', encoding='utf-8') as chapter_file:
+        chapter_file.write("".join(pages))
+    table = FrequencyTable({**{word: 10000 for word in COMMON_WORDS}, **{word: 1 for word in RARE_WORDS}})
+    monkeypatch.setitem(word_frequency._tables, os.path.normpath(str(book_dir)), table)
+    random.seed(0)
+    picked = {}
+    for difficulty in ("easy", "hard"):
+        riddles, _ = build_fill_gaps_game(extract_path, difficulty)
+        options = [option["label"] for riddle in riddles for option in riddle["options"]]
+        picked[difficulty] = sum(1 for label in options if label in COMMON_WORDS) / len(options)
+    assert picked["hard"] < 0.2 < 0.8 < picked["easy"]
@@ -0,0 +1,57 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+'''Process wide memo of tokenized pages keyed by a hash of the page text
+A page is tokenized at most once while it stays among the TOKEN_MEMO_SIZE most recently used pages,
+TOKEN_MEMO_SIZE=0 turns the memo off
+'''
+
+TOKEN_MEMO_SIZE = int(os.environ.get("TOKEN_MEMO_SIZE", 4096))
+
+
+def memo_key(text: str, detailed: bool) -> Hashable:
+    return (detailed, len(text), hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest())
+
+
+class TokenMemo:
+    def __init__(self, max_entries: int = TOKEN_MEMO_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Sequence]" = OrderedDict()
+
+    def get(self, text: str, detailed: bool) -> Optional[Sequence]:
+        '''returns the remembered tokens of a page or None, lists are copied, token tables never change'''
+        key = memo_key(text, detailed)
+        tokens = self._entries.get(key)
+        if tokens is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return list(tokens) if isinstance(tokens, list) else tokens
+
+    def put(self, text: str, detailed: bool, tokens: Sequence):
+        if self.max_entries <= 0:
+            return
+        key = memo_key(text, detailed)
+        self._entries[key] = list(tokens) if isinstance(tokens, list) else tokens
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,111 @@
+import hashlib
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+'''This module reads token annotations precomputed by book_management/build_token_store.py
+Every extracts/book_N folder gets a tokens.npz file with one row per word token
+(the tokens get_token_info keeps: no punctuation, no spaces, longer than one character).
+Pages are found by a hash of their text, so a page that changed after the build is simply not found
+and gets tokenized live.
+
+Columns:
+    page_hashes     blake2b hash of every page
+    page_lengths    length of every page, checked on lookup
+    page_starts     page count + 1 row offsets, page k owns rows page_starts[k]..page_starts[k+1]
+    start, length   character offset and length of the token in the page
+    i               index of the token in the spaCy doc
+    pos             spaCy part of speech id
+    morph           row in morph_table, the morph string of the token
+'''
+
+TOKEN_STORE_NAME = "tokens.npz"
+EXTRACTS_DIR = "extracts"
+
+StoredToken = Tuple[int, int, int, int, str]
+
+_pages: Optional[Dict[int, Tuple["TokenStore", int]]] = None
+
+
+def page_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class TokenStore:
+    def __init__(self, path: str):
+        self.path = path
+        with np.load(path) as data:
+            self.page_hashes = data["page_hashes"]
+            self.page_lengths = data["page_lengths"]
+            self.page_starts = data["page_starts"]
+            self.start = data["start"]
+            self.length = data["length"]
+            self.i = data["i"]
+            self.pos = data["pos"]
+            self.morph = data["morph"]
+            self.morph_table = data["morph_table"].tolist()
+
+    def tokens(self, row: int) -> List[StoredToken]:
+        '''(start, finish, i, pos, morph) of every word token on a page'''
+        first, last = self.page_starts[row], self.page_starts[row + 1]
+        starts = self.start[first:last].tolist()
+        lengths = self.length[first:last].tolist()
+        return [(start, start + length, i, pos, self.morph_table[morph])
+                for start, length, i, pos, morph in zip(starts, lengths, self.i[first:last].tolist(),
+                                                        self.pos[first:last].tolist(), self.morph[first:last].tolist())]
+
+
+def write_store(path: str, pages: List[Tuple[str, List[StoredToken]]]):
+    '''writes (page text, tokens) pairs as a tokens.npz file'''
+    morph_ids: Dict[str, int] = {}
+    page_starts = [0]
+    columns = {"start": [], "length": [], "i": [], "pos": [], "morph": []}
+    for text, tokens in pages:
+        for start, finish, i, pos, morph in tokens:
+            columns["start"].append(start)
+            columns["length"].append(finish - start)
+            columns["i"].append(i)
+            columns["pos"].append(pos)
+            columns["morph"].append(morph_ids.setdefault(morph, len(morph_ids)))
+        page_starts.append(len(columns["start"]))
+
+    np.savez_compressed(
+        path,
+        page_hashes=np.array([page_hash(text) for text, _ in pages], dtype=np.uint64),
+        page_lengths=np.array([len(text) for text, _ in pages], dtype=np.uint32),
+        page_starts=np.array(page_starts, dtype=np.uint32),
+        start=np.array(columns["start"], dtype=np.uint32),
+        length=np.array(columns["length"], dtype=np.uint16),
+        i=np.array(columns["i"], dtype=np.uint32),
+        pos=np.array(columns["pos"], dtype=np.uint16),
+        morph=np.array(columns["morph"], dtype=np.uint32),
+        morph_table=np.array(list(morph_ids) or [""]),
+    )
+
+
+def load_stores(extracts_dir: str = EXTRACTS_DIR):
+    '''indexes the pages of every tokens.npz in extracts/ by their hash'''
+    global _pages
+    _pages = {}
+    if not os.path.isdir(extracts_dir):
+        return
+    for name in sorted(os.listdir(extracts_dir)):
+        path = os.path.join(extracts_dir, name, TOKEN_STORE_NAME)
+        if os.path.isfile(path):
+            store = TokenStore(path)
+            for row, hashed in enumerate(store.page_hashes.tolist()):
+                _pages[hashed] = (store, row)
+
+
+def lookup(text: str) -> Optional[List[StoredToken]]:
+    '''returns the stored tokens of a page or None when the page was not annotated'''
+    if _pages is None:
+        load_stores()
+    entry = _pages.get(page_hash(text))
+    if entry is None:
+        return None
+    store, row = entry
+    if store.page_lengths[row] != len(text):
+        return None
+    return store.tokens(row)
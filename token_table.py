@@ -0,0 +1,107 @@
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import List, Optional
+
+from morph_table import MORPHS, Morph
+
+'''Word tokens of a page stored as columns instead of one object per token
+start, finish and i are unsigned int arrays, pos is the spaCy part of speech id and
+morph the id of the token's morph string in morph_table.MORPHS, words are interned so repeated words share one string.
+Indexing a table gives a TokenView with the attribute names of Word_Token and Word_Token_Detailed,
+so the games read tables exactly like lists of tokens. Tables are never changed after they are built
+and hold no spaCy objects, a Doc is free to go as soon as its tokens are copied out.
+'''
+
+
+class TokenView:
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "TokenTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def original_text(self) -> str:
+        return self.table.words[self.index]
+
+    @property
+    def display_word(self) -> str:
+        return self.table.display_words[self.index]
+
+    @property
+    def start(self) -> int:
+        return self.table.start[self.index]
+
+    @property
+    def finish(self) -> int:
+        return self.table.finish[self.index]
+
+    @property
+    def i(self) -> int:
+        return self.table.i[self.index]
+
+    @property
+    def pos(self) -> Optional[int]:
+        return None if self.table.pos is None else self.table.pos[self.index]
+
+    @property
+    def morph_id(self) -> Optional[int]:
+        return None if self.table.morph is None else self.table.morph[self.index]
+
+    @property
+    def morph(self) -> Optional[Morph]:
+        return None if self.table.morph is None else MORPHS[self.table.morph[self.index]]
+
+    def __eq__(self, other):
+        return isinstance(other, TokenView) and other.table is self.table and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.table), self.index))
+
+    def __repr__(self):
+        return f"TokenView({self.original_text!r}, {self.start}, {self.finish}, {self.i})"
+
+
+class TokenTable(Sequence):
+    __slots__ = ("words", "display_words", "start", "finish", "i", "pos", "morph")
+
+    def __init__(self, text: str, spans, pos: Optional[List[int]] = None, morphs: Optional[List[str]] = None):
+        '''spans are (start, finish, i) of every word token of text,
+        pos and morphs are given for detailed tokens, the pos id and morph string of every span'''
+        self.start = array('I')
+        self.finish = array('I')
+        self.i = array('I')
+        self.words = []
+        self.display_words = []
+        for start, finish, i in spans:
+            self.start.append(start)
+            self.finish.append(finish)
+            self.i.append(i)
+            word = text[start:finish]
+            self.words.append(sys.intern(word))
+            self.display_words.append(sys.intern(word.lower()))
+        self.pos = None if pos is None else array('H', pos)
+        self.morph = None if morphs is None else array('I', (MORPHS.intern(features) for features in morphs))
+
+    @property
+    def detailed(self) -> bool:
+        return self.pos is not None
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TokenView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self):
+        return (TokenView(self, index) for index in range(len(self)))
+
+    def __repr__(self):
+        return f"TokenTable({len(self)} tokens)"
@@ -0,0 +1,108 @@
+import bisect
+import math
+import os
+import zlib
+from array import array
+from typing import Iterable, Optional
+
+import numpy as np
+
+'''Every lowercased word form in extracts/, used to throw away typos that are real words ("może" -> "morze")
+Built by book_management/build_vocabulary.py into extracts/vocabulary.npz:
+    blob        a newline, then the sorted words encoded in UTF-8, each followed by a newline
+    offsets     word count + 1 byte offsets, word k is blob[offsets[k]:offsets[k+1] - 1]
+    bloom       bits of a Bloom filter over the words, bloom_hashes positions per word
+A lookup first asks the Bloom filter, which turns down most non-words with a few bit tests,
+then bisects a list of every BLOCK_SIZE-th word and searches that block of the blob for "\nword\n",
+so only one Python string is kept per block and not per word.
+'''
+
+VOCABULARY_PATH = os.path.join("extracts", "vocabulary.npz")
+# false positive rate of the Bloom filter, they only cost a binary search
+BLOOM_ERROR_RATE = 0.01
+# words per block of the blob, the first word of every block is kept as bytes for bisect
+BLOCK_SIZE = 64
+
+_vocabulary: Optional["Vocabulary"] = None
+
+
+def bloom_positions(word: bytes, hashes: int, bits: int):
+    '''bits of the Bloom filter set for word, made by double hashing two checksums'''
+    position = zlib.crc32(word) % bits
+    step = (zlib.adler32(word) | 1) % bits
+    for _ in range(hashes):
+        yield position
+        position = (position + step) % bits
+
+
+class Vocabulary:
+    def __init__(self, blob: bytes, offsets: array, bloom: bytearray, bloom_hashes: int):
+        self.blob = blob
+        self.offsets = offsets
+        self.bloom = bloom
+        self.bloom_hashes = bloom_hashes
+        self.bloom_bits = len(bloom) * 8
+        self.block_words = [self.blob[offsets[k]:offsets[k + 1] - 1] for k in range(0, len(offsets) - 1, BLOCK_SIZE)]
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "Vocabulary":
+        encoded = sorted({word.lower().encode('utf-8') for word in words})
+        offsets = array('I', [1])
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word) + 1)
+        bits = max(64, math.ceil(-len(encoded) * math.log(BLOOM_ERROR_RATE) / math.log(2) ** 2))
+        hashes = max(1, round(bits / max(len(encoded), 1) * math.log(2)))
+        bloom = bytearray((bits + 7) // 8)
+        for word in encoded:
+            for position in bloom_positions(word, hashes, len(bloom) * 8):
+                bloom[position >> 3] |= 1 << (position & 7)
+        return cls(b"\n" + b"".join(word + b"\n" for word in encoded), offsets, bloom, hashes)
+
+    @classmethod
+    def load(cls, path: str = VOCABULARY_PATH) -> "Vocabulary":
+        with np.load(path) as data:
+            return cls(data["blob"].tobytes(), array('I', data["offsets"].astype(np.uint32).tobytes()),
+                       bytearray(data["bloom"].tobytes()), int(data["bloom_hashes"]))
+
+    def save(self, path: str = VOCABULARY_PATH):
+        np.savez(
+            path,
+            blob=np.frombuffer(self.blob, dtype=np.uint8),
+            offsets=np.array(self.offsets, dtype=np.uint32),
+            bloom=np.frombuffer(bytes(self.bloom), dtype=np.uint8),
+            bloom_hashes=np.array(self.bloom_hashes),
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def word(self, k: int) -> str:
+        return self.blob[self.offsets[k]:self.offsets[k + 1] - 1].decode('utf-8')
+
+    def __contains__(self, word: str) -> bool:
+        '''whether the lowercased word is in the vocabulary'''
+        if not len(self):
+            return False
+        encoded = word.lower().encode('utf-8')
+        bloom, bits = self.bloom, self.bloom_bits
+        # bloom_positions written out, a typo is usually turned down by its first or second bit
+        position = zlib.crc32(encoded) % bits
+        step = (zlib.adler32(encoded) | 1) % bits
+        for _ in range(self.bloom_hashes):
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+            position = (position + step) % bits
+        block = bisect.bisect_right(self.block_words, encoded) - 1
+        if block < 0:
+            return False
+        first = block * BLOCK_SIZE
+        last = min(first + BLOCK_SIZE, len(self))
+        return self.blob.find(b"\n" + encoded + b"\n", self.offsets[first] - 1, self.offsets[last]) >= 0
+
+
+def get_vocabulary() -> Vocabulary:
+    '''the vocabulary of extracts/, loaded on first use, empty when it was not built'''
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = Vocabulary.load() if os.path.isfile(VOCABULARY_PATH) else Vocabulary.from_words([])
+    return _vocabulary
@@ -0,0 +1,44 @@
+import json
+import os
+from typing import Dict, Optional
+
+'''How often every lowercased word occurs in a book, fill weights its gaps by it for the easy and hard difficulty
+Built by book_management/build_frequency_table.py into extracts/book_N/frequencies.json,
+a book's table is loaded the first time one of its chapters asks for it.
+'''
+
+FREQUENCY_TABLE_NAME = "frequencies.json"
+# easy gaps lean towards words the book uses often, hard ones towards its rare words, normal ignores the counts
+DIFFICULTIES = ("easy", "normal", "hard")
+
+_tables: Dict[str, Optional["FrequencyTable"]] = {}
+
+
+class FrequencyTable:
+    def __init__(self, counts: Dict[str, int]):
+        self.counts = counts
+
+    @classmethod
+    def load(cls, path: str) -> "FrequencyTable":
+        with open(path, encoding='utf-8') as table_file:
+            return cls(json.load(table_file))
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as table_file:
+            json.dump(dict(sorted(self.counts.items())), table_file, ensure_ascii=False)
+
+    def weight(self, word: str, difficulty: str) -> float:
+        '''how likely word is to become a gap, relative to the other words of the page'''
+        if difficulty == "normal":
+            return 1.0
+        count = self.counts.get(word.lower(), 1)
+        return float(count) if difficulty == "easy" else 1.0 / count
+
+
+def for_extract(extract_path: str) -> Optional[FrequencyTable]:
+    '''table of the book an extract belongs to, None when it was not built'''
+    book_dir = os.path.normpath(os.path.dirname(extract_path))
+    if book_dir not in _tables:
+        path = os.path.join(book_dir, FREQUENCY_TABLE_NAME)
+        _tables[book_dir] = FrequencyTable.load(path) if os.path.isfile(path) else None
+    return _tables[book_dir]